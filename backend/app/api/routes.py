@@ -1,8 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Form, Depends, Request
+from fastapi import APIRouter, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Form, Depends, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from app.models.schemas import TranscriptionResponse, QuestionRequest, QuestionResponse, JournalEntryResponse
 from app.services.stt_service import STTService
-from app.services.vad_service import VADService
+from app.services.vad_service import VADPool, VADService
 from app.services.llm_service import LLMService
+from app.services.long_form import LongFormTranscriber
+from app.services.admission import AdmissionController, AdmissionRejected, LoadLevel
+from app.services.scheduler import ANONYMOUS_USER, Priority
+from app.services.session_store import SessionStore
+from app.services import diagnostics
+from app.core.config import settings
+from app.utils.http_range import parse_range
+from app.utils.speech_gate import SpeechGate
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import json
+import secrets
 import shutil
 import os
 import uuid
@@ -17,32 +32,162 @@ def get_stt_service(conn: HTTPConnection) -> STTService:
 def get_vad_service(conn: HTTPConnection) -> VADService:
     return conn.app.state.vad_service
 
+def get_stream_vad_pool(conn: HTTPConnection) -> VADPool:
+    return conn.app.state.stream_vad_pool
+
 def get_llm_service(conn: HTTPConnection) -> LLMService:
     return conn.app.state.llm_service
 
+def get_long_form_transcriber(conn: HTTPConnection) -> LongFormTranscriber:
+    return conn.app.state.long_form_transcriber
+
+def get_admission(conn: HTTPConnection) -> AdmissionController:
+    return conn.app.state.admission
+
+def get_session_store(conn: HTTPConnection) -> SessionStore:
+    return conn.app.state.session_store
+
+def get_user_id(conn: HTTPConnection) -> str:
+    """Fair-share key: explicit user id if the client sends one, else the client address."""
+    user_id = conn.headers.get("x-user-id") or conn.query_params.get("user_id")
+    if user_id:
+        return user_id
+    return conn.client.host if conn.client else ANONYMOUS_USER
+
+def require_admin(conn: HTTPConnection) -> None:
+    """Admin endpoints need X-Admin-Token to match ADMIN_TOKEN; without a token they do not exist."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = conn.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def overloaded(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+@asynccontextmanager
+async def admitted(admission: AdmissionController, kind: str):
+    """Hold an admission slot for a request, answering 503 + Retry-After if refused."""
+    try:
+        await admission.acquire(kind)
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    try:
+        yield
+    finally:
+        admission.release(kind)
+
 @router.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(file: UploadFile = File(...), stt_service: STTService = Depends(get_stt_service)):
+async def transcribe_audio(
+    file: UploadFile = File(...),
+    stt_service: STTService = Depends(get_stt_service),
+    admission: AdmissionController = Depends(get_admission),
+    user_id: str = Depends(get_user_id),
+):
+    async with admitted(admission, "upload"):
+        file_ext = os.path.splitext(file.filename)[1] if file.filename else ".wav"
+        temp_filename = f"temp_{uuid.uuid4()}{file_ext}"
+        try:
+            with open(temp_filename, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            
+            file_size = os.path.getsize(temp_filename)
+            print(f"Saved temp file: {temp_filename}, Size: {file_size} bytes")
+            with admission.track("stt"):
+                text = await stt_service.transcribe_file_async(
+                    temp_filename, priority=Priority.BULK, user_id=user_id
+                )
+            
+            return TranscriptionResponse(text=text)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+@router.post("/transcribe/long")
+async def transcribe_long_audio(
+    file: UploadFile = File(...),
+    format: str = "ndjson",
+    transcriber: LongFormTranscriber = Depends(get_long_form_transcriber),
+    admission: AdmissionController = Depends(get_admission),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    Transcribe a long recording, streaming per-chunk results as they finish.
+
+    Args:
+        file: Uploaded audio or video file
+        format: "ndjson" (one JSON event per line) or "sse" (server-sent events)
+
+    Returns:
+        StreamingResponse of "segment" events with word timestamps, then a "done" event
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    # The slot is held until the response stream finishes
+    try:
+        await admission.acquire("upload")
+    except AdmissionRejected as e:
+        raise overloaded(e)
+
     file_ext = os.path.splitext(file.filename)[1] if file.filename else ".wav"
     temp_filename = f"temp_{uuid.uuid4()}{file_ext}"
+    cleaned_up = False
+
+    def cleanup() -> None:
+        # Runs from whichever comes first: the stream ending, the response background task or a failure here
+        nonlocal cleaned_up
+        if cleaned_up:
+            return
+        cleaned_up = True
+        admission.release("upload")
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+    def encode(event: dict) -> str:
+        if format == "sse":
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        return json.dumps(event) + "\n"
+
+    async def events():
+        try:
+            with admission.track("stt"):
+                async for event in transcriber.transcribe(temp_filename, user_id=user_id):
+                    yield encode(event)
+        except Exception as e:
+            print(f"Long-form transcription error: {e}")
+            yield encode({"type": "error", "detail": str(e)})
+        finally:
+            cleanup()
+
     try:
         with open(temp_filename, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
-        
-        file_size = os.path.getsize(temp_filename)
-        print(f"Saved temp file: {temp_filename}, Size: {file_size} bytes")
-        text = stt_service.transcribe_file(temp_filename)
-        
-        return TranscriptionResponse(text=text)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+
+        media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+        # The background task also runs if the client disconnects before the stream is consumed
+        return StreamingResponse(events(), media_type=media_type, background=BackgroundTask(cleanup))
+    except BaseException:
+        cleanup()
+        raise
 
 @router.post("/generate-question", response_model=QuestionResponse)
-async def generate_question(request: QuestionRequest, llm_service: LLMService = Depends(get_llm_service)):
+async def generate_question(
+    request: QuestionRequest,
+    llm_service: LLMService = Depends(get_llm_service),
+    admission: AdmissionController = Depends(get_admission),
+    user_id: str = Depends(get_user_id),
+):
+    # Question generation is the first thing shed under pressure
+    if admission.level() is LoadLevel.SHEDDING:
+        raise overloaded(AdmissionRejected("question", admission.retry_after(), "server overloaded"))
     try:
-        question = llm_service.generate_question(request.context)
+        with admission.track("llm"):
+            question = await llm_service.generate_question_async(
+                request.context, priority=Priority.INTERACTIVE, user_id=user_id
+            )
         print(question)
         return QuestionResponse(question=question)
     except Exception as e:
@@ -53,65 +198,185 @@ async def process_journal_entry(
     file: UploadFile = File(...),
     stt_service: STTService = Depends(get_stt_service),
     llm_service: LLMService = Depends(get_llm_service),
+    admission: AdmissionController = Depends(get_admission),
+    user_id: str = Depends(get_user_id),
 ):
-    file_ext = os.path.splitext(file.filename)[1] if file.filename else ".wav"
-    temp_filename = f"temp_{uuid.uuid4()}{file_ext}"
-    try:
-        # 1. Save and Transcribe
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        transcription = stt_service.transcribe_file(temp_filename)
-        
-        # 2. Generate Question
-        question = llm_service.generate_question(transcription)
-        
-        return JournalEntryResponse(
-            transcription=transcription,
-            generated_question=question
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+    async with admitted(admission, "upload"):
+        file_ext = os.path.splitext(file.filename)[1] if file.filename else ".wav"
+        temp_filename = f"temp_{uuid.uuid4()}{file_ext}"
+        try:
+            # 1. Save and Transcribe
+            with open(temp_filename, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            
+            with admission.track("stt"):
+                transcription = await stt_service.transcribe_file_async(
+                    temp_filename, priority=Priority.BULK, user_id=user_id
+                )
+            
+            # 2. Generate Question
+            with admission.track("llm"):
+                question = await llm_service.generate_question_async(
+                    transcription, priority=Priority.BULK, user_id=user_id
+                )
+            
+            return JournalEntryResponse(
+                transcription=transcription,
+                generated_question=question
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+
+@router.get("/metrics")
+async def get_metrics(
+    request: Request,
+    stt_service: STTService = Depends(get_stt_service),
+    vad_service: VADService = Depends(get_vad_service),
+    llm_service: LLMService = Depends(get_llm_service),
+    admission: AdmissionController = Depends(get_admission),
+):
+    return {
+        "admission": admission.stats(),
+        "scheduler": {
+            "stt": stt_service.scheduler.stats(),
+            "llm": llm_service.scheduler.stats(),
+            "llm_embed": llm_service.embed_scheduler.stats(),
+        },
+        # In broker mode both services share one queue
+        "job_queues": {
+            queue.name: queue.stats() for queue in (stt_service.job_queue, llm_service.job_queue)
+        },
+        "stt_cache": stt_service.cache.stats() if stt_service.cache else None,
+        "llm_cache": llm_service.question_cache.stats() if llm_service.question_cache else None,
+        "vad": vad_service.stats(),
+        "stream_gate": request.app.state.stream_gate_stats.to_dict(),
+        "stream_vad_pool": request.app.state.stream_vad_pool.stats(),
+        "transcript_filter": request.app.state.transcript_filter_stats.to_dict(),
+        "sessions": request.app.state.session_store.stats(),
+    }
 
 
 from app.services.journaling_session import JournalingSession
+from app.services.session_archive import session_archive_service
 
 @router.websocket("/ws/audio")
 async def websocket_endpoint(
     websocket: WebSocket,
+    session_id: Optional[str] = None,
+    sample_rate: Optional[int] = None,
+    channels: int = 1,
     stt_service: STTService = Depends(get_stt_service),
     vad_service: VADService = Depends(get_vad_service),
     llm_service: LLMService = Depends(get_llm_service),
+    admission: AdmissionController = Depends(get_admission),
+    session_store: SessionStore = Depends(get_session_store),
+    user_id: str = Depends(get_user_id),
 ):
     await websocket.accept()
-    print("WebSocket connected")
-    
-    session = JournalingSession(
-        stt_service=stt_service,
-        vad_service=vad_service,
-        llm_service=llm_service,
-    )
-    
+
+    # Resume a dropped session if the client still has its id
+    session = None
+    if session_id:
+        # Only the user who started a session may take it over (and close its current connection)
+        owner = session_store.owner(session_id)
+        if owner is not None and owner != user_id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Session belongs to another user")
+            return
+        previous = session_store.connection(session_id)
+        session = session_store.resume(session_id, websocket)
+        if previous is not None:
+            # The old connection is half-open; it no longer owns the session
+            try:
+                await previous.close(reason="Session resumed on another connection")
+            except Exception:
+                pass
+
+    resumed = session is not None
+    if session is None:
+        # Clients may stream at their native rate and channel count (16-bit PCM); the session converts
+        rate = sample_rate or settings.SAMPLE_RATE
+        if not (settings.AUDIO_MIN_INPUT_RATE <= rate <= settings.AUDIO_MAX_INPUT_RATE) or not (
+            1 <= channels <= settings.AUDIO_MAX_INPUT_CHANNELS
+        ):
+            await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Unsupported sample_rate or channels")
+            return
+
+        # Refuse new sessions rather than slowing down the admitted ones
+        try:
+            await admission.acquire("session", wait=False)
+        except AdmissionRejected as e:
+            print(f"Rejecting WebSocket session: {e}")
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=f"Server busy, retry after {e.retry_after}s")
+            return
+
+        session = JournalingSession(
+            stt_service=stt_service,
+            vad_service=vad_service,
+            llm_service=llm_service,
+            admission=admission,
+            user_id=user_id,
+            archive_service=session_archive_service if settings.SESSION_ARCHIVE_ENABLED else None,
+            filter_stats=websocket.app.state.transcript_filter_stats,
+            input_sample_rate=rate,
+            input_channels=channels,
+        )
+        session.start()
+        session_store.add(session, websocket)
+        print(f"WebSocket connected (session {session.session_id})")
+    else:
+        print(f"WebSocket resumed session {session.session_id} at offset {session.received_bytes}")
+
+    async def send_events():
+        async for event in session.events():
+            try:
+                await websocket.send_json(event)
+            except BaseException:
+                # Keep the event for the next connection of this session
+                session.redeliver(event)
+                raise
+
+    sender = None
+    ended = False
     try:
+        # The client continues sending audio from `offset`; earlier audio is already being processed
+        await websocket.send_json({
+            "type": "session",
+            "session_id": session.session_id,
+            "resumed": resumed,
+            "offset": session.received_bytes,
+        })
+        sender = asyncio.create_task(send_events())
+
         while True:
             data = await websocket.receive_bytes()
-            
-            async for event in session.process_audio(data):
-                await websocket.send_json(event)
+            await session.feed(data)
                 
-    except WebSocketDisconnect:
-        print("WebSocket disconnected")
+    except WebSocketDisconnect as e:
+        # A normal close ends the session; anything else keeps it resumable
+        ended = e.code == status.WS_1000_NORMAL_CLOSURE
+        print(f"WebSocket disconnected ({e.code})")
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        if sender is not None:
+            sender.cancel()
+        if session_store.is_attached(session.session_id, websocket):
+            if ended:
+                await session_store.end(session.session_id)
+            else:
+                session_store.detach(session.session_id, websocket)
 
 
 @router.websocket("/ws/audio/stream")
 async def websocket_streaming_audio(
     websocket: WebSocket,
+    gate: Optional[bool] = None,
     stt_service: STTService = Depends(get_stt_service),
+    vad_pool: VADPool = Depends(get_stream_vad_pool),
 ):
     await websocket.accept()
 
@@ -119,11 +384,28 @@ async def websocket_streaming_audio(
     #     await websocket.close(code=4400)
     #     return
 
+    # Optionally forward only speech (plus padding); the provider keeps the connection alive meanwhile
+    # Each gated stream borrows its own VAD so Silero state is not shared with other streams
+    speech_gate = None
+    gate_vad = None
+    use_gate = settings.STREAM_VAD_GATING if gate is None else gate
+    if use_gate:
+        chunk_size = int(settings.VAD_INTERVAL * settings.SAMPLE_RATE * 2)
+        padding_chunks = int(settings.STREAM_GATE_PADDING / settings.VAD_INTERVAL)
+        gate_vad = await asyncio.to_thread(vad_pool.acquire)
+        speech_gate = SpeechGate(
+            gate_vad, chunk_size, padding_chunks, stats=websocket.app.state.stream_gate_stats
+        )
+
     async def audio_chunks():
         try:
             while True:
                 data = await websocket.receive_bytes()
-                yield data
+                if speech_gate is None:
+                    yield data
+                    continue
+                for chunk in speech_gate.process(data):
+                    yield chunk
         except WebSocketDisconnect:
             return
 
@@ -138,11 +420,79 @@ async def websocket_streaming_audio(
     except Exception as e:
         print(f"WebSocket streaming error: {e}")
         await websocket.close(code=1011)
+    finally:
+        if speech_gate is not None:
+            speech_gate.close()
+            vad_pool.release(gate_vad)
+            print(f"Speech gate forwarded {speech_gate.bytes_forwarded}/{speech_gate.bytes_in} bytes "
+                  f"({speech_gate.bytes_saved} saved)")
+
+def read_bytes(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+def range_response(request: Request, path: str, offset: int, size: int, media_type: str) -> Response:
+    """Serve `size` bytes of a file starting at `offset`, honouring a single Range header."""
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return Response(read_bytes(path, offset, size), media_type=media_type, headers={"Accept-Ranges": "bytes"})
+    start, end = byte_range
+    return Response(
+        read_bytes(path, offset + start, end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers={"Accept-Ranges": "bytes", "Content-Range": f"bytes {start}-{end}/{size}"},
+    )
+
+def require_session_owner(session_id: str, conn: HTTPConnection) -> None:
+    """Archived sessions are only served to the user who recorded them; others get a 404."""
+    owner = session_archive_service.owner(session_id)
+    if owner is None or owner != get_user_id(conn):
+        raise HTTPException(status_code=404, detail="Session archive not found")
+
+@router.get("/sessions/{session_id}/audio/index", dependencies=[Depends(require_session_owner)])
+async def get_session_audio_index(session_id: str):
+    """List a session's archived utterances with their transcripts and timing."""
+    entries = await asyncio.to_thread(session_archive_service.index, session_id)
+    if entries is None:
+        raise HTTPException(status_code=404, detail="Session archive not found")
+    return {"session_id": session_id, "clips": entries}
+
+@router.get("/sessions/{session_id}/audio/clips/{seq}", dependencies=[Depends(require_session_owner)])
+async def get_session_audio_clip(session_id: str, seq: int, request: Request):
+    """Serve the audio of one transcript line by seeking to it in the archive."""
+    clip = await asyncio.to_thread(session_archive_service.clip, session_id, seq)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Clip not found")
+    path, offset, length, media_type = clip
+    return await asyncio.to_thread(range_response, request, path, offset, length, media_type)
+
+@router.get("/sessions/{session_id}/audio", dependencies=[Depends(require_session_owner)])
+async def get_session_audio(session_id: str, request: Request):
+    """Serve a session's whole archive, with Range support for seeking players."""
+    located = session_archive_service.audio_file(session_id)
+    if located is None:
+        raise HTTPException(status_code=404, detail="Session archive not found")
+    path, media_type = located
+    if "range" not in request.headers:
+        return FileResponse(path, media_type=media_type, headers={"Accept-Ranges": "bytes"})
+    size = os.path.getsize(path)
+    return await asyncio.to_thread(range_response, request, path, 0, size, media_type)
+
 
 from app.services.video_service import video_service
 
 @router.post("/save-video")
-async def save_video(file: UploadFile = File(...), save_path: str = Form(...)):
+async def save_video(
+    file: UploadFile = File(...),
+    save_path: str = Form(...),
+    admission: AdmissionController = Depends(get_admission),
+):
     """
     Save and convert uploaded video file.
     
@@ -151,18 +501,81 @@ async def save_video(file: UploadFile = File(...), save_path: str = Form(...)):
         save_path: Desired filename for the saved video
         
     Returns:
-        dict: Success message and path to saved file
+        dict: Success message, path to the saved MP4 and the playback outputs
     """
     try:
         # Validate filename
         if not save_path:
             raise HTTPException(status_code=400, detail="Filename is required")
         
-        # Delegate to service
-        final_path = video_service.save_and_convert_video(file.file, save_path)
+        # Delegate to service (ffmpeg runs off the event loop)
+        async with admitted(admission, "transcode"):
+            outputs = await asyncio.to_thread(video_service.save_and_convert_video, file.file, save_path)
         
-        return {"message": "Video saved successfully", "path": final_path}
+        return {"message": "Video saved successfully", **outputs}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error saving video: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# One profile at a time: concurrent profiles would add up their overhead and skew each other
+profile_lock = asyncio.Lock()
+
+def profile_seconds(seconds: float) -> float:
+    if seconds <= 0 or seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {settings.PROFILE_MAX_SECONDS:g}]")
+    return seconds
+
+@asynccontextmanager
+async def exclusive_profile():
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Another profile is running")
+    async with profile_lock:
+        yield
+
+
+@router.post("/admin/profile/cpu", dependencies=[Depends(require_admin)])
+async def profile_cpu(seconds: float = 10.0, interval_ms: Optional[float] = None):
+    """
+    Sample the stacks of every thread for a while.
+
+    Args:
+        seconds: Profile duration
+        interval_ms: Milliseconds between samples (default PROFILE_SAMPLE_INTERVAL)
+
+    Returns:
+        Collapsed stacks ("frame;frame;frame count" per line) for flamegraph.pl or speedscope;
+        the sample count and sampled seconds are in the X-Profile-Samples/X-Profile-Seconds headers
+    """
+    seconds = profile_seconds(seconds)
+    interval = settings.PROFILE_SAMPLE_INTERVAL if interval_ms is None else max(interval_ms, 1.0) / 1000
+    async with exclusive_profile():
+        profiler = await diagnostics.profile_cpu(seconds, interval)
+    return Response(
+        content=profiler.collapsed(),
+        media_type="text/plain",
+        headers={"X-Profile-Samples": str(profiler.samples), "X-Profile-Seconds": f"{profiler.elapsed:.3f}"},
+    )
+
+
+@router.get("/admin/tasks", dependencies=[Depends(require_admin)])
+async def dump_tasks():
+    """List asyncio tasks, with the stage each journaling session is waiting in."""
+    return diagnostics.dump_tasks()
+
+
+@router.post("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def profile_memory(seconds: float = 10.0, top: int = 25):
+    """
+    Diff tracemalloc snapshots taken `seconds` apart.
+
+    Args:
+        seconds: Interval between the snapshots
+        top: Number of allocation sites to return
+    """
+    seconds = profile_seconds(seconds)
+    async with exclusive_profile():
+        return await diagnostics.memory_diff(seconds, top=max(1, min(top, 200)))
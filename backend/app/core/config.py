@@ -1,6 +1,6 @@
 import os
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -17,8 +17,18 @@ class Settings(BaseSettings):
     WHISPER_MODEL: str = "small.en"
     # Preferred device for Whisper: "auto" (default), "mps", "cuda", or "cpu"
     WHISPER_DEVICE: Optional[str] = os.getenv("WHISPER_DEVICE", "auto")
+    # Optional smaller Whisper model (e.g. "base.en") used for live sessions under load
+    WHISPER_DEGRADED_MODEL: Optional[str] = os.getenv("WHISPER_DEGRADED_MODEL", None)
     STT_MODEL: STTModel = STTModel.WHISPER
     DEEPGRAM_API_KEY: Optional[str] = os.getenv("DEEPGRAM_API_KEY", None)
+    # Endpoints are configurable so the provider can be pointed at a local fake server
+    DEEPGRAM_API_URL: str = os.getenv("DEEPGRAM_API_URL", "https://api.deepgram.com/v1/listen")
+    DEEPGRAM_LIVE_URL: str = os.getenv("DEEPGRAM_LIVE_URL", "wss://api.deepgram.com/v1/listen")
+    DEEPGRAM_KEEPALIVE_INTERVAL: float = 5.0 # Seconds without audio before sending KeepAlive
+    DEEPGRAM_MAX_RECONNECTS: int = 5 # Consecutive failed reconnects before a live stream gives up
+    DEEPGRAM_REPLAY_SECONDS: float = 10.0 # Unfinalized audio kept for replay after a drop
+    STREAM_VAD_GATING: bool = False # Forward only speech on /ws/audio/stream (overridable with ?gate=)
+    STREAM_GATE_PADDING: float = 0.3 # Audio kept before and after speech when gating (seconds)
 
     
     # VAD Settings
@@ -28,4 +38,136 @@ class Settings(BaseSettings):
     MIN_AUDIO_LENGTH: float = 0.2  # Minimum audio length to transcribe (seconds)
     VAD_PAUSE_THRESHOLD: float = 0.5 # Silence duration to trigger transcription (seconds) to transcribe
     POST_SPEAKING_SILENCE_THRESHOLD: float = 2.0 # Silence duration to trigger LLM
+    MAX_UTTERANCE_DURATION: float = 15.0 # Speech longer than this is cut and transcribed mid-utterance
+    UTTERANCE_CUT_SEARCH: float = 2.0 # Window before the limit searched for the quietest cut point (seconds)
+    UTTERANCE_OVERLAP: float = 0.5 # Audio repeated across a forced cut, de-duplicated in the transcript
+
+    # Audio front-end of /ws/audio (clients may send any rate/channel count, see ?sample_rate=&channels=)
+    AUDIO_RESAMPLER_TAPS: int = 24 # Polyphase FIR taps per output sample (scaled up when decimating)
+    AUDIO_MIN_INPUT_RATE: int = 8000
+    AUDIO_MAX_INPUT_RATE: int = 96000
+    AUDIO_MAX_INPUT_CHANNELS: int = 8
+
+    # Energy pre-gate in front of Silero VAD
+    VAD_ENERGY_GATE_ENABLED: bool = True
+    VAD_ENERGY_GATE_MARGIN_DB: float = 6.0 # Max level above the adaptive noise floor for clear silence
+    VAD_ENERGY_GATE_MAX_DBFS: float = -40.0 # Chunks louder than this always go to the model
+    VAD_ENERGY_GATE_HANGOVER: float = 0.3 # Quiet time required after activity before skipping (seconds)
+
+    # Turn detection settings (adaptive thresholds, see VAD.md)
+    TURN_DETECTION_ENABLED: bool = True
+    TURN_MIN_SILENCE: float = 0.6 # End-of-turn silence after a clearly complete thought
+    TURN_MAX_SILENCE: float = 2.5 # End-of-turn silence after a clearly incomplete thought
+    TURN_REFERENCE_SPEECH_RATE: float = 2.5 # Typical words per second; slower speakers get longer waits
+    TURN_WEIGHTS: Dict[str, float] = {} # Overrides of the hand-tuned completeness weights (turn_detector.DEFAULT_WEIGHTS)
+
+    # Session pipeline settings
+    PIPELINE_QUEUE_SIZE: int = 256 # Max items buffered between two pipeline stages
+    PIPELINE_STT_CONCURRENCY: int = 1 # Concurrent transcriptions per session
+    PIPELINE_LLM_CONCURRENCY: int = 1 # Concurrent question generations per session
+    SESSION_RESUME_TTL: float = 120.0 # How long a dropped /ws/audio session can be resumed (seconds)
+    SESSION_ACK_INTERVAL: float = 1.0 # Audio received between offset acks to the client (seconds)
+    SESSION_ARCHIVE_ENABLED: bool = False # Keep each session's speech on disk for clip playback (no automatic deletion)
+    SESSION_ARCHIVE_DIR: str = os.getenv("SESSION_ARCHIVE_DIR", "sessions")
+    SESSION_ARCHIVE_CODEC: str = "opus" # Key of ARCHIVE_CODECS (only Ogg Opus chains per-utterance streams into one file)
+    SESSION_ARCHIVE_BITRATE: str = "16k" # Opus bitrate; ~7 MB per hour of speech
+
+    # Transcript filtering (rejected segments never reach the transcript or the LLM)
+    FILTER_NO_SPEECH_THRESHOLD: float = 0.6 # Whisper no-speech probability above which a low-confidence segment is silence
+    FILTER_LOGPROB_THRESHOLD: float = -1.0 # Average token log-prob below which such a segment is rejected
+    FILTER_COMPRESSION_RATIO_THRESHOLD: float = 2.4 # gzip ratio above which text is a repetition loop
+    FILTER_MAX_NGRAM_REPEATS: int = 3 # Times a word 3-gram may occur in one segment
+    FILTER_HALLUCINATION_PHRASES: List[str] = [ # Whole-segment texts Whisper produces on noise
+        "thank you",
+        "thanks for watching",
+        "thank you for watching",
+        "thank you so much for watching",
+        "please subscribe",
+        "subscribe to my channel",
+        "like and subscribe",
+        "see you next time",
+        "bye",
+        "you",
+        "subtitles by the amara.org community",
+    ]
+
+    # Transcription cache settings
+    STT_CACHE_ENABLED: bool = True
+    STT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024 # Memory budget for cached transcripts
+    STT_CACHE_DIR: Optional[str] = os.getenv("STT_CACHE_DIR", None) # Optional on-disk tier
+
+    # Long-form transcription settings
+    LONG_FORM_MAX_CHUNK_SECONDS: float = 28.0 # Hard cut if no pause is found (Whisper window is 30s)
+    LONG_FORM_MIN_CHUNK_SECONDS: float = 10.0 # Earliest point at which a pause may end a chunk
+    LONG_FORM_BATCH_SIZE: int = 8 # Chunks transcribed per batched forward pass
+    LONG_FORM_DECODE_BLOCK_SECONDS: float = 10.0 # Audio decoded per ffmpeg read
+    LONG_FORM_VAD_OVERLAP_SECONDS: float = 1.0 # Already analyzed audio re-run through VAD as context for each new block
+    LONG_FORM_PIPELINE_DEPTH: int = 2 # Batches in flight (transcribing or waiting to be sent) at once
+
+    # Admission control and load shedding
+    ADMISSION_MAX_SESSIONS: int = 50 # Concurrent /ws/audio sessions
+    ADMISSION_MAX_UPLOADS: int = 4 # Concurrent transcription uploads
+    ADMISSION_MAX_TRANSCODES: int = 2 # Concurrent /save-video conversions
+    ADMISSION_QUEUE_TIMEOUT: float = 10.0 # Max wait for an upload/transcode slot before 503 (seconds)
+    ADMISSION_RETRY_AFTER: int = 5 # Retry-After hint for rejected requests (seconds)
+    ADMISSION_LAG_PROBE_INTERVAL: float = 0.1 # Event-loop lag sampling interval (seconds)
+    ADMISSION_DEGRADE_LOOP_LAG: float = 0.05 # Event-loop lag that degrades admitted sessions (seconds)
+    ADMISSION_SHED_LOOP_LAG: float = 0.25 # Event-loop lag that rejects new work (seconds)
+    ADMISSION_DEGRADE_QUEUE_DEPTH: int = 16 # In-flight STT+LLM jobs that degrade admitted sessions
+    ADMISSION_SHED_QUEUE_DEPTH: int = 48 # In-flight STT+LLM jobs that reject new work
+    ADMISSION_DEGRADED_PAUSE_FACTOR: float = 2.0 # Pause threshold multiplier (fewer, longer segments) when degraded
+
+    # Inference scheduling (priority classes + per-user weighted fair queuing)
+    WHISPER_CONCURRENCY: int = 1 # Concurrent local Whisper calls
+    DEEPGRAM_CONCURRENCY: int = 16 # Concurrent Deepgram batch requests
+    LLM_CONCURRENCY: int = 1 # Concurrent Ollama generations
+    SCHEDULER_USER_WEIGHTS: Dict[str, float] = {} # Per-user share weights (default 1.0)
+
+    # Semantic cache of follow-up questions (embeds each context with OLLAMA_EMBED_MODEL)
+    LLM_CACHE_ENABLED: bool = False
+    OLLAMA_EMBED_MODEL: str = "nomic-embed-text"
+    LLM_CACHE_THRESHOLD: float = 0.92 # Cosine similarity needed to reuse a question
+    LLM_CACHE_SATURATED_THRESHOLD: float = 0.85 # Looser threshold while every generation slot is busy
+    LLM_EMBED_CONCURRENCY: int = 2 # Concurrent cache embeddings (scheduled apart from generations)
+    LLM_CACHE_TTL: float = 3600.0 # Seconds a cached question may be reused
+    LLM_CACHE_MAX_ENTRIES: int = 5000 # Entries across all users before LRU eviction
+    LLM_CACHE_LSH_TABLES: int = 8 # LSH tables (recall)
+    LLM_CACHE_LSH_BITS: int = 12 # Hyperplanes per table (bucket size)
+
+    # Video outputs of /save-video (all produced by one ffmpeg run)
+    VIDEO_KEYFRAME_INTERVAL: float = 2.0 # Forced keyframe spacing for fast seeking (seconds)
+    VIDEO_HLS_ENABLED: bool = False # Also write HLS/fMP4 renditions
+    VIDEO_HLS_RENDITIONS: List[str] = ["720:2500k", "360:800k"] # "height:video bitrate" per rendition
+    VIDEO_HLS_SEGMENT_SECONDS: int = 4
+    VIDEO_THUMBNAILS_ENABLED: bool = True # Write thumbnail sprite sheets plus a WebVTT index
+    VIDEO_THUMBNAIL_INTERVAL: float = 5.0 # Seconds between thumbnails
+    VIDEO_THUMBNAIL_WIDTH: int = 160
+    VIDEO_THUMBNAIL_HEIGHT: int = 90
+    VIDEO_SPRITE_COLUMNS: int = 10
+    VIDEO_SPRITE_ROWS: int = 10
+
+    # Offline insights over archived sessions (python -m app.insights, or daily in the server)
+    INSIGHTS_DIR: str = os.getenv("INSIGHTS_DIR", "insights") # Output and checkpoint files
+    INSIGHTS_BATCH_SIZE: int = 4 # Journal entries enriched per LLM request
+    INSIGHTS_CONCURRENCY: int = 1 # LLM requests in flight per run
+    INSIGHTS_MAX_ENTRY_CHARS: int = 4000 # Transcript characters sent per entry
+    INSIGHTS_SCHEDULE_AT: Optional[str] = os.getenv("INSIGHTS_SCHEDULE_AT", None) # Local "HH:MM" for a daily run inside the server
+    INSIGHTS_USER_ID: str = "insights" # Fair-share key of batch runs in the inference scheduler
+    INSIGHTS_UNFINISHED_AFTER: float = 86400.0 # Seconds after which a session never marked ended (server crash) counts as finished
+
+    # On-demand diagnostics under /api/admin (disabled unless ADMIN_TOKEN is set)
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN", None) # Sent by callers as X-Admin-Token
+    PROFILE_MAX_SECONDS: float = 60.0 # Longest CPU/memory profile a request may ask for
+    PROFILE_SAMPLE_INTERVAL: float = 0.01 # Default seconds between CPU profile samples
+
+    # Job queue for STT/LLM inference ("inprocess", or "broker" for remote workers, see app/worker.py)
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "inprocess")
+    JOB_BROKER_HOST: str = os.getenv("JOB_BROKER_HOST", "127.0.0.1") # Interface the broker listens on for workers
+    JOB_BROKER_TOKEN: Optional[str] = os.getenv("JOB_BROKER_TOKEN", None) # Shared secret workers send in their hello; required off localhost
+    JOB_BROKER_PORT: int = 8765 # Port the broker listens on for workers
+    JOB_BROKER_URLS: str = os.getenv("JOB_BROKER_URLS", "localhost:8765") # Brokers a worker pulls from (comma-separated host:port)
+    JOB_BROKER_CONCURRENCY: int = 8 # In-flight remote jobs per backend; replaces the local limits above in broker mode
+    JOB_TIMEOUT: float = 120.0 # Max time a job may wait and run before it fails (seconds)
+    JOB_MAX_ATTEMPTS: int = 2 # Deliveries before a job lost with its worker is failed
+    WORKER_CONCURRENCY: int = 1 # Jobs a worker runs at once
 settings = Settings()
@@ -0,0 +1,63 @@
+"""
+Offline insights: summaries, mood/topic tags and weekly reflections for archived journal sessions.
+
+    python -m app.insights                      # the whole backlog
+    python -m app.insights --day 2026-10-18     # one day's sessions
+    python -m app.insights --since 2026-10-01 --until 2026-10-08
+    python -m app.insights --daily-at 03:00     # keep running, once a day
+
+Results are appended to INSIGHTS_DIR/entries.jsonl and weekly.jsonl; sessions
+already in entries.jsonl are skipped, so an interrupted run can simply be
+restarted. This process talks to Ollama directly; to share the server's
+scheduler with live sessions instead, set INSIGHTS_SCHEDULE_AT on the server.
+"""
+import argparse
+import asyncio
+import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.services.insights import InsightRunner, run_daily
+from app.services.llm_service import LLMService
+from app.services.session_archive import SessionArchiveService
+
+
+def _timestamp(day: Optional[str]) -> Optional[float]:
+    if day is None:
+        return None
+    return datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time()).timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate insights for archived journal sessions")
+    parser.add_argument("--day", help="Process the sessions of one day (YYYY-MM-DD)")
+    parser.add_argument("--since", help="First day to process (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Day after the last one to process (YYYY-MM-DD)")
+    parser.add_argument("--daily-at", help="Run every day at this local time (HH:MM) instead of once")
+    parser.add_argument("--no-weekly", action="store_true", help="Skip weekly reflections")
+    parser.add_argument("--batch-size", type=int, default=settings.INSIGHTS_BATCH_SIZE, help="Entries per LLM request")
+    parser.add_argument("--concurrency", type=int, default=settings.INSIGHTS_CONCURRENCY, help="LLM requests in flight")
+    parser.add_argument("--archive-dir", default=settings.SESSION_ARCHIVE_DIR, help="Session archive to read")
+    parser.add_argument("--output", default=settings.INSIGHTS_DIR, help="Directory for results and checkpoint")
+    args = parser.parse_args()
+
+    since, until = _timestamp(args.since), _timestamp(args.until)
+    if args.day:
+        since = _timestamp(args.day)
+        until = since + 24 * 3600
+
+    runner = InsightRunner(
+        LLMService(),
+        SessionArchiveService(args.archive_dir),
+        args.output,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )
+    if args.daily_at:
+        asyncio.run(run_daily(runner, args.daily_at))
+    else:
+        asyncio.run(runner.run(since, until, weekly=not args.no_weekly))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,23 @@ import logging
 from app.api.routes import router
 from app.core.config import settings
 from app.services.stt_service import STTService
-from app.services.vad_service import VADService
+from app.services.vad_service import VADPool, VADService
 from app.services.llm_service import LLMService
+from app.services.long_form import LongFormTranscriber
+from app.utils.speech_gate import SpeechGateStats
+from app.utils.transcription_filter import FilterStats
+from app.services.admission import AdmissionController
+from app.services.job_queue import BrokerJobQueue
+from app.services.session_store import SessionStore
+from app.services.insights import InsightRunner, run_daily
+from app.services.session_archive import session_archive_service
+import asyncio
 
 logging.basicConfig(level=logging.INFO)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
-async def check_and_pull_model():
-    model_name = settings.OLLAMA_MODEL
+async def check_and_pull_model(model_name: str):
     base_url = settings.OLLAMA_BASE_URL
     
     async with httpx.AsyncClient() as client:
@@ -49,12 +57,50 @@ async def check_and_pull_model():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await check_and_pull_model()
-    app.state.stt_service = STTService()
+    await check_and_pull_model(settings.OLLAMA_MODEL)
+    if settings.LLM_CACHE_ENABLED:
+        await check_and_pull_model(settings.OLLAMA_EMBED_MODEL)
+    # STT/LLM inference runs in this process unless remote workers are configured
+    job_queue = None
+    if settings.JOB_QUEUE_BACKEND == "broker":
+        job_queue = BrokerJobQueue(
+            settings.JOB_BROKER_HOST, settings.JOB_BROKER_PORT, token=settings.JOB_BROKER_TOKEN
+        )
+        await job_queue.start()
+    app.state.stt_service = STTService(job_queue)
     app.state.vad_service = VADService()
-    app.state.llm_service = LLMService()
+    app.state.llm_service = LLMService(job_queue)
+    # Long-form jobs get their own VAD model so they don't disturb live session state
+    app.state.long_form_transcriber = LongFormTranscriber(app.state.stt_service, VADService())
+    app.state.stream_vad_pool = VADPool()
+    app.state.stream_gate_stats = SpeechGateStats()
+    app.state.transcript_filter_stats = FilterStats()
+    app.state.admission = AdmissionController()
+    await app.state.admission.start()
+    app.state.session_store = SessionStore(app.state.admission, settings.SESSION_RESUME_TTL)
+    # Daily insights share the LLM scheduler at BULK priority, so live sessions go first
+    insights_task = None
+    if settings.INSIGHTS_SCHEDULE_AT:
+        runner = InsightRunner(
+            app.state.llm_service,
+            session_archive_service,
+            settings.INSIGHTS_DIR,
+            batch_size=settings.INSIGHTS_BATCH_SIZE,
+            concurrency=settings.INSIGHTS_CONCURRENCY,
+            admission=app.state.admission,
+            session_store=app.state.session_store,
+        )
+        insights_task = asyncio.create_task(run_daily(runner, settings.INSIGHTS_SCHEDULE_AT), name="insights:daily")
     yield
     # Shutdown
+    if insights_task is not None:
+        insights_task.cancel()
+        await asyncio.gather(insights_task, return_exceptions=True)
+    await app.state.session_store.close_all()
+    await app.state.admission.stop()
+    await app.state.stt_service.aclose()
+    if job_queue is not None:
+        await job_queue.stop()
 
 from fastapi.middleware.cors import CORSMiddleware
 
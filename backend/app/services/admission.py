@@ -0,0 +1,146 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+
+class LoadLevel(str, Enum):
+    NORMAL = "normal"
+    DEGRADED = "degraded"
+    SHEDDING = "shedding"
+
+
+class AdmissionRejected(Exception):
+    """Raised when new work is refused because the server is overloaded."""
+
+    def __init__(self, kind: str, retry_after: int, reason: str):
+        super().__init__(f"{kind} rejected: {reason}")
+        self.kind = kind
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Admission control and load shedding for sessions, uploads and transcodes.
+
+    Each kind of work has a fixed number of slots. The load level is derived
+    from event-loop lag and the number of in-flight STT/LLM jobs: DEGRADED asks
+    admitted sessions to do cheaper work, SHEDDING additionally refuses all new
+    work with a Retry-After hint so already-admitted sessions keep their latency.
+    """
+
+    def __init__(self):
+        self.limits = {
+            "session": settings.ADMISSION_MAX_SESSIONS,
+            "upload": settings.ADMISSION_MAX_UPLOADS,
+            "transcode": settings.ADMISSION_MAX_TRANSCODES,
+        }
+        self._slots = {kind: asyncio.Semaphore(limit) for kind, limit in self.limits.items()}
+        self.active = {kind: 0 for kind in self.limits}
+        self.rejected = {kind: 0 for kind in self.limits}
+        self.inflight = {"stt": 0, "llm": 0}
+
+        self.loop_lag = 0.0
+        self._monitor: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the event-loop lag monitor."""
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._monitor_loop(), name="admission:lag-monitor")
+
+    async def stop(self) -> None:
+        """Stop the event-loop lag monitor."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+    async def _monitor_loop(self) -> None:
+        interval = settings.ADMISSION_LAG_PROBE_INTERVAL
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(time.perf_counter() - start - interval, 0.0)
+            # Smooth so a single slow callback doesn't flip the load level
+            self.loop_lag += 0.3 * (lag - self.loop_lag)
+
+    def queue_depth(self) -> int:
+        return self.inflight["stt"] + self.inflight["llm"]
+
+    def level(self) -> LoadLevel:
+        """Current load level from event-loop lag and STT/LLM queue depth."""
+        depth = self.queue_depth()
+        if self.loop_lag >= settings.ADMISSION_SHED_LOOP_LAG or depth >= settings.ADMISSION_SHED_QUEUE_DEPTH:
+            return LoadLevel.SHEDDING
+        if self.loop_lag >= settings.ADMISSION_DEGRADE_LOOP_LAG or depth >= settings.ADMISSION_DEGRADE_QUEUE_DEPTH:
+            return LoadLevel.DEGRADED
+        return LoadLevel.NORMAL
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying."""
+        base = settings.ADMISSION_RETRY_AFTER
+        return base * 2 if self.level() is LoadLevel.SHEDDING else base
+
+    async def acquire(self, kind: str, wait: bool = True) -> None:
+        """
+        Take a slot for new work.
+
+        Args:
+            kind: "session", "upload" or "transcode"
+            wait: Queue for up to ADMISSION_QUEUE_TIMEOUT seconds instead of failing fast
+
+        Raises:
+            AdmissionRejected: If the server is shedding load or no slot frees up in time
+        """
+        if self.level() is LoadLevel.SHEDDING:
+            self.rejected[kind] += 1
+            raise AdmissionRejected(kind, self.retry_after(), "server overloaded")
+
+        slots = self._slots[kind]
+        if not wait and slots.locked():
+            self.rejected[kind] += 1
+            raise AdmissionRejected(kind, self.retry_after(), f"{kind} limit reached")
+
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=settings.ADMISSION_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.rejected[kind] += 1
+            raise AdmissionRejected(kind, self.retry_after(), f"timed out waiting for a {kind} slot")
+        self.active[kind] += 1
+
+    def release(self, kind: str) -> None:
+        """Return a slot taken with acquire()."""
+        self.active[kind] -= 1
+        self._slots[kind].release()
+
+    @asynccontextmanager
+    async def admit(self, kind: str, wait: bool = True) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block (see acquire)."""
+        await self.acquire(kind, wait)
+        try:
+            yield
+        finally:
+            self.release(kind)
+
+    @contextmanager
+    def track(self, kind: str) -> Iterator[None]:
+        """Count an STT or LLM job as in flight for the duration of the block."""
+        self.inflight[kind] += 1
+        try:
+            yield
+        finally:
+            self.inflight[kind] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": self.level().value,
+            "loop_lag_ms": round(self.loop_lag * 1000, 2),
+            "inflight": dict(self.inflight),
+            "active": dict(self.active),
+            "limits": dict(self.limits),
+            "rejected": dict(self.rejected),
+        }
@@ -0,0 +1,247 @@
+import asyncio
+import glob
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for all threads of the running process.
+
+    A background thread wakes up every `interval` seconds, reads the current
+    frame of every other thread with sys._current_frames() and counts the
+    stack. Nothing is instrumented, so the cost is one stack walk per thread
+    per sample and the profiled code runs at full speed in between.
+    Results are returned in the collapsed format ("a;b;c count") read by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            max_depth: Frames kept per stack (innermost first are dropped last)
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        # Wall-clock seconds sampled, set when the profiler stops
+        self.elapsed = 0.0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.elapsed = time.monotonic() - self._started
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        # Collapsed stacks go from the root to the leaf; ';' separates frames
+        return ";".join(name.replace(";", ":") for name in reversed(frames))
+
+    def collapsed(self) -> str:
+        """Get the profile as collapsed stacks, most frequent first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+def _await_chain(task: asyncio.Task) -> List[Dict[str, Any]]:
+    """Follow the coroutines a task is suspended in, outermost first."""
+    chain = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        chain.append({
+            "function": coro.__qualname__,
+            "file": os.path.basename(frame.f_code.co_filename),
+            "line": frame.f_lineno,
+        })
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None)
+    return chain
+
+
+def _describe(frame: Dict[str, Any]) -> str:
+    return f"{frame['function']} ({frame['file']}:{frame['line']})"
+
+
+def dump_tasks() -> Dict[str, Any]:
+    """
+    Describe every asyncio task of the running loop.
+
+    Journaling pipeline workers are named "journaling:<session>:<stage>:<i>"
+    (see Pipeline), so they are also grouped per session with the point each
+    stage is suspended at. A stage suspended in Queue.get is idle; anything
+    else means it is blocked on work (STT, LLM, a full downstream queue, ...).
+
+    Returns:
+        Dict with "tasks" (all tasks) and "sessions" (per-session stage states)
+    """
+    tasks = []
+    sessions: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+
+    for task in asyncio.all_tasks():
+        chain = _await_chain(task)
+        innermost = chain[-1] if chain else None
+        waiting_for_input = (
+            innermost is not None
+            and innermost["file"] == "queues.py"
+            and innermost["function"].endswith("get")
+            and len(chain) >= 2
+            and chain[-2]["function"].endswith("_stage")
+        )
+        info = {
+            "name": task.get_name(),
+            "coroutine": task.get_coro().__qualname__,
+            "done": task.done(),
+            "state": "idle" if waiting_for_input else "blocked",
+            "awaiting": chain,
+        }
+        tasks.append(info)
+
+        parts = task.get_name().split(":")
+        if len(parts) == 4 and parts[0] == "journaling":
+            _, session_id, stage, worker = parts
+            sessions[session_id][stage].append({
+                "worker": int(worker),
+                "state": info["state"],
+                # Line of the stage loop that is waiting, and the innermost call it waits in
+                "at": _describe(chain[0]) if chain else None,
+                "awaiting": _describe(innermost) if innermost else None,
+            })
+
+    return {
+        "count": len(tasks),
+        "tasks": sorted(tasks, key=lambda t: t["name"]),
+        "sessions": {session_id: dict(stages) for session_id, stages in sessions.items()},
+    }
+
+
+async def memory_diff(seconds: float, top: int = 25, frames: int = 5) -> Dict[str, Any]:
+    """
+    Compare tracemalloc snapshots taken `seconds` apart.
+
+    Tracing is only enabled for the measured interval (unless it was already
+    on), so the allocation-tracking overhead is bounded by the request.
+
+    Args:
+        seconds: Interval between the two snapshots
+        top: Number of allocation sites to report
+        frames: Traceback depth recorded per allocation
+
+    Returns:
+        Dict with the top growing allocation sites, traced totals and
+        temp-file/descriptor counts (leaked temp audio shows up there)
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        files_before = _temp_files()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), "traceback")
+    files_after = _temp_files()
+
+    return {
+        "seconds": seconds,
+        "traced_bytes": current,
+        "traced_peak_bytes": peak,
+        "top": [
+            {
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "traceback": stat.traceback.format(),
+            }
+            for stat in stats[:top]
+        ],
+        "temp_files": {
+            "before": len(files_before),
+            "after": len(files_after),
+            "bytes": sum(_file_size(path) for path in files_after),
+            "new": sorted(set(files_after) - set(files_before))[:50],
+        },
+        "open_fds": _open_fds(),
+    }
+
+
+def _temp_files() -> List[str]:
+    # Upload, stream and job temp files are written to the working directory
+    return glob.glob("temp_*")
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+async def profile_cpu(seconds: float, interval: float) -> SamplingProfiler:
+    """
+    Sample all threads for `seconds` while the event loop keeps serving requests.
+
+    Args:
+        seconds: Profile duration
+        interval: Seconds between samples
+
+    Returns:
+        The stopped profiler
+    """
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        await asyncio.to_thread(profiler.stop)
+    return profiler
@@ -0,0 +1,365 @@
+import asyncio
+import datetime
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.admission import AdmissionController, LoadLevel
+from app.services.llm_service import LLMService
+from app.services.scheduler import ANONYMOUS_USER, Priority
+from app.services.session_archive import SessionArchiveService
+from app.services.session_store import SessionStore
+
+ENTRY_PROMPT = """
+You are reviewing private voice journal entries. For each entry, write a one or two sentence summary in the second person, one lowercase word for the mood, and up to five short lowercase topic tags.
+Answer with JSON only, exactly in the form {{"entries": [{{"id": 1, "summary": "...", "mood": "...", "topics": ["..."]}}]}}, with one object per entry and the ids given below.
+
+{entries}
+"""
+
+WEEKLY_PROMPT = """
+You are a supportive journaling coach. These are summaries of one person's journal entries from the week of {week}. Write a short reflection (max 120 words) on recurring themes, how their mood moved through the week, and one gentle question to think about next week.
+
+{summaries}
+"""
+
+# Seconds between load checks while live traffic has priority
+BUSY_POLL_INTERVAL = 5.0
+
+
+@dataclass
+class InsightRunStats:
+    """Counters of one insight run."""
+    entries: int = 0
+    already_done: int = 0
+    unfinished: int = 0
+    empty: int = 0
+    failed: int = 0
+    requests: int = 0
+    tokens: int = 0
+    weekly: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "entries": self.entries,
+            "already_done": self.already_done,
+            "unfinished": self.unfinished,
+            "empty": self.empty,
+            "failed": self.failed,
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "weekly": self.weekly,
+            "seconds": round(elapsed, 1),
+            "entries_per_sec": round(self.entries / elapsed, 3) if elapsed > 0 else 0.0,
+            "tokens_per_sec": round(self.tokens / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class InsightRunner:
+    """
+    Enriches archived journal sessions with summaries, mood and topic tags,
+    and writes weekly reflections per user.
+
+    Sessions are streamed from the archive one at a time and grouped into
+    batches, so several entries share one LLM request; a bounded queue feeds
+    a fixed number of request workers. Every finished entry is appended to
+    entries.jsonl right away, and entries already in that file are skipped,
+    so an interrupted run resumes where it stopped. Sessions that have not
+    ended yet are left for a later run, since their transcript is still
+    growing (and a checkpointed entry is never redone). Requests go through the
+    LLM service with BULK priority, so in the server live sessions overtake
+    them, and the runner pauses while the server is degraded.
+    """
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        archive_service: SessionArchiveService,
+        output_dir: str,
+        batch_size: int = 4,
+        concurrency: int = 1,
+        admission: Optional[AdmissionController] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            llm_service: Service the LLM requests go through
+            archive_service: Archive the journal sessions are read from
+            output_dir: Directory of entries.jsonl and weekly.jsonl (also the checkpoint)
+            batch_size: Entries per LLM request
+            concurrency: LLM requests in flight
+            admission: Server admission controller; batches wait while it is not NORMAL
+            session_store: Store of the server's live and resumable sessions, which are skipped
+        """
+        self.llm_service = llm_service
+        self.archive_service = archive_service
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.admission = admission
+        self.session_store = session_store
+        self.entries_path = os.path.join(output_dir, "entries.jsonl")
+        self.weekly_path = os.path.join(output_dir, "weekly.jsonl")
+        os.makedirs(output_dir, exist_ok=True)
+
+    async def run(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        weekly: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Enrich every unprocessed session in a time range, then write missing weekly reflections.
+
+        Args:
+            since: Only sessions started at or after this Unix time (None: the whole backlog)
+            until: Only sessions started before this Unix time
+            weekly: Also write reflections for finished weeks
+
+        Returns:
+            Run statistics, including entries/sec and tokens/sec
+        """
+        stats = InsightRunStats()
+        done = _read_keys(self.entries_path, lambda record: record["session_id"])
+        print(f"Insights: {len(done)} entries already done, batch size {self.batch_size}, concurrency {self.concurrency}")
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        with open(self.entries_path, "a") as output:
+            workers = [
+                asyncio.create_task(self._entry_worker(batches, output, stats), name=f"insights:entries:{i}")
+                for i in range(self.concurrency)
+            ]
+            try:
+                await self._produce(batches, done, since, until, stats)
+                for _ in workers:
+                    await batches.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        if weekly:
+            await self._write_weekly(stats)
+
+        report = stats.to_dict()
+        print(
+            f"Insights done: {report['entries']} entries, {report['weekly']} weekly reflections, "
+            f"{report['failed']} failed in {report['seconds']}s "
+            f"({report['entries_per_sec']} entries/s, {report['tokens_per_sec']} tokens/s)"
+        )
+        return report
+
+    async def _produce(
+        self,
+        batches: asyncio.Queue,
+        done: Set[str],
+        since: Optional[float],
+        until: Optional[float],
+        stats: InsightRunStats,
+    ) -> None:
+        # Directory listing and transcript reads stay off the event loop
+        sessions = self.archive_service.sessions(since, until)
+        batch: List[Dict[str, Any]] = []
+        while True:
+            meta = await asyncio.to_thread(next, sessions, None)
+            if meta is None:
+                break
+            if meta["session_id"] in done:
+                stats.already_done += 1
+                continue
+            if not self._finished(meta):
+                stats.unfinished += 1
+                continue
+            text = await asyncio.to_thread(self.archive_service.transcript, meta["session_id"])
+            if not text.strip():
+                stats.empty += 1
+                continue
+            batch.append({**meta, "text": text[:settings.INSIGHTS_MAX_ENTRY_CHARS]})
+            if len(batch) >= self.batch_size:
+                await batches.put(batch)
+                batch = []
+        if batch:
+            await batches.put(batch)
+
+    def _finished(self, meta: Dict[str, Any]) -> bool:
+        """Whether a session has ended, so its transcript is complete."""
+        if self.session_store is not None and meta["session_id"] in self.session_store:
+            return False
+        if meta.get("ended") is not None:
+            return True
+        # Sessions open when the server died are never marked ended
+        return time.time() - meta.get("started", 0.0) >= settings.INSIGHTS_UNFINISHED_AFTER
+
+    async def _entry_worker(self, batches: asyncio.Queue, output, stats: InsightRunStats) -> None:
+        while True:
+            batch = await batches.get()
+            if batch is None:
+                return
+            await self._wait_for_quiet()
+            for record in await self._enrich(batch, stats):
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                stats.entries += 1
+                if stats.entries % 25 == 0:
+                    report = stats.to_dict()
+                    print(f"Insights: {report['entries']} entries ({report['entries_per_sec']}/s, {report['tokens_per_sec']} tokens/s)")
+
+    async def _enrich(self, batch: List[Dict[str, Any]], stats: InsightRunStats) -> List[Dict[str, Any]]:
+        """Enrich a batch in one request; entries the model skipped or mangled are retried one by one."""
+        entries = "\n\n".join(f"Entry {i}:\n{entry['text']}" for i, entry in enumerate(batch, start=1))
+        parsed: Dict[int, Dict[str, Any]] = {}
+        try:
+            reply = await self.llm_service.generate_async(
+                ENTRY_PROMPT.format(entries=entries),
+                json_format=True,
+                priority=Priority.BULK,
+                user_id=settings.INSIGHTS_USER_ID,
+            )
+            stats.requests += 1
+            stats.tokens += reply["eval_count"]
+            parsed = _parse_entries(reply["response"])
+        except Exception as e:
+            print(f"Insight request for {len(batch)} entries failed: {e}")
+
+        records, missing = [], []
+        for i, entry in enumerate(batch, start=1):
+            item = parsed.get(i)
+            if item is None:
+                missing.append(entry)
+                continue
+            records.append({
+                "session_id": entry["session_id"],
+                "user_id": entry.get("user_id") or ANONYMOUS_USER,
+                "date": datetime.date.fromtimestamp(entry["started"]).isoformat(),
+                **item,
+            })
+
+        if missing and len(batch) > 1:
+            for entry in missing:
+                records.extend(await self._enrich([entry], stats))
+        elif missing:
+            # Left out of the checkpoint, so the next run tries again
+            stats.failed += 1
+            print(f"Insights for session {missing[0]['session_id']} failed")
+        return records
+
+    async def _write_weekly(self, stats: InsightRunStats) -> None:
+        """Write a reflection for every finished (user, ISO week) that has entries but none yet."""
+        done = _read_keys(self.weekly_path, lambda record: f"{record['user_id']}:{record['week']}")
+        this_week = _iso_week(datetime.date.today())
+
+        summaries: Dict[str, List[str]] = defaultdict(list)
+        if os.path.exists(self.entries_path):
+            with open(self.entries_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    week = _iso_week(datetime.date.fromisoformat(record["date"]))
+                    key = f"{record['user_id']}:{week}"
+                    if week < this_week and key not in done:
+                        summaries[key].append(f"- ({record['date']}, {record['mood']}) {record['summary']}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with open(self.weekly_path, "a") as output:
+
+            async def reflect(key: str, lines: List[str]) -> None:
+                user_id, week = key.rsplit(":", 1)
+                async with semaphore:
+                    await self._wait_for_quiet()
+                    try:
+                        reply = await self.llm_service.generate_async(
+                            WEEKLY_PROMPT.format(week=week, summaries="\n".join(lines)),
+                            priority=Priority.BULK,
+                            user_id=settings.INSIGHTS_USER_ID,
+                        )
+                    except Exception as e:
+                        stats.failed += 1
+                        print(f"Weekly reflection for {key} failed: {e}")
+                        return
+                stats.requests += 1
+                stats.tokens += reply["eval_count"]
+                stats.weekly += 1
+                record = {"user_id": user_id, "week": week, "entries": len(lines), "reflection": reply["response"]}
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+            await asyncio.gather(*(reflect(key, lines) for key, lines in summaries.items()))
+
+    async def _wait_for_quiet(self) -> None:
+        while self.admission is not None and self.admission.level() is not LoadLevel.NORMAL:
+            await asyncio.sleep(BUSY_POLL_INTERVAL)
+
+
+async def run_daily(runner: InsightRunner, at: str) -> None:
+    """
+    Run the insights every day at a local time (e.g. "03:00") until cancelled.
+
+    Each run processes whatever is outstanding, so a missed day is caught up
+    by the next one.
+
+    Args:
+        runner: Runner to use
+        at: Local time of day as HH:MM
+    """
+    hour, minute = (int(part) for part in at.split(":"))
+    while True:
+        now = datetime.datetime.now()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += datetime.timedelta(days=1)
+        print(f"Next insights run at {next_run:%Y-%m-%d %H:%M}")
+        await asyncio.sleep((next_run - now).total_seconds())
+        try:
+            await runner.run()
+        except Exception as e:
+            print(f"Insights run failed: {e}")
+
+
+def _parse_entries(response: str) -> Dict[int, Dict[str, Any]]:
+    """Map entry id to its fields, keeping only well-formed items."""
+    data = json.loads(response)
+    items = data.get("entries", []) if isinstance(data, dict) else data
+    parsed = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or not isinstance(item.get("summary"), str):
+            continue
+        try:
+            entry_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        topics = item.get("topics")
+        parsed[entry_id] = {
+            "summary": item["summary"].strip(),
+            "mood": str(item.get("mood") or "").strip().lower(),
+            "topics": [str(topic).strip().lower() for topic in topics][:5] if isinstance(topics, list) else [],
+        }
+    return parsed
+
+
+def _read_keys(path: str, key) -> Set[str]:
+    """Keys of the records already in a JSONL output file (the run checkpoint)."""
+    keys: Set[str] = set()
+    if not os.path.exists(path):
+        return keys
+    with open(path) as f:
+        for line in f:
+            try:
+                keys.add(key(json.loads(line)))
+            except (ValueError, KeyError):
+                # A line cut off by a crash; that entry is simply redone
+                continue
+    return keys
+
+
+def _iso_week(date: datetime.date) -> str:
+    year, week, _ = date.isocalendar()
+    return f"{year}-W{week:02d}"
@@ -0,0 +1,341 @@
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import secrets
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple, Union
+
+from app.core.config import settings
+from app.services.scheduler import Priority
+from app.utils.job_protocol import HELLO_MAX_BYTES, pack_message, read_message
+
+JobHandler = Callable[..., Union[Any, Awaitable[Any]]]
+
+
+class JobError(Exception):
+    """Raised when a job fails, times out or cannot be delivered to a worker."""
+
+
+class JobQueue(Protocol):
+    name: str
+    # True if handlers run in this process and can read local files
+    local: bool
+
+    async def submit(self, kind: str, payload: Dict[str, Any], priority: Priority = Priority.INTERACTIVE) -> Any:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class InProcessJobQueue:
+    """Runs jobs directly in this process; async handlers are awaited, sync ones use the thread pool."""
+
+    local = True
+
+    def __init__(self, name: str, handlers: Dict[str, JobHandler]):
+        """
+        Initialize the queue.
+
+        Args:
+            name: Queue name used in metrics
+            handlers: Job kind to handler; each handler takes the payload as keyword arguments
+        """
+        self.name = name
+        self.handlers = handlers
+        self.completed: Dict[str, int] = defaultdict(int)
+        self.failed: Dict[str, int] = defaultdict(int)
+
+    async def submit(self, kind: str, payload: Dict[str, Any], priority: Priority = Priority.INTERACTIVE) -> Any:
+        """
+        Run a job and return its result.
+
+        Args:
+            kind: Job kind, e.g. "stt", "stt_batch" or "llm"
+            payload: Keyword arguments for the handler
+            priority: Ignored; callers are already ordered by the inference scheduler
+
+        Returns:
+            Handler result
+
+        Raises:
+            JobError: If no handler is registered for the kind
+        """
+        handler = self.handlers.get(kind)
+        if handler is None:
+            raise JobError(f"No handler for job kind '{kind}'")
+
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                result = await handler(**payload)
+            else:
+                result = await asyncio.to_thread(handler, **payload)
+        except Exception:
+            self.failed[kind] += 1
+            raise
+        self.completed[kind] += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "inprocess",
+            "completed": dict(self.completed),
+            "failed": dict(self.failed),
+        }
+
+
+@dataclass
+class _Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: Priority
+    future: asyncio.Future
+    attempts: int = 0
+    # Worker running the job, None while it is pending
+    worker: Optional[str] = None
+
+
+@dataclass
+class _WorkerConnection:
+    name: str
+    writer: asyncio.StreamWriter
+    kinds: List[str]
+    capacity: int
+    inflight: Dict[str, _Job] = field(default_factory=dict)
+
+
+class BrokerJobQueue:
+    """
+    Networked job queue: remote workers connect over TCP and pull jobs.
+
+    The frontend process listens on a port; each worker (`python -m app.worker`)
+    connects, announces the job kinds it can run and how many jobs it takes at
+    once, and returns results over the same connection. Pending jobs are handed
+    out by priority, then submission order, to the least loaded worker that
+    supports the kind. Jobs of a worker that disconnects are requeued up to
+    JOB_MAX_ATTEMPTS times.
+
+    Workers receive users' audio and transcripts and their results are
+    trusted, so a worker's hello must carry the shared token; without a
+    token the broker only listens on localhost. A worker on localhost is
+    the local stand-in for the networked setup.
+    """
+
+    local = False
+
+    def __init__(self, host: str, port: int, name: str = "broker", token: Optional[str] = None):
+        """
+        Initialize the broker.
+
+        Args:
+            host: Interface to listen on for workers
+            port: Port to listen on for workers
+            name: Queue name used in metrics
+            token: Shared secret workers must send in their hello (required unless host is loopback)
+        """
+        self.name = name
+        self.host = host
+        self.port = port
+        self.token = token
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._pending: List[Tuple[int, int, _Job]] = []
+        self._sequence = itertools.count()
+        self._workers: Dict[str, _WorkerConnection] = {}
+
+        self.completed: Dict[str, int] = defaultdict(int)
+        self.failed: Dict[str, int] = defaultdict(int)
+        self.requeued = 0
+
+    async def start(self) -> None:
+        """
+        Start accepting worker connections.
+
+        Raises:
+            RuntimeError: If the broker would listen beyond localhost without a token
+        """
+        if not self.token and not _is_loopback(self.host):
+            raise RuntimeError(f"Job broker on {self.host} needs JOB_BROKER_TOKEN; refusing unauthenticated workers")
+        self._server = await asyncio.start_server(self._handle_worker, self.host, self.port)
+        print(f"Job broker listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop accepting workers, disconnect them and fail all outstanding jobs."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        for worker in list(self._workers.values()):
+            worker.writer.close()
+            for job in worker.inflight.values():
+                self._fail(job, JobError("Broker shut down"))
+        self._workers.clear()
+
+        for _, _, job in self._pending:
+            self._fail(job, JobError("Broker shut down"))
+        self._pending.clear()
+
+    async def submit(self, kind: str, payload: Dict[str, Any], priority: Priority = Priority.INTERACTIVE) -> Any:
+        """
+        Queue a job for the workers and wait for its result.
+
+        Args:
+            kind: Job kind, e.g. "stt", "stt_batch" or "llm"
+            payload: Keyword arguments for the worker-side handler
+            priority: Jobs with a lower value are handed out first
+
+        Returns:
+            Result returned by the worker
+
+        Raises:
+            JobError: If the job fails, no worker finishes it within JOB_TIMEOUT,
+                or the broker shuts down
+        """
+        job = _Job(uuid.uuid4().hex, kind, payload, priority, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._pending, (int(priority), next(self._sequence), job))
+        self._dispatch()
+
+        try:
+            return await asyncio.wait_for(job.future, timeout=settings.JOB_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.failed[kind] += 1
+            raise JobError(f"{kind} job timed out after {settings.JOB_TIMEOUT}s")
+        finally:
+            self._forget(job)
+
+    def _forget(self, job: _Job) -> None:
+        """Drop a job nobody waits for anymore from the pending queue or its worker's slots."""
+        if job.worker is None:
+            before = len(self._pending)
+            self._pending = [entry for entry in self._pending if entry[2] is not job]
+            if len(self._pending) != before:
+                heapq.heapify(self._pending)
+            return
+
+        worker = self._workers.get(job.worker)
+        if worker is not None and worker.inflight.pop(job.id, None) is not None:
+            # Tell the worker to stop; a late result for the id is ignored anyway
+            worker.writer.write(pack_message({"type": "cancel", "id": job.id}))
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand pending jobs to workers with free capacity."""
+        if not self._pending or not self._workers:
+            return
+
+        waiting: List[Tuple[int, int, _Job]] = []
+        while self._pending:
+            entry = heapq.heappop(self._pending)
+            job = entry[2]
+            if job.future.done():
+                # Timed out or cancelled while queued
+                continue
+
+            candidates = [
+                w for w in self._workers.values()
+                if job.kind in w.kinds and len(w.inflight) < w.capacity
+            ]
+            if not candidates:
+                waiting.append(entry)
+                continue
+
+            worker = min(candidates, key=lambda w: len(w.inflight) / w.capacity)
+            job.attempts += 1
+            job.worker = worker.name
+            worker.inflight[job.id] = job
+            worker.writer.write(pack_message({"type": "job", "id": job.id, "kind": job.kind}, job.payload))
+
+        for entry in waiting:
+            heapq.heappush(self._pending, entry)
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        worker: Optional[_WorkerConnection] = None
+        try:
+            # The peer is unknown until the hello is checked, so that frame is small and must arrive quickly
+            hello, _ = await asyncio.wait_for(read_message(reader, HELLO_MAX_BYTES), timeout=10.0)
+            if hello.get("type") != "hello":
+                return
+            token = hello.get("token")
+            if not isinstance(token, str) or not secrets.compare_digest(token.encode(), (self.token or "").encode()):
+                print(f"Rejected worker connection from {peer}: bad token")
+                return
+
+            worker = _WorkerConnection(
+                name=f"{hello.get('name', 'worker')}@{peer[0]}:{peer[1]}" if peer else hello.get("name", "worker"),
+                writer=writer,
+                kinds=list(hello.get("kinds", [])),
+                capacity=max(1, int(hello.get("capacity", 1))),
+            )
+            self._workers[worker.name] = worker
+            print(f"Worker {worker.name} connected (kinds={worker.kinds}, capacity={worker.capacity})")
+            self._dispatch()
+
+            while True:
+                message, result = await read_message(reader)
+                job = worker.inflight.pop(message.get("id"), None)
+                if job is not None:
+                    if message["type"] == "result":
+                        self.completed[job.kind] += 1
+                        if not job.future.done():
+                            job.future.set_result(result)
+                    else:
+                        self._fail(job, JobError(message.get("error", "Worker error")))
+                self._dispatch()
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            print(f"Worker connection {peer} failed: {e}")
+        finally:
+            writer.close()
+            if worker is not None:
+                self._workers.pop(worker.name, None)
+                print(f"Worker {worker.name} disconnected")
+                self._requeue(worker)
+                self._dispatch()
+
+    def _requeue(self, worker: _WorkerConnection) -> None:
+        """Put the jobs of a lost worker back in the queue, or fail them after too many attempts."""
+        for job in worker.inflight.values():
+            if job.future.done():
+                continue
+            if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                self._fail(job, JobError(f"{job.kind} job lost with worker {worker.name}"))
+                continue
+            self.requeued += 1
+            job.worker = None
+            heapq.heappush(self._pending, (int(job.priority), next(self._sequence), job))
+        worker.inflight.clear()
+
+    def _fail(self, job: _Job, error: Exception) -> None:
+        self.failed[job.kind] += 1
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "broker",
+            "workers": {
+                w.name: {"kinds": w.kinds, "capacity": w.capacity, "inflight": len(w.inflight)}
+                for w in self._workers.values()
+            },
+            "pending": len(self._pending),
+            "completed": dict(self.completed),
+            "failed": dict(self.failed),
+            "requeued": self.requeued,
+        }
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
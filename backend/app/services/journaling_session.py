@@ -1,125 +1,508 @@
 import asyncio
-from typing import AsyncGenerator, Dict, Any
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Deque, Dict, Any, List, Optional, Union
 
+import numpy as np
 from app.core.config import settings
+from app.services.admission import AdmissionController, LoadLevel
+from app.services.scheduler import ANONYMOUS_USER, Priority
+from app.services.session_archive import SessionArchive, SessionArchiveService
 from app.services.vad_service import VADService
 from app.services.stt_service import STTService
 from app.services.llm_service import LLMService
-from app.utils.audio_buffer import AudioBufferManager
-from app.utils.audio_file import AudioFileHandler
+from app.utils.audio_frontend import AudioFrontend, SampleBuffer
+from app.utils.pipeline import Pipeline
 from app.utils.silence_detector import SilenceDetector
-from app.utils.transcription_filter import TranscriptionFilter
+from app.utils.transcription_filter import FilterStats, TranscriptionFilter
+from app.utils.transcript_stitcher import TranscriptStitcher
+from app.utils.turn_detector import TurnDetector
+from app.utils.utterance_splitter import UtteranceSplitter
+
+
+@dataclass
+class SpeechSegment:
+    """A closed utterance handed from the segmenter to the STT stage."""
+    seq: int
+    # Mono float32 samples at SAMPLE_RATE, shared by STT and the archive (read-only)
+    audio: np.ndarray
+    # True if the audio starts with the overlap of a forced cut of the previous segment
+    continues_previous: bool = False
+    # Position of the first speech chunk in the session's audio (seconds)
+    start: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / settings.SAMPLE_RATE
+
+
+@dataclass
+class SegmentTranscript:
+    """STT result for a segment (empty text if transcription failed)."""
+    seq: int
+    text: str
+    duration: float
+    continues_previous: bool = False
+    # Whisper confidence scores, used to reject hallucinated text
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class TurnEnd:
+    """Long pause marker; the turn ends once segment `last_seq` is transcribed."""
+    last_seq: int
 
 
 class JournalingSession:
-    """Manages a journaling session with audio processing, transcription, and question generation."""
-    
-    def __init__(self, stt_service: STTService, vad_service: VADService, llm_service: LLMService):
-        """Initialize the journaling session with utility components."""
+    """
+    Manages a journaling session with audio processing, transcription, and question generation.
+
+    Audio flows through a pipeline of stages connected by async queues:
+    VAD -> segmenter -> STT -> aggregator -> LLM. Every stage runs as its own
+    task, so new utterances keep being detected and transcribed while a
+    question is still being generated.
+
+    The session outlives its websocket: `received_bytes` is the offset of the
+    audio accepted so far (acknowledged to the client with "ack" events), so a
+    reconnecting client only re-sends audio past that offset.
+    """
+
+    def __init__(
+        self,
+        stt_service: STTService,
+        vad_service: VADService,
+        llm_service: LLMService,
+        admission: Optional[AdmissionController] = None,
+        user_id: str = ANONYMOUS_USER,
+        archive_service: Optional[SessionArchiveService] = None,
+        filter_stats: Optional[FilterStats] = None,
+        input_sample_rate: Optional[int] = None,
+        input_channels: int = 1,
+    ):
+        """
+        Initialize the journaling session with utility components.
+
+        The client sends interleaved 16-bit PCM at input_sample_rate (default
+        SAMPLE_RATE) with input_channels channels; it is converted once to mono
+        float32 at SAMPLE_RATE for every later stage.
+        """
         # Calculate chunk size based on VAD interval
-        chunk_size = int(settings.VAD_INTERVAL * settings.SAMPLE_RATE * 2)
-        
+        self.chunk_samples = int(settings.VAD_INTERVAL * settings.SAMPLE_RATE)
+
         # Initialize utility components
-        self.buffer_manager = AudioBufferManager(chunk_size)
-        self.audio_handler = AudioFileHandler(settings.SAMPLE_RATE)
-        self.silence_detector = SilenceDetector()
-        self.transcription_filter = TranscriptionFilter()
+        self.frontend = AudioFrontend(
+            input_sample_rate or settings.SAMPLE_RATE,
+            input_channels,
+            settings.SAMPLE_RATE,
+            settings.AUDIO_RESAMPLER_TAPS,
+        )
+        self._vad_pending = np.zeros(0, dtype=np.float32)
+        # Silence is measured in audio time: resumed or buffered audio arrives in bursts
+        self.silence_detector = SilenceDetector(clock=lambda: self._processed_samples / settings.SAMPLE_RATE)
+        self.transcription_filter = TranscriptionFilter(
+            phrases=settings.FILTER_HALLUCINATION_PHRASES,
+            no_speech_threshold=settings.FILTER_NO_SPEECH_THRESHOLD,
+            logprob_threshold=settings.FILTER_LOGPROB_THRESHOLD,
+            compression_ratio_threshold=settings.FILTER_COMPRESSION_RATIO_THRESHOLD,
+            max_ngram_repeats=settings.FILTER_MAX_NGRAM_REPEATS,
+            stats=filter_stats,
+        )
+        self.utterance_splitter = UtteranceSplitter(
+            max_samples=int(settings.MAX_UTTERANCE_DURATION * settings.SAMPLE_RATE),
+            search_samples=int(settings.UTTERANCE_CUT_SEARCH * settings.SAMPLE_RATE),
+            overlap_samples=int(settings.UTTERANCE_OVERLAP * settings.SAMPLE_RATE),
+            frame_samples=self.chunk_samples,
+        )
+        self.transcript_stitcher = TranscriptStitcher()
         self.stt_service = stt_service
         self.vad_service = vad_service
         self.llm_service = llm_service
-        
+        self.admission = admission
+        self.user_id = user_id
+        self.energy_gate = vad_service.create_energy_gate()
+        self.turn_detector = TurnDetector(
+            base_pause=settings.VAD_PAUSE_THRESHOLD,
+            base_turn_end=settings.POST_SPEAKING_SILENCE_THRESHOLD,
+            min_silence=settings.TURN_MIN_SILENCE,
+            max_silence=settings.TURN_MAX_SILENCE,
+            reference_rate=settings.TURN_REFERENCE_SPEECH_RATE,
+            weights=settings.TURN_WEIGHTS,
+        )
+
         # Session state
-        self.speech_buffer = bytearray()
+        self.session_id = uuid.uuid4().hex
+        self.received_bytes = 0
+        self._acked_bytes = 0
+        # Offsets and acks count the client's bytes, whatever its format
+        self._ack_interval = int(settings.SESSION_ACK_INTERVAL * self.frontend.bytes_per_second)
+        # Events taken from the queue but not delivered because the connection dropped
+        self._undelivered: Deque[Dict[str, Any]] = deque()
+        self.speech_buffer = SampleBuffer(int(settings.MAX_UTTERANCE_DURATION * settings.SAMPLE_RATE))
+        # Samples of audio classified so far, and where the current speech buffer starts
+        self._processed_samples = 0
+        self._speech_start_samples = 0
         self.accumulated_transcription = ""
+        # Questions asked so far; a cached question is never repeated within a session
+        self.asked_questions: set[str] = set()
+        self._next_segment_seq = 0
+        self._continues_previous = False
+        # Silence thresholds used by the segmenter, updated by the aggregator
+        self.turn_decision = self.turn_detector.default_decision()
+
+        # Stage queues
+        queue_size = settings.PIPELINE_QUEUE_SIZE
+        self.audio_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=queue_size)
+        self.vad_queue: asyncio.Queue[tuple[np.ndarray, bool]] = asyncio.Queue(maxsize=queue_size)
+        self.stt_queue: asyncio.Queue[SpeechSegment] = asyncio.Queue(maxsize=queue_size)
+        self.aggregator_queue: asyncio.Queue[Union[SegmentTranscript, TurnEnd]] = asyncio.Queue()
+        self.llm_queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        # None entries only wake up events() after a redelivery
+        self.event_queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue()
+        # None is the sentinel that lets the archive stage drain and return on close
+        self.archive_queue: asyncio.Queue[Union[SpeechSegment, SegmentTranscript, None]] = asyncio.Queue()
 
-    async def process_audio(self, data: bytes) -> AsyncGenerator[Dict[str, Any], None]:
+        self.archive: Optional[SessionArchive] = None
+        if archive_service is not None:
+            self.archive = archive_service.open(self.session_id, self.user_id)
+
+        self.pipeline: Optional[Pipeline] = None
+
+    def start(self) -> None:
+        """Start the pipeline stage workers. Must be called from a running event loop."""
+        if self.pipeline is not None:
+            return
+        # Task names carry the session id so task dumps can be read per session
+        self.pipeline = Pipeline(f"journaling:{self.session_id}")
+        self.pipeline.add_stage("vad", self._vad_stage)
+        self.pipeline.add_stage("segmenter", self._segmenter_stage)
+        self.pipeline.add_stage("stt", self._stt_stage, settings.PIPELINE_STT_CONCURRENCY)
+        self.pipeline.add_stage("aggregator", self._aggregator_stage)
+        self.pipeline.add_stage("llm", self._llm_stage, settings.PIPELINE_LLM_CONCURRENCY)
+        if self.archive is not None:
+            self.pipeline.add_stage("archive", self._archive_stage)
+
+    async def close(self) -> None:
+        """
+        Stop all pipeline stages.
+
+        Speech still in the buffer and every queued archive item are written
+        before the archive files are closed; other in-flight work
+        (transcriptions, questions) is dropped.
+        """
+        if self.pipeline is not None:
+            # Stop the stages that produce segments, so the speech buffer no longer changes
+            await self.pipeline.stop("vad", "segmenter")
+            if self.archive is not None:
+                await self._archive_remaining_speech()
+                await self.archive_queue.put(None)
+                await self.pipeline.join("archive")
+            await self.pipeline.stop()
+            self.pipeline = None
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    async def feed(self, data: bytes) -> None:
         """
-        Process incoming audio data and yield events.
-        
+        Queue incoming audio data for processing.
+
         Args:
             data: Raw audio bytes from the client
-        
+        """
+        await self.audio_queue.put(data)
+        self.received_bytes += len(data)
+        if self.received_bytes - self._acked_bytes >= self._ack_interval:
+            self._acked_bytes = self.received_bytes
+            await self.event_queue.put({"type": "ack", "offset": self.received_bytes})
+
+    async def events(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Yield events produced by the pipeline as they become available.
+
         Yields:
             Dict containing event type and data (vad, transcription, or question)
         """
-        self.buffer_manager.add_data(data)
+        while True:
+            if not self._undelivered:
+                event = await self.event_queue.get()
+                if event is None:
+                    continue
+                if not self._undelivered:
+                    yield event
+                    continue
+                # Events put back while we waited were taken from the queue earlier
+                self._undelivered.append(event)
+            yield self._undelivered.popleft()
 
-        # Process chunks of specific size for VAD
-        while self.buffer_manager.has_chunk():
-            chunk = self.buffer_manager.get_chunk()
-            is_speech_chunk = self.vad_service.is_speech(chunk)
+    def redeliver(self, event: Dict[str, Any]) -> None:
+        """
+        Put back an event that could not be sent, so the next connection gets it first.
+
+        Redelivered events go ahead of everything still queued, also when
+        events() is already waiting on the queue for another connection.
+
+        Args:
+            event: Event yielded by events() whose delivery failed
+        """
+        self._undelivered.appendleft(event)
+        self.event_queue.put_nowait(None)
+
+    async def _vad_stage(self) -> None:
+        """Convert incoming audio, split it into VAD-sized chunks and classify each one."""
+        while True:
+            data = await self.audio_queue.get()
+            samples = self.frontend.process(data)
+            if len(self._vad_pending):
+                samples = np.concatenate((self._vad_pending, samples))
+
+            # Chunks are rows of a fresh array, so they can be queued without copying
+            count = len(samples) // self.chunk_samples
+            chunks = samples[:count * self.chunk_samples].reshape(count, self.chunk_samples)
+            self._vad_pending = samples[count * self.chunk_samples:].copy()
+            for chunk in chunks:
+                is_speech_chunk = self.vad_service.is_speech(chunk, self.energy_gate)
+                await self.vad_queue.put((chunk, is_speech_chunk))
+
+    async def _segmenter_stage(self) -> None:
+        """Group speech chunks into utterances and detect end-of-turn pauses."""
+        turn_has_segments = False
+
+        while True:
+            chunk, is_speech_chunk = await self.vad_queue.get()
+            self._processed_samples += len(chunk)
 
             if is_speech_chunk:
                 # Speech detected
                 if self.silence_detector.mark_speech():
-                    yield {"type": "vad", "active": True}
-                
-                self.speech_buffer.extend(chunk)
+                    await self.event_queue.put({"type": "vad", "active": True})
+
+                if not len(self.speech_buffer):
+                    self._speech_start_samples = self._processed_samples - len(chunk)
+                self.speech_buffer.append(chunk)
+
+                # Bound utterance length: close a segment mid-speech and carry an overlap forward
+                if self.utterance_splitter.should_split(self.speech_buffer):
+                    buffered = len(self.speech_buffer)
+                    audio, remainder = self.utterance_splitter.split(self.speech_buffer.view())
+                    self.speech_buffer.clear()
+                    self.speech_buffer.append(remainder)
+                    print(f"Utterance reached {settings.MAX_UTTERANCE_DURATION}s, transcribing segment...")
+                    await self._emit_segment(audio)
+                    self._speech_start_samples += buffered - len(self.speech_buffer)
+                    turn_has_segments = True
+                    self._continues_previous = True
+                continue
+
+            # Silence detected
+            if self.silence_detector.mark_silence():
+                await self.event_queue.put({"type": "vad", "active": False})
+
+            silence_duration = self.silence_detector.get_silence_duration()
+            pause_threshold = self.turn_decision.pause_threshold
+            turn_end_threshold = self.turn_decision.turn_end_threshold
+            if self._load_level() is not LoadLevel.NORMAL:
+                # Under pressure, wait for longer pauses so fewer (longer) segments are transcribed
+                pause_threshold *= settings.ADMISSION_DEGRADED_PAUSE_FACTOR
+
+            # 1. STT Trigger (Short pause)
+            if (self.silence_detector.is_speaking and
+                self.silence_detector.is_silence_threshold_met(pause_threshold) and
+                len(self.speech_buffer) > 0):
+
+                print(f"Silence ({silence_duration:.2f}s) > {pause_threshold:.2f}s, transcribing...")
+
+                # Filter short audio to avoid transcribing clicks/pops
+                min_samples = int(settings.MIN_AUDIO_LENGTH * settings.SAMPLE_RATE)
+                if len(self.speech_buffer) < min_samples:
+                    print(f"Ignoring short audio segment (< {settings.MIN_AUDIO_LENGTH}s)")
+                else:
+                    await self._emit_segment(self.speech_buffer.view().copy())
+                    turn_has_segments = True
+
+                # Reset speech buffer (its storage is reused for the next utterance)
+                self.speech_buffer.clear()
+                self._continues_previous = False
+                self.silence_detector.reset()
+                self.vad_service.reset()
+                continue
+
+            # 2. LLM Trigger (Long pause)
+            if (turn_has_segments and
+                self.silence_detector.is_silence_threshold_met(turn_end_threshold)):
+
+                print(f"Silence ({silence_duration:.2f}s) > {turn_end_threshold:.2f}s, ending turn...")
+                turn_has_segments = False
+                await self.aggregator_queue.put(TurnEnd(last_seq=self._next_segment_seq - 1))
+
+    async def _emit_segment(self, audio: np.ndarray) -> None:
+        """Hand a closed segment to the STT stage."""
+        segment = SpeechSegment(
+            seq=self._next_segment_seq,
+            audio=audio,
+            continues_previous=self._continues_previous,
+            start=self._speech_start_samples / settings.SAMPLE_RATE,
+        )
+        self._next_segment_seq += 1
+        # Until this segment is transcribed, fall back to the conservative thresholds
+        if settings.TURN_DETECTION_ENABLED:
+            self.turn_decision = self.turn_detector.default_decision()
+        await self.stt_queue.put(segment)
+        if self.archive is not None:
+            await self.archive_queue.put(segment)
+
+    async def _archive_remaining_speech(self) -> None:
+        """Archive the utterance cut off by the end of the session (it is not transcribed)."""
+        if len(self.speech_buffer) < int(settings.MIN_AUDIO_LENGTH * settings.SAMPLE_RATE):
+            return
+        await self.archive_queue.put(SpeechSegment(
+            seq=self._next_segment_seq,
+            audio=self.speech_buffer.view().copy(),
+            continues_previous=self._continues_previous,
+            start=self._speech_start_samples / settings.SAMPLE_RATE,
+        ))
+        self._next_segment_seq += 1
+        self.speech_buffer.clear()
+
+    async def _stt_stage(self) -> None:
+        """Transcribe closed segments; several workers may run concurrently."""
+        while True:
+            segment = await self.stt_queue.get()
+            text = ""
+            segments = []
+
+            try:
+                # The segment's float samples go straight to the model, no WAV round trip
+                degraded = self._load_level() is not LoadLevel.NORMAL
+                with self._track("stt"):
+                    transcript = await self.stt_service.transcribe_audio_detailed_async(
+                        segment.audio,
+                        degraded=degraded,
+                        priority=Priority.INTERACTIVE,
+                        user_id=self.user_id,
+                    )
+                text, segments = transcript["text"], transcript["segments"]
+                print(f"Transcribed: {text}")
+            except Exception as e:
+                print(f"Transcription Error: {e}")
+
+            await self.aggregator_queue.put(SegmentTranscript(
+                seq=segment.seq,
+                text=text,
+                duration=segment.duration,
+                continues_previous=segment.continues_previous,
+                segments=segments,
+            ))
+
+    async def _aggregator_stage(self) -> None:
+        """Reorder transcripts, emit them, and hand finished turns to the LLM stage."""
+        pending: Dict[int, SegmentTranscript] = {}
+        next_seq = 0
+        turn_end_seq: Optional[int] = None
+        previous_text = ""
+        # Whether the current turn had hallucinated segments filtered out
+        turn_rejected = False
+
+        while True:
+            item = await self.aggregator_queue.get()
+            if isinstance(item, TurnEnd):
+                turn_end_seq = item.last_seq
             else:
-                # Silence detected
-                if self.silence_detector.mark_silence():
-                    yield {"type": "vad", "active": False}
-
-                silence_duration = self.silence_detector.get_silence_duration()
-
-                # 1. STT Trigger (Short pause)
-                if (self.silence_detector.is_speaking and 
-                    self.silence_detector.is_silence_threshold_met(settings.VAD_PAUSE_THRESHOLD) and 
-                    len(self.speech_buffer) > 0):
-                    
-                    print(f"Silence ({silence_duration:.2f}s) > {settings.VAD_PAUSE_THRESHOLD}s, transcribing...")
-                    
-                    # Filter short audio to avoid transcribing clicks/pops
-                    min_bytes = int(settings.MIN_AUDIO_LENGTH * settings.SAMPLE_RATE * 2)
-                    if len(self.speech_buffer) < min_bytes:
-                        print(f"Ignoring short audio segment (< {settings.MIN_AUDIO_LENGTH}s)")
-                        self.speech_buffer = bytearray()
-                        self.silence_detector.reset()
-                        self.vad_service.reset()
-                        continue
-
-                    # Save buffer to temp file and transcribe
-                    try:
-                        temp_filename = self.audio_handler.save_to_wav(bytes(self.speech_buffer))
-                        
-                        # Transcribe (run in thread pool to avoid blocking)
-                        text = await asyncio.to_thread(self.stt_service.transcribe_file, temp_filename)
-                        print(f"Transcribed: {text}")
-
-                        # Filter and validate transcription
-                        if self.transcription_filter.is_valid(text):
-                            self.accumulated_transcription += text + " "
-                            yield {
-                                "type": "transcription",
-                                "text": text
-                            }
-                    except Exception as e:
-                        print(f"Transcription Error: {e}")
-                    finally:
-                        self.audio_handler.cleanup()
-
-                    # Reset speech buffer
-                    self.speech_buffer = bytearray()
-                    self.silence_detector.reset()
-                    self.vad_service.reset()
-
-                # 2. LLM Trigger (Long pause)
-                if (len(self.accumulated_transcription.strip()) > 0 and 
-                    self.silence_detector.is_silence_threshold_met(settings.POST_SPEAKING_SILENCE_THRESHOLD)):
-                    
-                    print(f"Silence ({silence_duration:.2f}s) > {settings.POST_SPEAKING_SILENCE_THRESHOLD}s, generating question...")
-
-                    # Generate question asynchronously
-                    context = self.accumulated_transcription.strip()
+                pending[item.seq] = item
+
+            # Emit transcripts in segment order, even if STT workers finish out of order
+            while next_seq in pending:
+                transcript = pending.pop(next_seq)
+                text = transcript.text
+                next_seq += 1
+
+                # De-duplicate words transcribed twice in the overlap of a forced cut
+                raw_text = text
+                if transcript.continues_previous and previous_text:
+                    text = self.transcript_stitcher.stitch(previous_text, text)
+                previous_text = raw_text
+
+                # Filter and validate transcription; rejected text never reaches the LLM
+                reason = self.transcription_filter.check(text, transcript.segments, transcript.duration)
+                if reason is not None and reason != "invalid":
+                    turn_rejected = True
+                if reason is None:
+                    self.accumulated_transcription += text + " "
+                    await self.event_queue.put({
+                        "type": "transcription",
+                        "text": text,
+                        # Lets the client fetch this line's audio from the session archive
+                        "seq": transcript.seq,
+                    })
+                    if self.archive is not None:
+                        await self.archive_queue.put(SegmentTranscript(
+                            seq=transcript.seq,
+                            text=text,
+                            duration=transcript.duration,
+                        ))
+
+                    # Adapt thresholds only from the latest segment; older ones are stale
+                    if settings.TURN_DETECTION_ENABLED and transcript.seq == self._next_segment_seq - 1:
+                        self.turn_decision = self.turn_detector.update(text, transcript.duration)
+                        print(f"Turn completeness {self.turn_decision.completeness:.2f}, "
+                              f"ending turn after {self.turn_decision.turn_end_threshold:.2f}s of silence")
+
+            # The turn is complete once every segment before the pause is transcribed
+            if turn_end_seq is not None and next_seq > turn_end_seq:
+                turn_end_seq = None
+                context = self.accumulated_transcription.strip()
+                if context:
                     self.accumulated_transcription = ""  # Clear to avoid double triggering
+                    await self.llm_queue.put(context)
+                elif turn_rejected:
+                    # The turn was nothing but hallucinations: a generation avoided
+                    self.transcription_filter.stats.llm_requests_saved += 1
+                turn_rejected = False
+
+    async def _llm_stage(self) -> None:
+        """Generate follow-up questions for finished turns."""
+        while True:
+            context = await self.llm_queue.get()
+            if self._load_level() is LoadLevel.SHEDDING:
+                print("Server overloaded, skipping question generation")
+                continue
+            print("Generating question...")
+
+            try:
+                with self._track("llm"):
+                    question = await self.llm_service.generate_question_async(
+                        context,
+                        priority=Priority.INTERACTIVE,
+                        user_id=self.user_id,
+                        exclude=self.asked_questions,
+                    )
+                print(f"Generated Question: {question}")
+                self.asked_questions.add(question)
+
+                await self.event_queue.put({
+                    "type": "question",
+                    "text": question
+                })
+            except Exception as e:
+                print(f"LLM Error: {e}")
+
+    async def _archive_stage(self) -> None:
+        """Encode closed segments and their final transcripts into the session archive."""
+        while True:
+            item = await self.archive_queue.get()
+            if item is None:
+                return
+            try:
+                if isinstance(item, SpeechSegment):
+                    await asyncio.to_thread(self.archive.append, item.seq, item.start, item.audio)
+                else:
+                    await asyncio.to_thread(self.archive.add_text, item.seq, item.text)
+            except Exception as e:
+                print(f"Archive Error: {e}")
 
-                    try:
-                        question = await asyncio.to_thread(self.llm_service.generate_question, context)
-                        print(f"Generated Question: {question}")
+    def _load_level(self) -> LoadLevel:
+        return self.admission.level() if self.admission else LoadLevel.NORMAL
 
-                        yield {
-                            "type": "question",
-                            "text": question
-                        }
-                    except Exception as e:
-                        print(f"LLM Error: {e}")
+    def _track(self, kind: str):
+        return self.admission.track(kind) if self.admission else nullcontext()
@@ -1,9 +1,33 @@
+from typing import Any, Collection, Dict, List, Optional
+
 import ollama
 from app.core.config import settings
+from app.services.job_queue import InProcessJobQueue, JobQueue
+from app.services.scheduler import ANONYMOUS_USER, InferenceScheduler, Priority
+from app.utils.semantic_cache import SemanticCache
 
 class LLMService:
-    def __init__(self):
+    def __init__(self, job_queue: Optional[JobQueue] = None):
         self.client = ollama.Client(host=settings.OLLAMA_BASE_URL)
+        self.job_queue: JobQueue = job_queue or InProcessJobQueue(
+            "llm", {"llm": self.generate_question, "llm_generate": self.generate, "llm_embed": self.embed}
+        )
+        concurrency = settings.LLM_CONCURRENCY if self.job_queue.local else settings.JOB_BROKER_CONCURRENCY
+        self.scheduler = InferenceScheduler("llm", concurrency)
+        # Embeddings are short and feed the cache lookup that answers while generations are busy,
+        # so they get their own slots instead of queueing behind generations
+        self.embed_scheduler = InferenceScheduler("llm_embed", settings.LLM_EMBED_CONCURRENCY)
+
+        # Questions for similar contexts, scoped per user
+        self.question_cache: Optional[SemanticCache] = None
+        if settings.LLM_CACHE_ENABLED:
+            self.question_cache = SemanticCache(
+                threshold=settings.LLM_CACHE_THRESHOLD,
+                ttl=settings.LLM_CACHE_TTL,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                num_tables=settings.LLM_CACHE_LSH_TABLES,
+                num_bits=settings.LLM_CACHE_LSH_BITS,
+            )
 
     def generate_question(self, context: str) -> str:
         prompt = f"""
@@ -13,3 +37,92 @@ class LLMService:
         
         response = self.client.generate(model=settings.OLLAMA_MODEL, prompt=prompt)
         return response['response'].strip()
+
+    def generate(self, prompt: str, json_format: bool = False) -> Dict[str, Any]:
+        """
+        Run a free-form prompt (used by batch jobs such as insights).
+
+        Args:
+            prompt: Full prompt
+            json_format: Constrain the output to JSON
+
+        Returns:
+            Dict with the response text and generation counters (eval_count tokens in eval_duration ns)
+        """
+        response = self.client.generate(
+            model=settings.OLLAMA_MODEL, prompt=prompt, format="json" if json_format else ""
+        )
+        return {
+            "response": response['response'].strip(),
+            "eval_count": response.get('eval_count') or 0,
+            "eval_duration": response.get('eval_duration') or 0,
+        }
+
+    async def generate_async(
+        self,
+        prompt: str,
+        json_format: bool = False,
+        priority: Priority = Priority.BULK,
+        user_id: str = ANONYMOUS_USER,
+    ) -> Dict[str, Any]:
+        async with self.scheduler.slot(priority, user_id):
+            return await self.job_queue.submit(
+                "llm_generate", {"prompt": prompt, "json_format": json_format}, priority
+            )
+
+    def embed(self, text: str) -> List[float]:
+        response = self.client.embeddings(model=settings.OLLAMA_EMBED_MODEL, prompt=text)
+        return response['embedding']
+
+    async def embed_async(
+        self,
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+    ) -> List[float]:
+        async with self.embed_scheduler.slot(priority, user_id):
+            return await self.job_queue.submit("llm_embed", {"text": text}, priority)
+
+    async def generate_question_async(
+        self,
+        context: str,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+        exclude: Collection[str] = (),
+    ) -> str:
+        """
+        Generate a follow-up question, reusing a cached one for a similar context if possible.
+
+        Args:
+            context: What the user said in the turn
+            priority: Scheduling priority of the embedding and generation
+            user_id: Fair-share key and cache scope
+            exclude: Questions already asked in this session; never served from the cache again
+
+        Returns:
+            The question
+        """
+        # Whether generations are backed up is decided now, before waiting on anything
+        saturated = self.scheduler.saturated()
+        embedding = None
+        if self.question_cache is not None:
+            try:
+                embedding = await self.embed_async(context, priority, user_id)
+            except Exception as e:
+                print(f"Embedding failed, skipping question cache: {e}")
+
+        if embedding is not None:
+            # Accept looser matches when a generation would have to wait
+            threshold = settings.LLM_CACHE_THRESHOLD
+            if saturated:
+                threshold = settings.LLM_CACHE_SATURATED_THRESHOLD
+            cached = self.question_cache.lookup(user_id, embedding, threshold, exclude=exclude)
+            if cached is not None:
+                return cached
+
+        async with self.scheduler.slot(priority, user_id):
+            question = await self.job_queue.submit("llm", {"context": context}, priority)
+
+        if embedding is not None:
+            self.question_cache.add(user_id, embedding, question)
+        return question
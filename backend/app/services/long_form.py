@@ -0,0 +1,273 @@
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.scheduler import ANONYMOUS_USER, Priority
+from app.services.stt_service import STTService
+from app.services.vad_service import VADService
+from app.utils.audio_decoder import StreamingAudioDecoder
+
+# Regions closer than this (Silero's minimum pause, 100 ms) are one region
+_MERGE_GAP_SAMPLES = int(0.1 * settings.SAMPLE_RATE)
+
+
+@dataclass
+class AudioChunk:
+    """A slice of the decoded file, cut at a pause where possible."""
+    index: int
+    start: float
+    audio: np.ndarray
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.audio) / settings.SAMPLE_RATE
+
+
+class LongFormTranscriber:
+    """
+    Transcribes long recordings without holding the whole waveform in memory.
+
+    The work is a three-stage pipeline. A producer thread decodes the file
+    with ffmpeg in fixed-size blocks, runs VAD over each new block only and
+    cuts chunks at pauses, feeding a bounded queue. A submitter task groups
+    chunks into batches and starts their STT calls, keeping at most
+    LONG_FORM_PIPELINE_DEPTH batches in flight. The consumer yields each
+    batch's results in order, so decoding, VAD and STT of consecutive batches
+    overlap.
+    """
+
+    def __init__(self, stt_service: STTService, vad_service: VADService):
+        """
+        Initialize the transcriber.
+
+        Args:
+            stt_service: Service used for batched transcription
+            vad_service: VAD instance dedicated to long-form jobs (its model
+                state must not be shared with live sessions)
+        """
+        self.stt_service = stt_service
+        self.vad_service = vad_service
+        self._vad_lock = threading.Lock()
+
+    async def transcribe(self, file_path: str, user_id: str = ANONYMOUS_USER) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Transcribe a file and yield results incrementally.
+
+        Batches are scheduled as bulk work, so live sessions overtake them
+        between batches.
+
+        Args:
+            file_path: Audio or video file to transcribe
+            user_id: User the work is done for (fair-share key)
+
+        Yields:
+            "segment" events with start/end times, text and word timestamps,
+            followed by a single "done" event with the full text
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=settings.LONG_FORM_BATCH_SIZE * 2)
+        stop = threading.Event()
+        producer = asyncio.create_task(asyncio.to_thread(self._produce_chunks, file_path, chunks, stop))
+        # (batch, STT task) pairs in order; None when done, or the submitter's exception
+        batches: asyncio.Queue = asyncio.Queue()
+        # Released once a batch's results have been yielded
+        in_flight = asyncio.Semaphore(max(1, settings.LONG_FORM_PIPELINE_DEPTH))
+        submitter = asyncio.create_task(self._submit_batches(chunks, batches, in_flight, user_id))
+
+        texts: List[str] = []
+        duration = 0.0
+        try:
+            while True:
+                item = await batches.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                batch, transcription = item
+                results = await transcription
+                for chunk, result in zip(batch, results):
+                    duration = chunk.end
+                    if not result["text"]:
+                        continue
+                    texts.append(result["text"])
+                    yield {
+                        "type": "segment",
+                        "index": chunk.index,
+                        "start": round(chunk.start, 3),
+                        "end": round(chunk.end, 3),
+                        "text": result["text"],
+                        "words": [
+                            {
+                                "word": word["word"],
+                                "start": round(chunk.start + word["start"], 3),
+                                "end": round(chunk.start + word["end"], 3),
+                            }
+                            for word in result["words"]
+                        ],
+                    }
+                in_flight.release()
+
+            # Surface decode errors from the producer thread
+            await producer
+            yield {"type": "done", "text": " ".join(texts), "duration": round(duration, 3)}
+        finally:
+            submitter.cancel()
+            await asyncio.gather(submitter, return_exceptions=True)
+            # Batches still in flight are not wanted anymore
+            while not batches.empty():
+                item = batches.get_nowait()
+                if isinstance(item, tuple):
+                    item[1].cancel()
+                    await asyncio.gather(item[1], return_exceptions=True)
+
+            stop.set()
+            # Unblock a producer waiting on a full queue, then any abandoned getter
+            try:
+                while True:
+                    chunks.get_nowait()
+            except queue.Empty:
+                pass
+            chunks.put_nowait(None)
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _submit_batches(
+        self,
+        chunks: queue.Queue,
+        batches: asyncio.Queue,
+        in_flight: asyncio.Semaphore,
+        user_id: str,
+    ) -> None:
+        """Group chunks into batches and start transcribing each one as soon as it is full."""
+        try:
+            finished = False
+            while not finished:
+                batch: List[AudioChunk] = []
+                while len(batch) < settings.LONG_FORM_BATCH_SIZE:
+                    chunk = await asyncio.to_thread(chunks.get)
+                    if chunk is None:
+                        finished = True
+                        break
+                    batch.append(chunk)
+                if not batch:
+                    break
+
+                # Waits while LONG_FORM_PIPELINE_DEPTH batches are in flight
+                await in_flight.acquire()
+                transcription = asyncio.create_task(self.stt_service.transcribe_batch_async(
+                    [c.audio for c in batch], priority=Priority.BULK, user_id=user_id
+                ))
+                batches.put_nowait((batch, transcription))
+        except Exception as e:
+            batches.put_nowait(e)
+            return
+        batches.put_nowait(None)
+
+    def _produce_chunks(self, file_path: str, chunks: queue.Queue, stop: threading.Event) -> None:
+        """Decode and chunk the file on a worker thread, feeding the bounded queue."""
+        try:
+            for chunk in self._chunk_audio(file_path):
+                if not self._put(chunks, chunk, stop):
+                    return
+        finally:
+            self._put(chunks, None, stop)
+
+    @staticmethod
+    def _put(chunks: queue.Queue, item: Optional[AudioChunk], stop: threading.Event) -> bool:
+        """Block until the item is queued or the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _chunk_audio(self, file_path: str) -> Iterator[AudioChunk]:
+        """Cut the decoded stream into chunks that end in pauses where possible."""
+        sample_rate = settings.SAMPLE_RATE
+        max_samples = int(settings.LONG_FORM_MAX_CHUNK_SECONDS * sample_rate)
+        min_samples = int(settings.LONG_FORM_MIN_CHUNK_SECONDS * sample_rate)
+        overlap = int(settings.LONG_FORM_VAD_OVERLAP_SECONDS * sample_rate)
+        decoder = StreamingAudioDecoder(file_path, sample_rate, settings.LONG_FORM_DECODE_BLOCK_SECONDS)
+
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = 0  # Offset of buffer[0] in the file, in samples
+        # Speech regions of the buffer in file offsets; VAD has seen the whole buffer
+        speech: List[dict] = []
+        index = 0
+
+        for block in decoder.blocks():
+            analyzed = buffer_start + len(buffer)
+            buffer = np.concatenate((buffer, block))
+            speech = self._extend_speech(speech, buffer, buffer_start, max(buffer_start, analyzed - overlap))
+
+            while len(buffer) >= max_samples:
+                relative = self._relative(speech, buffer_start)
+                cut = self._find_cut(relative, min_samples, max_samples)
+                if self._has_speech(relative, cut):
+                    yield AudioChunk(index, buffer_start / sample_rate, buffer[:cut].copy())
+                    index += 1
+                buffer = buffer[cut:]
+                buffer_start += cut
+                speech = [
+                    {"start": max(region["start"], buffer_start), "end": region["end"]}
+                    for region in speech if region["end"] > buffer_start
+                ]
+
+        if len(buffer) > 0 and self._has_speech(self._relative(speech, buffer_start), len(buffer)):
+            yield AudioChunk(index, buffer_start / sample_rate, buffer)
+
+    def _extend_speech(self, speech: List[dict], buffer: np.ndarray, buffer_start: int, tail_start: int) -> List[dict]:
+        """
+        Run VAD over the buffer from tail_start on and merge the result into the known regions.
+
+        Only new audio plus a short overlap of already analyzed audio (as
+        context for the model) is analyzed, so every sample goes through VAD
+        about once. Regions found in the overlap replace the earlier ones.
+        """
+        found = self._speech_regions(buffer[tail_start - buffer_start:])
+        merged = [
+            {"start": region["start"], "end": min(region["end"], tail_start)}
+            for region in speech if region["start"] < tail_start
+        ]
+        for region in found:
+            start, end = region["start"] + tail_start, region["end"] + tail_start
+            if merged and start - merged[-1]["end"] <= _MERGE_GAP_SAMPLES:
+                # Speech running across the start of the re-analyzed audio
+                merged[-1]["end"] = max(merged[-1]["end"], end)
+            else:
+                merged.append({"start": start, "end": end})
+        return merged
+
+    @staticmethod
+    def _relative(speech: List[dict], offset: int) -> List[dict]:
+        return [{"start": region["start"] - offset, "end": region["end"] - offset} for region in speech]
+
+    def _speech_regions(self, audio: np.ndarray) -> List[dict]:
+        with self._vad_lock:
+            return self.vad_service.speech_timestamps(audio)
+
+    @staticmethod
+    def _find_cut(speech: List[dict], min_samples: int, max_samples: int) -> int:
+        """Pick the latest pause midpoint within [min_samples, max_samples], else max_samples."""
+        if not speech:
+            return max_samples
+
+        gaps = [(a["end"], b["start"]) for a, b in zip(speech, speech[1:])]
+        gaps.append((speech[-1]["end"], max_samples))
+
+        cut = max_samples
+        for gap_start, gap_end in gaps:
+            midpoint = (gap_start + min(gap_end, max_samples)) // 2
+            if min_samples <= midpoint <= max_samples:
+                cut = midpoint
+        return cut
+
+    @staticmethod
+    def _has_speech(speech: List[dict], end: int) -> bool:
+        return any(region["start"] < end for region in speech)
@@ -1,12 +1,32 @@
 # Re-export provider interfaces and implementations for easy import
-from app.services.providers.types import TranscriptEvent, BatchSTTProvider, StreamingSTTProvider
+from app.services.providers.types import (
+    TranscriptEvent,
+    BatchSTTProvider,
+    AsyncBatchSTTProvider,
+    StreamingSTTProvider,
+    ChunkedSTTProvider,
+    DetailedSTTProvider,
+    ChunkTranscript,
+    FileTranscript,
+    SegmentInfo,
+    WordTimestamp,
+)
 from app.services.providers.whisper import WhisperBatchProvider
 from app.services.providers.deepgram import DeepgramProvider
+from app.services.providers.deepgram_live import DeepgramLiveStream
 
 __all__ = [
     "TranscriptEvent",
     "BatchSTTProvider",
+    "AsyncBatchSTTProvider",
     "StreamingSTTProvider",
+    "ChunkedSTTProvider",
+    "DetailedSTTProvider",
+    "ChunkTranscript",
+    "FileTranscript",
+    "SegmentInfo",
+    "WordTimestamp",
     "WhisperBatchProvider",
     "DeepgramProvider",
+    "DeepgramLiveStream",
 ]
@@ -1,9 +1,10 @@
 import os
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional
 
 import httpx
 
 from app.core.config import settings
+from app.services.providers.deepgram_live import DeepgramLiveStream
 from app.services.providers.types import BatchSTTProvider, StreamingSTTProvider, TranscriptEvent
 
 
@@ -12,36 +13,97 @@ class DeepgramProvider(BatchSTTProvider, StreamingSTTProvider):
         self.api_key = settings.DEEPGRAM_API_KEY
         if not self.api_key:
             raise ValueError("DEEPGRAM_API_KEY is not set in configuration")
-        self.base_url = "https://api.deepgram.com/v1/listen"
-
-    def transcribe_file(self, file_path: str) -> str:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        headers = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "audio/wav",
-        }
-
-        params = {
+        self.base_url = settings.DEEPGRAM_API_URL
+        self.live_url = settings.DEEPGRAM_LIVE_URL
+        self.params = {
             "model": "nova-2",
             "smart_format": "true",
             "punctuate": "true",
             "language": "en",
         }
+        self.live_params = {
+            "model": "nova-2",
+            "language": "en-US",
+            "smart_format": "true",
+            "interim_results": "true",
+            "punctuate": "true",
+            "encoding": "linear16",
+            "channels": "1",
+            "sample_rate": str(settings.SAMPLE_RATE),
+        }
+        # Identifies the model and decoding settings for the transcription cache
+        self.model_id = "deepgram:" + ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        self.headers = {
+            "Authorization": f"Token {self.api_key}",
+            "Content-Type": "audio/wav",
+        }
+
+        # Shared keep-alive clients for batch calls (HTTP/2 needs the h2 package), created on first use;
+        # the async one inside the event loop, the sync one for worker-thread callers
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+
+    @staticmethod
+    def _client_options() -> dict:
+        return {
+            "http2": True,
+            "timeout": 60.0,
+            "limits": httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60.0),
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options())
+        return self._client
+
+    def _get_sync_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(**self._client_options())
+        return self._sync_client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    def transcribe_file(self, file_path: str) -> str:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
 
         with open(file_path, "rb") as audio_file:
-            response = httpx.post(
+            response = self._get_sync_client().post(
                 self.base_url,
-                headers=headers,
-                params=params,
+                headers=self.headers,
+                params=self.params,
                 content=audio_file,
-                timeout=60.0,
             )
 
         response.raise_for_status()
-        data = response.json()
+        return self._parse_transcript(response.json())
+
+    async def transcribe_file_async(self, file_path: str) -> str:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        # Utterance files are small; read them whole so the request body is not a sync stream
+        with open(file_path, "rb") as audio_file:
+            content = audio_file.read()
 
+        response = await self._get_client().post(
+            self.base_url,
+            headers=self.headers,
+            params=self.params,
+            content=content,
+        )
+
+        response.raise_for_status()
+        return self._parse_transcript(response.json())
+
+    @staticmethod
+    def _parse_transcript(data: dict) -> str:
         try:
             transcript = data["results"]["channels"][0]["alternatives"][0]["transcript"]
             return transcript.strip()
@@ -50,88 +112,19 @@ class DeepgramProvider(BatchSTTProvider, StreamingSTTProvider):
             return ""
 
     async def stream(self, audio_chunks: AsyncIterator[bytes]) -> AsyncIterator[TranscriptEvent]:
-        import asyncio
-        from deepgram import (
-            DeepgramClient,
-            DeepgramClientOptions,
-            LiveTranscriptionEvents,
-            LiveOptions,
+        live_stream = DeepgramLiveStream(
+            url=self.live_url,
+            api_key=self.api_key,
+            options=self.live_params,
+            bytes_per_second=settings.SAMPLE_RATE * 2,
+            keepalive_interval=settings.DEEPGRAM_KEEPALIVE_INTERVAL,
+            max_reconnects=settings.DEEPGRAM_MAX_RECONNECTS,
+            replay_seconds=settings.DEEPGRAM_REPLAY_SECONDS,
         )
 
-        # Create a queue to bridge callbacks to async iterator
-        queue = asyncio.Queue()
-        loop = asyncio.get_running_loop()
-
         try:
-            # Initialize Deepgram Client
-            deepgram = DeepgramClient(self.api_key)
-
-            # Create a websocket connection to Deepgram
-            dg_connection = deepgram.listen.asynclive.v("1")
-
-            # Define event handlers
-            async def on_message(self, result, **kwargs):
-                if result.channel and result.channel.alternatives:
-                    transcript = result.channel.alternatives[0].transcript
-                    if transcript:
-                        await queue.put(TranscriptEvent(
-                            text=transcript,
-                            is_final=result.is_final
-                        ))
-
-            async def on_metadata(self, metadata, **kwargs):
-                # print(f"Metadata: {metadata}")
-                pass
-
-            async def on_error(self, error, **kwargs):
-                print(f"Deepgram Error: {error}")
-                # Signal error to the consumer? For now just log.
-
-            # Register handlers
-            dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
-            dg_connection.on(LiveTranscriptionEvents.Metadata, on_metadata)
-            dg_connection.on(LiveTranscriptionEvents.Error, on_error)
-
-            # Configure options
-            options = LiveOptions(
-                model="nova-2",
-                language="en-US",
-                smart_format=True,
-                interim_results=True,
-                punctuate=True,
-                encoding="linear16",
-                channels=1,
-                sample_rate=16000,
-            )
-
-            # Start the connection
-            if await dg_connection.start(options) is False:
-                print("Failed to start Deepgram connection")
-                return
-
-            # Start a task to send audio chunks
-            async def send_audio():
-                try:
-                    async for chunk in audio_chunks:
-                        await dg_connection.send(chunk)
-                except Exception as e:
-                    print(f"Error sending audio to Deepgram: {e}")
-                finally:
-                    await dg_connection.finish()
-                    # Signal end of stream to queue
-                    await queue.put(None)
-
-            send_task = asyncio.create_task(send_audio())
-
-            # Yield events from queue
-            while True:
-                event = await queue.get()
-                if event is None:
-                    break
+            async for event in live_stream.run(audio_chunks):
                 yield event
-
-            await send_task
-
         except Exception as e:
             print(f"Deepgram streaming error: {e}")
             raise
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import websockets
+from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
+
+from app.services.providers.types import TranscriptEvent
+
+
+class DeepgramLiveStream:
+    """
+    Manages one live transcription stream with reconnect and replay.
+
+    Audio is read from the caller into an internal queue, so a dropped
+    connection does not lose chunks. Audio sent but not yet covered by a final
+    result is kept in a replay buffer and re-sent on the next connection.
+    KeepAlive messages are sent whenever no audio arrives for a while.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        options: Dict[str, str],
+        bytes_per_second: int,
+        keepalive_interval: float,
+        max_reconnects: int,
+        replay_seconds: float,
+    ):
+        """
+        Initialize the stream manager.
+
+        Args:
+            url: Live websocket endpoint (e.g. wss://api.deepgram.com/v1/listen)
+            api_key: Deepgram API key
+            options: Query parameters for the live endpoint
+            bytes_per_second: PCM byte rate, used to map result times to offsets
+            keepalive_interval: Seconds without audio before sending a KeepAlive
+            max_reconnects: Consecutive failed connection attempts before giving up
+            replay_seconds: Max unfinalized audio kept for replay after a drop
+        """
+        self.url = f"{url}?{urlencode(options)}"
+        self.api_key = api_key
+        self.bytes_per_second = bytes_per_second
+        self.keepalive_interval = keepalive_interval
+        self.max_reconnects = max_reconnects
+        self.max_replay_bytes = int(replay_seconds * bytes_per_second)
+
+        self.input_queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self.replay_buffer: Deque[Tuple[int, bytes]] = deque()  # (absolute offset, chunk)
+        self.replay_bytes = 0
+        self.sent_offset = 0  # Absolute offset of the next byte to send
+        self.connection_base = 0  # Absolute offset of the first byte sent on the current connection
+        self.input_done = False
+        self.reconnects = 0
+
+    async def run(self, audio_chunks: AsyncIterator[bytes]) -> AsyncIterator[TranscriptEvent]:
+        """
+        Stream audio to Deepgram and yield transcript events until input ends.
+
+        Args:
+            audio_chunks: Raw linear16 audio from the client
+        """
+        events: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue()
+        reader = asyncio.create_task(self._read_input(audio_chunks))
+        connection = asyncio.create_task(self._run_connections(events))
+
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await connection
+        finally:
+            reader.cancel()
+            connection.cancel()
+            await asyncio.gather(reader, connection, return_exceptions=True)
+
+    async def _read_input(self, audio_chunks: AsyncIterator[bytes]) -> None:
+        try:
+            async for chunk in audio_chunks:
+                await self.input_queue.put(chunk)
+        finally:
+            await self.input_queue.put(None)
+
+    async def _run_connections(self, events: asyncio.Queue) -> None:
+        """Keep a connection open until input ends, reconnecting after drops."""
+        failures = 0
+        try:
+            while True:
+                try:
+                    async with websockets.connect(
+                        self.url,
+                        additional_headers={"Authorization": f"Token {self.api_key}"},
+                    ) as ws:
+                        failures = 0
+                        await self._replay(ws)
+                        sender = asyncio.create_task(self._send_audio(ws))
+                        try:
+                            await self._receive(ws, events)
+                        finally:
+                            sender.cancel()
+                            await asyncio.gather(sender, return_exceptions=True)
+                    if self.input_done:
+                        return
+                except ConnectionClosedOK:
+                    if self.input_done:
+                        return
+                except (ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                    print(f"Deepgram live connection dropped: {e}")
+
+                failures += 1
+                if failures > self.max_reconnects:
+                    print("Deepgram live stream giving up after repeated failures")
+                    return
+                self.reconnects += 1
+                await asyncio.sleep(min(0.25 * 2 ** (failures - 1), 5.0))
+        finally:
+            await events.put(None)
+
+    async def _replay(self, ws) -> None:
+        """Re-send audio that was not finalized before the previous connection dropped."""
+        self.connection_base = self.replay_buffer[0][0] if self.replay_buffer else self.sent_offset
+        if self.replay_buffer:
+            print(f"Replaying {self.replay_bytes} bytes of unfinalized audio to Deepgram")
+        for _, chunk in self.replay_buffer:
+            await ws.send(chunk)
+
+    async def _send_audio(self, ws) -> None:
+        """Forward queued audio, sending KeepAlive during silence and CloseStream at the end."""
+        if self.input_done:
+            # Input ended before the drop; only the replayed audio remains to be finalized
+            await ws.send(json.dumps({"type": "CloseStream"}))
+            return
+
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self.input_queue.get(), timeout=self.keepalive_interval)
+            except asyncio.TimeoutError:
+                await ws.send(json.dumps({"type": "KeepAlive"}))
+                continue
+
+            if chunk is None:
+                self.input_done = True
+                await ws.send(json.dumps({"type": "CloseStream"}))
+                return
+
+            # Buffer before sending so a chunk lost mid-send is replayed
+            self.replay_buffer.append((self.sent_offset, chunk))
+            self.replay_bytes += len(chunk)
+            self.sent_offset += len(chunk)
+            while self.replay_bytes > self.max_replay_bytes and len(self.replay_buffer) > 1:
+                _, dropped = self.replay_buffer.popleft()
+                self.replay_bytes -= len(dropped)
+
+            await ws.send(chunk)
+
+    async def _receive(self, ws, events: asyncio.Queue) -> None:
+        """Translate Deepgram results into transcript events and trim the replay buffer."""
+        async for message in ws:
+            if isinstance(message, bytes):
+                continue
+            data = json.loads(message)
+            if data.get("type") != "Results":
+                continue
+
+            alternatives = data.get("channel", {}).get("alternatives", [])
+            transcript = alternatives[0].get("transcript", "") if alternatives else ""
+            is_final = bool(data.get("is_final"))
+
+            if is_final:
+                end_seconds = float(data.get("start", 0.0)) + float(data.get("duration", 0.0))
+                self._trim_replay(self.connection_base + int(end_seconds * self.bytes_per_second))
+
+            if transcript:
+                await events.put(TranscriptEvent(type="transcription", text=transcript, final=is_final))
+
+    def _trim_replay(self, finalized_offset: int) -> None:
+        """Drop buffered chunks fully covered by a final result."""
+        while self.replay_buffer:
+            offset, chunk = self.replay_buffer[0]
+            if offset + len(chunk) > finalized_offset:
+                break
+            self.replay_buffer.popleft()
+            self.replay_bytes -= len(chunk)
@@ -1,4 +1,6 @@
-from typing import AsyncIterator, Protocol, TypedDict, Literal
+from typing import AsyncIterator, List, Protocol, Sequence, TypedDict, Literal
+
+import numpy as np
 
 
 class TranscriptEvent(TypedDict):
@@ -7,11 +9,58 @@ class TranscriptEvent(TypedDict):
     final: bool
 
 
+class WordTimestamp(TypedDict):
+    word: str
+    start: float
+    end: float
+
+
+class ChunkTranscript(TypedDict):
+    text: str
+    words: List[WordTimestamp]
+
+
+class SegmentInfo(TypedDict):
+    """Decoder confidence of one transcribed segment (as reported by openai-whisper)."""
+    start: float
+    end: float
+    text: str
+    no_speech_prob: float
+    avg_logprob: float
+    compression_ratio: float
+
+
+class FileTranscript(TypedDict):
+    text: str
+    # Empty when the provider does not report per-segment confidence
+    segments: List[SegmentInfo]
+
+
 class BatchSTTProvider(Protocol):
+    model_id: str
+
     def transcribe_file(self, file_path: str) -> str:
         ...
 
 
+class AsyncBatchSTTProvider(Protocol):
+    async def transcribe_file_async(self, file_path: str) -> str:
+        ...
+
+
 class StreamingSTTProvider(Protocol):
     async def stream(self, audio_chunks: AsyncIterator[bytes]) -> AsyncIterator[TranscriptEvent]:
         ...
+
+
+class DetailedSTTProvider(Protocol):
+    def transcribe_file_detailed(self, file_path: str) -> FileTranscript:
+        ...
+
+    def transcribe_audio_detailed(self, audio: np.ndarray) -> FileTranscript:
+        ...
+
+
+class ChunkedSTTProvider(Protocol):
+    def transcribe_batch(self, chunks: Sequence[np.ndarray]) -> List[ChunkTranscript]:
+        ...
@@ -1,14 +1,28 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
 import torch
 import whisper
 from transformers import pipeline
 
 from app.core.config import settings
-from app.services.providers.types import BatchSTTProvider
+from app.services.providers.types import (
+    BatchSTTProvider,
+    ChunkedSTTProvider,
+    ChunkTranscript,
+    DetailedSTTProvider,
+    FileTranscript,
+)
+from app.utils.transcription_filter import compression_ratio
+
+# Whisper decodes 30 s windows; shorter audio fits in a single forward pass
+WINDOW_SECONDS = 30
 
 
-class WhisperBatchProvider(BatchSTTProvider):
-    def __init__(self):
-        print("Loading Hugging Face Whisper model...")
+class WhisperBatchProvider(BatchSTTProvider, ChunkedSTTProvider, DetailedSTTProvider):
+    def __init__(self, model_name: Optional[str] = None):
+        model_name = model_name or settings.WHISPER_MODEL
+        print(f"Loading Hugging Face Whisper model ({model_name})...")
 
         device = -1
         if torch.cuda.is_available():
@@ -18,14 +32,98 @@ class WhisperBatchProvider(BatchSTTProvider):
 
         print(f"Using device: {device}")
 
+        self.model_id = self.model_id_for(model_name)
+
         self.pipe = pipeline(
             "automatic-speech-recognition",
-            model=f"openai/whisper-{settings.WHISPER_MODEL}",
+            model=f"openai/whisper-{model_name}",
             device=device,
             chunk_length_s=30,
         )
 
+        # Token whose probability right after <|startoftranscript|> is Whisper's no-speech score
+        tokenizer = self.pipe.tokenizer
+        self.no_speech_token_id = None
+        for token in ("<|nospeech|>", "<|nocaptions|>"):
+            token_id = tokenizer.convert_tokens_to_ids(token)
+            if token_id is not None and token_id != tokenizer.unk_token_id:
+                self.no_speech_token_id = token_id
+                break
+
+    @staticmethod
+    def model_id_for(model_name: str) -> str:
+        """Identifies the model and decoding settings for the transcription cache."""
+        return f"whisper:{model_name}:chunk30"
+
     def transcribe_file(self, file_path: str) -> str:
         audio = whisper.load_audio(file_path)
         result = self.pipe(audio)
         return result["text"].strip()
+
+    def transcribe_file_detailed(self, file_path: str) -> FileTranscript:
+        """Transcribe a file and report Whisper's confidence scores (see transcribe_audio_detailed)."""
+        return self.transcribe_audio_detailed(whisper.load_audio(file_path))
+
+    def transcribe_audio_detailed(self, audio: np.ndarray) -> FileTranscript:
+        """
+        Transcribe float32 samples at SAMPLE_RATE and report Whisper's confidence scores.
+
+        Audio that fits in one window (every live utterance) is decoded directly
+        with the model, so the no-speech probability, average log-probability and
+        compression ratio of the segment are available. Longer audio goes through
+        the chunked pipeline and comes back without scores.
+        """
+        if len(audio) > WINDOW_SECONDS * settings.SAMPLE_RATE:
+            return {"text": self.pipe(audio)["text"].strip(), "segments": []}
+
+        model = self.pipe.model
+        features = self.pipe.feature_extractor(
+            audio, sampling_rate=settings.SAMPLE_RATE, return_tensors="pt"
+        ).input_features.to(model.device, model.dtype)
+
+        with torch.no_grad():
+            # The encoder runs once and is shared by the no-speech probe and the decode
+            encoder_outputs = model.get_encoder()(features)
+
+            no_speech_prob = 0.0
+            if self.no_speech_token_id is not None:
+                start = torch.tensor([[model.generation_config.decoder_start_token_id]], device=model.device)
+                logits = model(encoder_outputs=encoder_outputs, decoder_input_ids=start).logits[0, -1]
+                no_speech_prob = float(logits.float().softmax(dim=-1)[self.no_speech_token_id])
+
+            generated = model.generate(
+                encoder_outputs=encoder_outputs, return_dict_in_generate=True, output_scores=True
+            )
+            logprobs = model.compute_transition_scores(generated.sequences, generated.scores, normalize_logits=True)[0]
+
+        text = self.pipe.tokenizer.decode(generated.sequences[0], skip_special_tokens=True).strip()
+        return {
+            "text": text,
+            "segments": [{
+                "start": 0.0,
+                "end": len(audio) / settings.SAMPLE_RATE,
+                "text": text,
+                "no_speech_prob": no_speech_prob,
+                "avg_logprob": float(logprobs.float().mean()) if logprobs.numel() else 0.0,
+                "compression_ratio": compression_ratio(text),
+            }],
+        }
+
+    def transcribe_batch(self, chunks: Sequence[np.ndarray]) -> List[ChunkTranscript]:
+        """Transcribe up to 30 s chunks in one batched forward pass, with word timestamps."""
+        inputs = [{"raw": chunk, "sampling_rate": settings.SAMPLE_RATE} for chunk in chunks]
+        results = self.pipe(inputs, batch_size=len(inputs), return_timestamps="word")
+
+        transcripts: List[ChunkTranscript] = []
+        for chunk, result in zip(chunks, results):
+            duration = len(chunk) / settings.SAMPLE_RATE
+            words = []
+            for word in result.get("chunks", []):
+                start, end = word["timestamp"]
+                words.append({
+                    "word": word["text"].strip(),
+                    "start": float(start if start is not None else 0.0),
+                    "end": float(end if end is not None else duration),
+                })
+            transcripts.append({"text": result["text"].strip(), "words": words})
+        return transcripts
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Tuple
+
+from app.core.config import settings
+
+
+class Priority(IntEnum):
+    """Priority classes; lower values are always served first."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+ANONYMOUS_USER = "anonymous"
+
+# Size of the per-user finish tag map at which stale entries are first pruned
+_MIN_PRUNE_SIZE = 1024
+
+
+class InferenceScheduler:
+    """
+    Grants a limited number of concurrent slots on a shared inference backend.
+
+    Waiting requests are ordered by priority class first, so interactive work
+    overtakes bulk work at the next free slot (bulk jobs acquire one slot per
+    batch, which makes batch boundaries the preemption points). Within a class,
+    users share the backend by start-time fair queuing: each request gets a
+    virtual finish tag of `start + cost / weight`, so a user submitting many
+    long jobs cannot starve users submitting a few short ones.
+    """
+
+    def __init__(self, name: str, concurrency: int):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Backend name used in logs and metrics
+            concurrency: Number of requests allowed to run at once
+        """
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.running = 0
+
+        self._queue: List[Tuple[int, float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._virtual_time: Dict[Priority, float] = defaultdict(float)
+        # Only users whose last finish tag is ahead of the virtual time need an entry;
+        # user ids come from clients, so stale entries are pruned as the map grows
+        self._last_finish: Dict[Tuple[Priority, str], float] = {}
+        self._prune_at = _MIN_PRUNE_SIZE
+        # Requests of each class queued or running, and the largest finish tag handed out
+        self._active: Dict[Priority, int] = defaultdict(int)
+        self._max_finish: Dict[Priority, float] = defaultdict(float)
+        self._waits: Dict[Priority, Deque[float]] = {p: deque(maxlen=1000) for p in Priority}
+        self._served: Dict[Priority, int] = defaultdict(int)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+        cost: float = 1.0,
+    ) -> AsyncIterator[None]:
+        """
+        Wait for a slot and hold it for the duration of the block.
+
+        Args:
+            priority: Priority class of the request
+            user_id: User the work is done for (fair-share key)
+            cost: Expected work, e.g. seconds of audio; longer jobs wait longer
+        """
+        weight = settings.SCHEDULER_USER_WEIGHTS.get(user_id, 1.0)
+        start_tag = max(self._virtual_time[priority], self._last_finish.get((priority, user_id), 0.0))
+        finish_tag = start_tag + max(cost, 1e-3) / weight
+        self._last_finish[(priority, user_id)] = finish_tag
+        self._max_finish[priority] = max(self._max_finish[priority], finish_tag)
+        if len(self._last_finish) >= self._prune_at:
+            self._prune()
+
+        self._active[priority] += 1
+        try:
+            enqueued_at = time.perf_counter()
+            if self.running < self.concurrency and not self._queue:
+                self.running += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                heapq.heappush(self._queue, (int(priority), finish_tag, next(self._sequence), future))
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    # A slot may have been handed over just before cancellation
+                    if future.done() and not future.cancelled():
+                        self._release()
+                    raise
+
+            self._virtual_time[priority] = max(self._virtual_time[priority], start_tag)
+            self._waits[priority].append(time.perf_counter() - enqueued_at)
+            self._served[priority] += 1
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            self._active[priority] -= 1
+            if not self._active[priority]:
+                # The class is idle: move its virtual time past every tag handed out,
+                # so users returning later start level and their old tags can be pruned
+                self._virtual_time[priority] = max(self._virtual_time[priority], self._max_finish[priority])
+
+    def _prune(self) -> None:
+        """Forget finish tags the virtual time has passed; they no longer delay their user."""
+        self._last_finish = {
+            key: finish for key, finish in self._last_finish.items()
+            if finish > self._virtual_time[key[0]]
+        }
+        # Amortized: the next sweep waits until the map has doubled
+        self._prune_at = max(_MIN_PRUNE_SIZE, 2 * len(self._last_finish))
+
+    def _release(self) -> None:
+        """Hand the freed slot to the next waiter, or return it to the pool."""
+        while self._queue:
+            _, _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def saturated(self) -> bool:
+        """True if a new request would have to wait for a slot."""
+        return self.running >= self.concurrency or bool(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        per_class = {}
+        for priority in Priority:
+            waits = sorted(self._waits[priority])
+            per_class[priority.name.lower()] = {
+                "served": self._served[priority],
+                "wait_mean_ms": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                "wait_p95_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 2) if waits else 0.0,
+                "wait_max_ms": round(waits[-1] * 1000, 2) if waits else 0.0,
+            }
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self.queue_depth(),
+            "classes": per_class,
+        }
@@ -0,0 +1,341 @@
+import json
+import os
+import re
+import struct
+import subprocess
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Per-utterance index record: byte offset, byte length, start (s), duration (s).
+# Records are fixed width and stored at position `seq`, so a lookup is one seek.
+INDEX_RECORD = struct.Struct("<QIdd")
+
+# Codec -> (ffmpeg output options, media type, file extension).
+# Utterances are encoded separately and appended to one file, so only formats
+# whose streams chain into a valid file belong here (FLAC streams do not).
+ARCHIVE_CODECS = {
+    "opus": (["-c:a", "libopus", "-application", "voip", "-f", "ogg"], "audio/ogg", ".opus"),
+}
+
+SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class SessionArchive:
+    """
+    Append-only archive of one session's speech.
+
+    Each utterance is encoded as a self-contained stream and appended to the
+    session's audio file (for Opus this makes a chained Ogg file that plays
+    end to end). The byte range of every utterance is recorded in a
+    fixed-width index, so any single clip can be served by seeking to it
+    without decoding the rest of the recording.
+    """
+
+    def __init__(self, session_dir: str, codec: str, bitrate: str, meta: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the archive, creating its files.
+
+        Args:
+            session_dir: Directory of this session's archive
+            codec: Key of ARCHIVE_CODECS
+            bitrate: Target bitrate for lossy codecs (e.g. "16k")
+            meta: Session details written to session.json (user, start time)
+        """
+        options, _, extension = ARCHIVE_CODECS[codec]
+        self.codec = codec
+        self.options = options + ["-b:a", bitrate]
+
+        os.makedirs(session_dir, exist_ok=True)
+        self.audio_path = os.path.join(session_dir, f"audio{extension}")
+        self.audio_file = open(self.audio_path, "ab")
+        self.index_file = open(os.path.join(session_dir, "clips.idx"), "ab")
+        self.transcript_file = open(os.path.join(session_dir, "transcript.jsonl"), "a")
+        # Set when a write fails; later appends are dropped so the index never points at the wrong bytes
+        self.broken = False
+        self.meta = meta
+        self.meta_path = os.path.join(session_dir, "session.json")
+        if meta is not None:
+            self._write_meta()
+
+    def append(self, seq: int, start: float, audio: np.ndarray) -> None:
+        """
+        Encode an utterance and append it to the archive.
+
+        Args:
+            seq: Segment number; must be one more than the previous call's
+            start: Start of the utterance in the session's audio (seconds)
+            audio: Utterance audio as mono float32 samples at SAMPLE_RATE
+        """
+        if self.broken:
+            return
+        duration = len(audio) / settings.SAMPLE_RATE
+        try:
+            encoded = self._encode(audio)
+        except Exception as e:
+            # Keep the index dense; an empty record marks a missing clip
+            print(f"Archive encoding failed for segment {seq}: {e}")
+            encoded = b""
+
+        self.index_file.seek(0, os.SEEK_END)
+        index_size = self.index_file.tell()
+        if index_size != seq * INDEX_RECORD.size:
+            self._break(f"index out of step at segment {seq}")
+            return
+
+        offset = self.audio_file.tell()
+        try:
+            self.audio_file.write(encoded)
+            self.audio_file.flush()
+            self.index_file.write(INDEX_RECORD.pack(offset, len(encoded), start, duration))
+            self.index_file.flush()
+        except OSError as e:
+            # Roll both files back to the last complete clip
+            self._break(f"write failed at segment {seq}: {e}")
+            self._truncate(self.audio_file, offset)
+            self._truncate(self.index_file, index_size)
+
+    def add_text(self, seq: int, text: str) -> None:
+        """
+        Record the final transcript of an archived utterance.
+
+        Args:
+            seq: Segment number
+            text: Transcript shown to the user for that segment
+        """
+        self.transcript_file.write(json.dumps({"seq": seq, "text": text}) + "\n")
+        self.transcript_file.flush()
+
+    def close(self) -> None:
+        """Close the archive files and mark the session as ended."""
+        for f in (self.audio_file, self.index_file, self.transcript_file):
+            f.close()
+        if self.meta is not None:
+            self.meta["ended"] = time.time()
+            self._write_meta()
+
+    def _break(self, reason: str) -> None:
+        self.broken = True
+        print(f"Session archive {self.audio_path} disabled: {reason}")
+
+    @staticmethod
+    def _truncate(f, size: int) -> None:
+        try:
+            f.truncate(size)
+            f.seek(size)
+        except (OSError, ValueError) as e:
+            print(f"Failed to roll back {f.name}: {e}")
+
+    def _write_meta(self) -> None:
+        temp_path = f"{self.meta_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(temp_path, self.meta_path)
+
+    def _encode(self, audio: np.ndarray) -> bytes:
+        command = [
+            "ffmpeg",
+            "-f", "f32le",
+            "-ar", str(settings.SAMPLE_RATE),
+            "-ac", "1",
+            "-i", "pipe:0",
+            *self.options,
+            "-loglevel", "error",
+            "pipe:1",
+        ]
+        result = subprocess.run(command, input=audio.astype("<f4", copy=False).tobytes(), capture_output=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg encoding failed: {result.stderr.decode(errors='replace')}")
+        return result.stdout
+
+
+class SessionArchiveService:
+    """Creates session archives and serves clips from them."""
+
+    def __init__(self, base_dir: str = "sessions"):
+        """
+        Initialize the service.
+
+        Args:
+            base_dir: Directory holding one subdirectory per session
+        """
+        self.base_dir = base_dir
+
+    def open(self, session_id: str, user_id: Optional[str] = None) -> SessionArchive:
+        """
+        Create the archive for a new session.
+
+        Args:
+            session_id: Id of the session
+            user_id: Owner of the session
+
+        Returns:
+            Archive to append the session's utterances to
+        """
+        return SessionArchive(
+            os.path.join(self.base_dir, session_id),
+            settings.SESSION_ARCHIVE_CODEC,
+            settings.SESSION_ARCHIVE_BITRATE,
+            meta={"session_id": session_id, "user_id": user_id, "started": time.time()},
+        )
+
+    def sessions(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over archived sessions without loading them.
+
+        Args:
+            since: Only sessions started at or after this Unix time
+            until: Only sessions started before this Unix time
+
+        Yields:
+            Session details (session_id, user_id, started, and ended once the
+            session has closed), in directory order
+        """
+        if not os.path.isdir(self.base_dir):
+            return
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir() or not SESSION_ID_RE.match(entry.name):
+                    continue
+                meta_path = os.path.join(entry.path, "session.json")
+                try:
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    # Archives from before session.json: owner unknown, start time from the directory
+                    meta = {"session_id": entry.name, "user_id": None, "started": entry.stat().st_mtime}
+                started = meta.get("started", 0.0)
+                if (since is None or started >= since) and (until is None or started < until):
+                    yield meta
+
+    def owner(self, session_id: str) -> Optional[str]:
+        """
+        Get the user a session belongs to.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            The user id stored with the session, or None if unknown
+        """
+        if not SESSION_ID_RE.match(session_id):
+            return None
+        try:
+            with open(os.path.join(self.base_dir, session_id, "session.json")) as f:
+                return json.load(f).get("user_id")
+        except (OSError, ValueError):
+            return None
+
+    def transcript(self, session_id: str) -> str:
+        """
+        Get the full transcript of an archived session.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            The session's utterance texts in order, joined by spaces ("" if none)
+        """
+        if not SESSION_ID_RE.match(session_id):
+            return ""
+        path = os.path.join(self.base_dir, session_id, "transcript.jsonl")
+        if not os.path.exists(path):
+            return ""
+        texts: Dict[int, str] = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    texts[entry["seq"]] = entry["text"]
+        return " ".join(texts[seq] for seq in sorted(texts) if texts[seq])
+
+    def audio_file(self, session_id: str) -> Optional[Tuple[str, str]]:
+        """
+        Locate a session's audio file.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            Tuple of (path, media type), or None if the session has no archive
+        """
+        if not SESSION_ID_RE.match(session_id):
+            return None
+        for _, media_type, extension in ARCHIVE_CODECS.values():
+            path = os.path.join(self.base_dir, session_id, f"audio{extension}")
+            if os.path.exists(path):
+                return path, media_type
+        return None
+
+    def clip(self, session_id: str, seq: int) -> Optional[Tuple[str, int, int, str]]:
+        """
+        Look up the byte range of one utterance.
+
+        Args:
+            session_id: Id of the session
+            seq: Segment number
+
+        Returns:
+            Tuple of (audio path, byte offset, byte length, media type), or None if
+            the clip does not exist
+        """
+        located = self.audio_file(session_id)
+        if located is None or seq < 0:
+            return None
+        path, media_type = located
+
+        with open(os.path.join(self.base_dir, session_id, "clips.idx"), "rb") as f:
+            f.seek(seq * INDEX_RECORD.size)
+            record = f.read(INDEX_RECORD.size)
+        if len(record) < INDEX_RECORD.size:
+            return None
+
+        offset, length, _, _ = INDEX_RECORD.unpack(record)
+        if length == 0:
+            return None
+        return path, offset, length, media_type
+
+    def index(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        List the archived utterances of a session with their transcripts.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            One entry per utterance (seq, start, duration, bytes, text), or None
+            if the session has no archive
+        """
+        if self.audio_file(session_id) is None:
+            return None
+        session_dir = os.path.join(self.base_dir, session_id)
+
+        texts: Dict[int, str] = {}
+        transcript_path = os.path.join(session_dir, "transcript.jsonl")
+        if os.path.exists(transcript_path):
+            with open(transcript_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        texts[entry["seq"]] = entry["text"]
+
+        entries = []
+        with open(os.path.join(session_dir, "clips.idx"), "rb") as f:
+            data = f.read()
+        for seq in range(len(data) // INDEX_RECORD.size):
+            _, length, start, duration = INDEX_RECORD.unpack_from(data, seq * INDEX_RECORD.size)
+            entries.append({
+                "seq": seq,
+                "start": round(start, 3),
+                "duration": round(duration, 3),
+                "bytes": length,
+                "text": texts.get(seq),
+            })
+        return entries
+
+
+# Singleton instance
+session_archive_service = SessionArchiveService(settings.SESSION_ARCHIVE_DIR)
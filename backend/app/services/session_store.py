@@ -0,0 +1,160 @@
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from app.services.admission import AdmissionController
+from app.services.journaling_session import JournalingSession
+
+
+class SessionStore:
+    """
+    Keeps journaling sessions alive across websocket reconnects.
+
+    A session is attached to at most one connection at a time. When its
+    connection drops, the session is detached but keeps running (queued audio
+    is still segmented and transcribed, events are buffered) for a grace
+    period. A client that reconnects with the session id within that period
+    resumes it; otherwise it is closed and its admission slot released.
+    """
+
+    def __init__(self, admission: AdmissionController, ttl: float):
+        """
+        Initialize the store.
+
+        Args:
+            admission: Controller whose session slot each stored session holds
+            ttl: Seconds a detached session is kept before it is closed
+        """
+        self.admission = admission
+        self.ttl = ttl
+
+        self._sessions: Dict[str, JournalingSession] = {}
+        # Connection currently attached to each session (None while detached)
+        self._connections: Dict[str, Any] = {}
+        self._expiry: Dict[str, asyncio.TimerHandle] = {}
+        # Running expiry tasks; the loop only keeps weak references to tasks
+        self._expiring: Set[asyncio.Task] = set()
+
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+
+    def add(self, session: JournalingSession, connection: Any) -> None:
+        """
+        Register a new session attached to a connection.
+
+        The caller must have acquired a "session" admission slot; the store
+        releases it when the session ends.
+
+        Args:
+            session: Started session
+            connection: Connection the session is attached to
+        """
+        self._sessions[session.session_id] = session
+        self._connections[session.session_id] = connection
+        self.created += 1
+
+    def resume(self, session_id: str, connection: Any) -> Optional[JournalingSession]:
+        """
+        Attach a connection to an existing session.
+
+        Args:
+            session_id: Id sent by the reconnecting client
+            connection: The new connection
+
+        Returns:
+            The session, or None if it is unknown or has expired
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+
+        timer = self._expiry.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        # A half-open previous connection loses ownership; its handler must not detach or end the session
+        self._connections[session_id] = connection
+        self.resumed += 1
+        return session
+
+    def __contains__(self, session_id: str) -> bool:
+        """Check whether a session is live or detached but still resumable."""
+        return session_id in self._sessions
+
+    def owner(self, session_id: str) -> Optional[str]:
+        """Get the user a session belongs to (None if unknown)."""
+        session = self._sessions.get(session_id)
+        return session.user_id if session is not None else None
+
+    def connection(self, session_id: str) -> Any:
+        """Get the connection attached to a session (None if detached or unknown)."""
+        return self._connections.get(session_id)
+
+    def is_attached(self, session_id: str, connection: Any) -> bool:
+        """Check whether the connection still owns the session."""
+        return session_id in self._sessions and self._connections.get(session_id) is connection
+
+    def detach(self, session_id: str, connection: Any) -> None:
+        """
+        Detach a dropped connection and start the grace period.
+
+        Args:
+            session_id: Session of the connection
+            connection: The dropped connection (ignored if it no longer owns the session)
+        """
+        if not self.is_attached(session_id, connection):
+            return
+        self._connections[session_id] = None
+        loop = asyncio.get_running_loop()
+        self._expiry[session_id] = loop.call_later(self.ttl, self._start_expiry, session_id)
+
+    def _start_expiry(self, session_id: str) -> None:
+        task = asyncio.create_task(self._expire(session_id), name=f"session:{session_id}:expire")
+        self._expiring.add(task)
+        task.add_done_callback(self._expiry_done)
+
+    def _expiry_done(self, task: asyncio.Task) -> None:
+        self._expiring.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Session expiry failed: {task.exception()!r}")
+
+    async def _expire(self, session_id: str) -> None:
+        self._expiry.pop(session_id, None)
+        if session_id in self._sessions and self._connections.get(session_id) is None:
+            print(f"Session {session_id} expired after {self.ttl:.0f}s without reconnect")
+            self.expired += 1
+            await self.end(session_id)
+
+    async def end(self, session_id: str) -> None:
+        """
+        Close a session and release its admission slot.
+
+        Args:
+            session_id: Session to close
+        """
+        session = self._sessions.pop(session_id, None)
+        self._connections.pop(session_id, None)
+        timer = self._expiry.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        if session is not None:
+            try:
+                await session.close()
+            finally:
+                self.admission.release("session")
+
+    async def close_all(self) -> None:
+        """Close every stored session (used at shutdown)."""
+        if self._expiring:
+            await asyncio.gather(*self._expiring, return_exceptions=True)
+        for session_id in list(self._sessions):
+            await self.end(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        detached = sum(1 for connection in self._connections.values() if connection is None)
+        return {
+            "sessions": len(self._sessions),
+            "detached": detached,
+            "created": self.created,
+            "resumed": self.resumed,
+            "expired": self.expired,
+        }
@@ -1,18 +1,58 @@
-from typing import AsyncIterator, Optional
+import asyncio
+import os
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+import numpy as np
 
 from app.core.config import settings, STTModel
 from app.services.providers import (
     BatchSTTProvider,
+    ChunkTranscript,
     DeepgramProvider,
+    FileTranscript,
     StreamingSTTProvider,
     TranscriptEvent,
     WhisperBatchProvider,
 )
+from app.services.job_queue import InProcessJobQueue, JobQueue
+from app.services.scheduler import ANONYMOUS_USER, InferenceScheduler, Priority
+from app.utils.audio_file import AudioFileHandler
+from app.utils.media_probe import probe_duration
+from app.utils.transcription_cache import TranscriptionCache
+
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def _audio_seconds(file_path: str) -> float:
+    # Compressed uploads are far longer than their size suggests, so measure the real duration
+    duration = probe_duration(file_path)
+    if duration is not None:
+        return duration
+    return os.path.getsize(file_path) / (settings.SAMPLE_RATE * 2)
+
+
+def _as_transcript(value: Any) -> FileTranscript:
+    # Cache entries written before segment scores were kept are plain strings
+    if isinstance(value, str):
+        return {"text": value, "segments": []}
+    return value
 
 
 class STTService:
-    def __init__(self):
-        self.batch_provider: BatchSTTProvider
+    def __init__(self, job_queue: Optional[JobQueue] = None):
+        """
+        Initialize the service.
+
+        Args:
+            job_queue: Queue that runs batch transcriptions. Defaults to running them
+                in this process; with a remote queue no batch model is loaded here.
+        """
+        # Batch models are only loaded where the jobs run
+        load_models = job_queue is None or job_queue.local
+        self.batch_provider: Optional[BatchSTTProvider] = None
         self.streaming_provider: Optional[StreamingSTTProvider] = None
 
         try:
@@ -20,19 +60,260 @@ class STTService:
                 case STTModel.DEEPGRAM:
                     print("Initializing Deepgram STT Provider...")
                     provider = DeepgramProvider()
-                    self.batch_provider = provider
                     self.streaming_provider = provider
+                    if load_models:
+                        self.batch_provider = provider
                 case STTModel.WHISPER:
-                    print("Initializing Whisper STT Provider...")
-                    self.batch_provider = WhisperBatchProvider()
+                    if load_models:
+                        print("Initializing Whisper STT Provider...")
+                        self.batch_provider = WhisperBatchProvider()
                 case _:
                     raise ValueError(f"Unsupported STT model: {settings.STT_MODEL}")
         except Exception as e:
             print(f"Failed to init {settings.STT_MODEL}: {e}. Falling back to Whisper.")
-            self.batch_provider = WhisperBatchProvider()
+            if load_models:
+                self.batch_provider = WhisperBatchProvider()
+
+        # Smaller model used while the server is under pressure
+        self.degraded_provider: Optional[BatchSTTProvider] = None
+        if settings.WHISPER_DEGRADED_MODEL and isinstance(self.batch_provider, WhisperBatchProvider):
+            print(f"Initializing degraded-mode Whisper model {settings.WHISPER_DEGRADED_MODEL}...")
+            self.degraded_provider = WhisperBatchProvider(settings.WHISPER_DEGRADED_MODEL)
+
+        self.job_queue: JobQueue = job_queue or InProcessJobQueue(
+            "stt",
+            {
+                "stt": self._run_transcription,
+                "stt_audio": self._run_audio_transcription,
+                "stt_batch": self.transcribe_batch,
+            },
+        )
+
+        self.cache: Optional[TranscriptionCache] = None
+        if settings.STT_CACHE_ENABLED:
+            self.cache = TranscriptionCache(settings.STT_CACHE_MAX_BYTES, settings.STT_CACHE_DIR)
+
+        # Local models get a single slot; remote APIs and worker pools can take many requests at once
+        if not self.job_queue.local:
+            concurrency = settings.JOB_BROKER_CONCURRENCY
+        elif isinstance(self.batch_provider, DeepgramProvider):
+            concurrency = settings.DEEPGRAM_CONCURRENCY
+        else:
+            concurrency = settings.WHISPER_CONCURRENCY
+        self.scheduler = InferenceScheduler("stt", concurrency)
+
+    def _select_provider(self, degraded: bool) -> BatchSTTProvider:
+        if degraded and self.degraded_provider is not None:
+            return self.degraded_provider
+        return self.batch_provider
+
+    def _model_id(self, degraded: bool) -> str:
+        """Cache namespace of the model that will serve a request."""
+        if self.batch_provider is not None:
+            return self._select_provider(degraded).model_id
+        # Remote workers are expected to run the same STT settings as this process
+        if isinstance(self.streaming_provider, DeepgramProvider):
+            return self.streaming_provider.model_id
+        if degraded and settings.WHISPER_DEGRADED_MODEL:
+            return WhisperBatchProvider.model_id_for(settings.WHISPER_DEGRADED_MODEL)
+        return WhisperBatchProvider.model_id_for(settings.WHISPER_MODEL)
+
+    async def _run_transcription(
+        self,
+        file_path: Optional[str] = None,
+        audio: Optional[bytes] = None,
+        suffix: str = ".wav",
+        degraded: bool = False,
+    ) -> FileTranscript:
+        """
+        Job handler for "stt": transcribe a local file or audio bytes shipped by a frontend.
+
+        Args:
+            file_path: Audio file readable by this process
+            audio: Encoded audio file contents, used when file_path is not given
+            suffix: File extension for the audio bytes (selects the decoder)
+            degraded: Use the degraded-mode model if one is loaded
+
+        Returns:
+            Transcribed text with segment scores (empty if the provider has none)
+        """
+        provider = self._select_provider(degraded)
+        audio_handler = AudioFileHandler(settings.SAMPLE_RATE)
+        temp_filename = None
+        if file_path is None:
+            temp_filename = await asyncio.to_thread(audio_handler.save_encoded, audio, suffix)
+            file_path = temp_filename
+
+        try:
+            if hasattr(provider, "transcribe_file_detailed"):
+                return await asyncio.to_thread(provider.transcribe_file_detailed, file_path)
+            if hasattr(provider, "transcribe_file_async"):
+                text = await provider.transcribe_file_async(file_path)
+            else:
+                # Providers without native async calls run in the thread pool
+                text = await asyncio.to_thread(provider.transcribe_file, file_path)
+            return {"text": text, "segments": []}
+        finally:
+            if temp_filename:
+                audio_handler.cleanup(temp_filename)
+
+    async def _run_audio_transcription(self, audio: np.ndarray, degraded: bool = False) -> FileTranscript:
+        """
+        Job handler for "stt_audio": transcribe float32 samples at SAMPLE_RATE.
+
+        Args:
+            audio: Mono float32 samples from the audio front-end
+            degraded: Use the degraded-mode model if one is loaded
+
+        Returns:
+            Transcribed text with segment scores (empty if the provider has none)
+        """
+        provider = self._select_provider(degraded)
+        if hasattr(provider, "transcribe_audio_detailed"):
+            return await asyncio.to_thread(provider.transcribe_audio_detailed, audio)
+
+        # File-based providers get a 16-bit WAV
+        audio_handler = AudioFileHandler(settings.SAMPLE_RATE)
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        temp_filename = await asyncio.to_thread(audio_handler.save_to_wav, pcm)
+        try:
+            return await self._run_transcription(file_path=temp_filename, degraded=degraded)
+        finally:
+            audio_handler.cleanup(temp_filename)
+
+    def transcribe_file(self, file_path: str, degraded: bool = False) -> str:
+        provider = self._select_provider(degraded)
+        if self.cache is None:
+            return provider.transcribe_file(file_path)
+
+        key = TranscriptionCache.fingerprint_file(file_path, provider.model_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return _as_transcript(cached)["text"]
+
+        text = provider.transcribe_file(file_path)
+        self.cache.put(key, {"text": text, "segments": []})
+        return text
+
+    async def transcribe_file_async(
+        self,
+        file_path: str,
+        degraded: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+    ) -> str:
+        transcript = await self.transcribe_file_detailed_async(file_path, degraded, priority, user_id)
+        return transcript["text"]
+
+    async def transcribe_file_detailed_async(
+        self,
+        file_path: str,
+        degraded: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+    ) -> FileTranscript:
+        """
+        Transcribe a file, keeping the segment scores used by the transcription filter.
+
+        Args:
+            file_path: Audio file to transcribe
+            degraded: Use the degraded-mode model if one is loaded
+            priority: Scheduling class of the request
+            user_id: Fair-share key of the requester
+
+        Returns:
+            Transcribed text and segment scores (empty if the provider has none)
+        """
+        # Cache hits never wait for the scheduler
+        key = None
+        if self.cache is not None:
+            key = await asyncio.to_thread(TranscriptionCache.fingerprint_file, file_path, self._model_id(degraded))
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                return _as_transcript(cached)
+
+        # The work is proportional to the audio length
+        cost = await asyncio.to_thread(_audio_seconds, file_path)
+        async with self.scheduler.slot(priority, user_id, cost):
+            if self.job_queue.local:
+                payload = {"file_path": file_path, "degraded": degraded}
+            else:
+                # Workers can't see our filesystem, so the audio travels with the job
+                audio = await asyncio.to_thread(_read_file, file_path)
+                payload = {"audio": audio, "suffix": os.path.splitext(file_path)[1] or ".wav", "degraded": degraded}
+            transcript = await self.job_queue.submit("stt", payload, priority)
+
+        if key is not None:
+            await self.cache.put_async(key, transcript)
+        return transcript
+
+    async def transcribe_audio_detailed_async(
+        self,
+        audio: np.ndarray,
+        degraded: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+        user_id: str = ANONYMOUS_USER,
+    ) -> FileTranscript:
+        """
+        Transcribe in-memory audio, skipping the WAV round trip of file transcription.
+
+        Args:
+            audio: Mono float32 samples at SAMPLE_RATE
+            degraded: Use the degraded-mode model if one is loaded
+            priority: Scheduling class of the request
+            user_id: Fair-share key of the requester
+
+        Returns:
+            Transcribed text and segment scores (empty if the provider has none)
+        """
+        key = None
+        if self.cache is not None:
+            key = await asyncio.to_thread(
+                TranscriptionCache.fingerprint_bytes, audio.tobytes(), self._model_id(degraded)
+            )
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                return _as_transcript(cached)
+
+        cost = len(audio) / settings.SAMPLE_RATE
+        async with self.scheduler.slot(priority, user_id, cost):
+            # Arrays travel to remote workers as binary blobs
+            transcript = await self.job_queue.submit("stt_audio", {"audio": audio, "degraded": degraded}, priority)
+
+        if key is not None:
+            await self.cache.put_async(key, transcript)
+        return transcript
+
+    async def aclose(self) -> None:
+        if hasattr(self.batch_provider, "aclose"):
+            await self.batch_provider.aclose()
+
+    def transcribe_batch(self, chunks: Sequence[np.ndarray]) -> List[ChunkTranscript]:
+        if hasattr(self.batch_provider, "transcribe_batch"):
+            return self.batch_provider.transcribe_batch(chunks)
+
+        # Providers without batched inference get one file per chunk and no word timestamps
+        audio_handler = AudioFileHandler(settings.SAMPLE_RATE)
+        transcripts: List[ChunkTranscript] = []
+        for chunk in chunks:
+            pcm = (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+            temp_filename = audio_handler.save_to_wav(pcm)
+            try:
+                transcripts.append({"text": self.transcribe_file(temp_filename), "words": []})
+            finally:
+                audio_handler.cleanup(temp_filename)
+        return transcripts
 
-    def transcribe_file(self, file_path: str) -> str:
-        return self.batch_provider.transcribe_file(file_path)
+    async def transcribe_batch_async(
+        self,
+        chunks: Sequence[np.ndarray],
+        priority: Priority = Priority.BULK,
+        user_id: str = ANONYMOUS_USER,
+    ) -> List[ChunkTranscript]:
+        # One slot per batch, so interactive work can overtake between batches
+        cost = sum(len(chunk) for chunk in chunks) / settings.SAMPLE_RATE
+        async with self.scheduler.slot(priority, user_id, cost):
+            return await self.job_queue.submit("stt_batch", {"chunks": list(chunks)}, priority)
 
     async def stream(
         self, audio_chunks: AsyncIterator[bytes]
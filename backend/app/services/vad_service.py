@@ -1,6 +1,8 @@
 import torch
 import numpy as np
+from typing import Callable, List, Optional, Union
 from app.core.config import settings
+from app.utils.energy_gate import EnergyGate
 
 class VADService:
     def __init__(self):
@@ -23,15 +25,41 @@ class VADService:
         self.is_speaking = False
         self.chunk_size = int(settings.VAD_INTERVAL * settings.SAMPLE_RATE * 2)
 
-    def is_speech(self, audio_chunk: bytes) -> bool:
+        # Energy pre-gate counters
+        self.chunks_total = 0
+        self.chunks_skipped = 0
+
+    def create_energy_gate(self) -> Optional[EnergyGate]:
+        """Create a per-stream energy pre-gate, or None if the pre-gate is disabled."""
+        if not settings.VAD_ENERGY_GATE_ENABLED:
+            return None
+        return EnergyGate(
+            margin_db=settings.VAD_ENERGY_GATE_MARGIN_DB,
+            max_dbfs=settings.VAD_ENERGY_GATE_MAX_DBFS,
+            hangover_chunks=int(settings.VAD_ENERGY_GATE_HANGOVER / settings.VAD_INTERVAL),
+        )
+
+    def is_speech(self, audio_chunk: Union[bytes, np.ndarray], energy_gate: Optional[EnergyGate] = None) -> bool:
         """
         Check if the given audio chunk contains speech.
-        Assumes 16kHz sample rate, mono, 16-bit PCM.
+        Assumes 16kHz sample rate, mono; either 16-bit PCM bytes or float32
+        samples from the audio front-end (used as is, without another conversion).
+
+        If an energy gate is given, chunks it classifies as clear silence
+        skip the Silero model entirely.
         """
-        # Convert bytes to float32 tensor
-        audio_int16 = np.frombuffer(audio_chunk, dtype=np.int16)
-        audio_float32 = audio_int16.astype(np.float32) / 32768.0
-        tensor = torch.from_numpy(audio_float32)
+        if isinstance(audio_chunk, np.ndarray):
+            samples = audio_chunk
+        else:
+            samples = np.frombuffer(audio_chunk, dtype=np.int16)
+        self.chunks_total += 1
+        if energy_gate is not None and energy_gate.is_silence(samples):
+            self.chunks_skipped += 1
+            return False
+
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        tensor = torch.from_numpy(samples)
         
         # Silero expects a batch dimension: (1, N)
         if tensor.dim() == 1:
@@ -40,10 +68,68 @@ class VADService:
         speech_prob = self.model(tensor, settings.SAMPLE_RATE).item()
         return speech_prob > settings.VAD_THRESHOLD
 
+    def speech_timestamps(self, audio: np.ndarray) -> list[dict]:
+        """
+        Find speech regions in a float32 waveform.
+        Assumes 16kHz sample rate, mono.
 
+        Returns:
+            List of {"start": int, "end": int} sample offsets
+        """
+        return self.get_speech_timestamps(
+            torch.from_numpy(audio),
+            self.model,
+            sampling_rate=settings.SAMPLE_RATE,
+        )
+
+    def stats(self) -> dict:
+        """Fraction of chunks the energy pre-gate kept away from the model."""
+        return {
+            "chunks_total": self.chunks_total,
+            "chunks_skipped": self.chunks_skipped,
+            "skipped_fraction": self.chunks_skipped / self.chunks_total if self.chunks_total else 0.0,
+        }
 
     def reset(self):
         self.vad_iterator.reset_states()
         self.buffer = bytearray()
         self.speech_buffer = bytearray()
         self.is_speaking = False
+
+
+class VADPool:
+    """
+    Lends VADService instances to streams that must not share model state.
+
+    Silero keeps recurrent state between calls, so two streams classified by
+    one model would leak into each other. Each borrower gets an instance of
+    its own, reset on loan; returned instances are reused by later streams.
+    """
+
+    def __init__(self, factory: Callable[[], VADService] = VADService):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Creates a new instance when none is idle (loads the model)
+        """
+        self.factory = factory
+        self._idle: List[VADService] = []
+        self.created = 0
+
+    def acquire(self) -> VADService:
+        """Borrow an instance with fresh state (blocks while a new model loads)."""
+        if self._idle:
+            vad_service = self._idle.pop()
+        else:
+            vad_service = self.factory()
+            self.created += 1
+        vad_service.reset()
+        return vad_service
+
+    def release(self, vad_service: VADService) -> None:
+        """Return a borrowed instance."""
+        self._idle.append(vad_service)
+
+    def stats(self) -> dict:
+        return {"created": self.created, "idle": len(self._idle)}
@@ -1,13 +1,24 @@
 import os
+import json
 import uuid
 import shutil
 import subprocess
 from datetime import datetime
-from typing import BinaryIO
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.media_probe import probe_stream_types
 
 
 class VideoService:
-    """Service for handling video file operations and conversions."""
+    """
+    Service for handling video file operations and conversions.
+
+    A single ffmpeg run decodes the upload once and fans the frames out to
+    every output: a faststart MP4 with regular keyframes, optional HLS/fMP4
+    renditions and a thumbnail sprite sheet. A keyframe index is then read
+    from the MP4 packets without decoding.
+    """
     
     def __init__(self, base_dir: str = "videos"):
         """
@@ -18,16 +29,17 @@ class VideoService:
         """
         self.base_dir = base_dir
     
-    def save_and_convert_video(self, video_file: BinaryIO, filename: str) -> str:
+    def save_and_convert_video(self, video_file: BinaryIO, filename: str) -> Dict[str, Any]:
         """
-        Save and convert a video file to MP4 format.
+        Save and convert a video file to MP4 format plus playback aids.
         
         Args:
             video_file: Binary file object containing the video data
             filename: Desired filename for the saved video
             
         Returns:
-            str: Full path to the saved video file
+            dict: Paths of the outputs: "path" (MP4), "hls" (master playlist or None),
+                "thumbnails" (WebVTT sprite index or None) and "keyframes" (JSON index)
             
         Raises:
             Exception: If video conversion fails
@@ -48,48 +60,145 @@ class VideoService:
         # Create temp file for input WebM
         temp_input_path = f"temp_input_{uuid.uuid4()}.webm"
         final_output_path = os.path.join(video_dir, final_filename)
+        stem = os.path.splitext(final_output_path)[0]
+        hls_dir = f"{stem}_hls" if settings.VIDEO_HLS_ENABLED else None
+        thumbs_dir = f"{stem}_thumbs" if settings.VIDEO_THUMBNAILS_ENABLED else None
         
         try:
             # Save uploaded WebM to temp file
             with open(temp_input_path, "wb") as buffer:
                 shutil.copyfileobj(video_file, buffer)
             
-            # Convert to MP4 using ffmpeg
-            self._convert_to_mp4(temp_input_path, final_output_path)
+            # Audio-only recordings (e.g. a MediaRecorder blob without a camera) get no video outputs;
+            # if the probe fails, assume video and let ffmpeg report the problem
+            streams = probe_stream_types(temp_input_path)
+            has_video = streams is None or "video" in streams
+            if not has_video:
+                hls_dir = thumbs_dir = None
+
+            # Convert to MP4 (and the other outputs) using ffmpeg
+            self._convert_to_mp4(temp_input_path, final_output_path, hls_dir, thumbs_dir, has_video)
+
+            index_path = f"{stem}.keyframes.json"
+            keyframes = self._write_keyframe_index(final_output_path, index_path)
+            outputs = {
+                "path": final_output_path,
+                "keyframes": index_path,
+                "hls": self._write_hls_master(hls_dir) if hls_dir else None,
+                "thumbnails": self._write_thumbnail_vtt(thumbs_dir, keyframes["duration"]) if thumbs_dir else None,
+            }
             
             print(f"Video saved and converted to: {final_output_path}")
-            return final_output_path
+            return outputs
             
         finally:
             # Cleanup temp file
             if os.path.exists(temp_input_path):
                 os.remove(temp_input_path)
     
-    def _convert_to_mp4(self, input_path: str, output_path: str) -> None:
+    def _convert_to_mp4(
+        self,
+        input_path: str,
+        output_path: str,
+        hls_dir: Optional[str] = None,
+        thumbs_dir: Optional[str] = None,
+        has_video: bool = True,
+    ) -> None:
         """
-        Convert a video file to MP4 format using ffmpeg.
+        Convert a video file to MP4 format using ffmpeg, producing the other outputs in the same pass.
         
         Args:
             input_path: Path to input video file
             output_path: Path where MP4 should be saved
+            hls_dir: Directory for HLS renditions (skipped if None)
+            thumbs_dir: Directory for thumbnail sprite sheets (skipped if None)
+            has_video: False for audio-only input; only the audio is converted
             
         Raises:
             Exception: If ffmpeg conversion fails
         """
-        # Command: ffmpeg -i input.webm -c:v libx264 -preset fast -c:a aac output.mp4
-        # -y: Overwrite output files without asking
-        # -vf "scale=trunc(iw/2)*2:trunc(ih/2)*2": Ensure dimensions are even for libx264
+        if not has_video:
+            command = [
+                "ffmpeg",
+                "-i", input_path,
+                "-map", "0:a",
+                "-c:a", "aac",
+                "-movflags", "+faststart",
+                "-y",
+                output_path,
+            ]
+            self._run_ffmpeg(command)
+            return
+
+        renditions = self._hls_renditions() if hls_dir else []
+        thumbnails = 1 if thumbs_dir else 0
+
+        # Decode once, make dimensions even for libx264, then fan out to every output
+        branches = ["[vmp4]"] + [f"[vhls{i}]" for i in range(len(renditions))] + ["[vthumb]"] * thumbnails
+        filters = [f"[0:v]scale=trunc(iw/2)*2:trunc(ih/2)*2,split={len(branches)}{''.join(branches)}"]
+        for i, (height, _) in enumerate(renditions):
+            filters.append(f"[vhls{i}]scale=-2:'min({height},ih)'[vhls{i}out]")
+        if thumbnails:
+            width, height = settings.VIDEO_THUMBNAIL_WIDTH, settings.VIDEO_THUMBNAIL_HEIGHT
+            filters.append(
+                f"[vthumb]fps=1/{settings.VIDEO_THUMBNAIL_INTERVAL},"
+                f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+                f"tile={settings.VIDEO_SPRITE_COLUMNS}x{settings.VIDEO_SPRITE_ROWS}[vthumbout]"
+            )
+
+        # Regular keyframes make seeking cheap; HLS segments must start on one
+        keyframes = ["-force_key_frames", f"expr:gte(t,n_forced*{settings.VIDEO_KEYFRAME_INTERVAL})"]
+
+        # -movflags +faststart: move the moov atom to the front so playback starts before the download ends
         command = [
             "ffmpeg",
             "-i", input_path,
+            "-filter_complex", ";".join(filters),
+            "-map", "[vmp4]", "-map", "0:a?",
             "-c:v", "libx264",
             "-preset", "fast",
+            *keyframes,
             "-c:a", "aac",
-            "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+            "-movflags", "+faststart",
             "-y",
-            output_path
+            output_path,
         ]
-        
+
+        for i, (_, bitrate) in enumerate(renditions):
+            rendition_dir = os.path.join(hls_dir, str(i))
+            os.makedirs(rendition_dir, exist_ok=True)
+            command += [
+                "-map", f"[vhls{i}out]", "-map", "0:a?",
+                "-c:v", "libx264",
+                "-preset", "fast",
+                "-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate,
+                *keyframes,
+                "-c:a", "aac", "-b:a", "96k",
+                "-f", "hls",
+                "-hls_time", str(settings.VIDEO_HLS_SEGMENT_SECONDS),
+                "-hls_playlist_type", "vod",
+                "-hls_segment_type", "fmp4",
+                "-hls_fmp4_init_filename", "init.mp4",
+                "-hls_segment_filename", os.path.join(rendition_dir, "segment_%04d.m4s"),
+                "-y",
+                os.path.join(rendition_dir, "index.m3u8"),
+            ]
+
+        if thumbnails:
+            os.makedirs(thumbs_dir, exist_ok=True)
+            command += [
+                "-map", "[vthumbout]",
+                "-fps_mode", "vfr",
+                "-q:v", "5",
+                "-y",
+                os.path.join(thumbs_dir, "sprite_%03d.jpg"),
+            ]
+
+        self._run_ffmpeg(command)
+
+    @staticmethod
+    def _run_ffmpeg(command: List[str]) -> None:
         print(f"Converting video: {' '.join(command)}")
         result = subprocess.run(command, capture_output=True, text=True)
         
@@ -97,6 +206,119 @@ class VideoService:
             print(f"FFmpeg error: {result.stderr}")
             raise Exception(f"FFmpeg conversion failed: {result.stderr}")
 
+    def _hls_renditions(self) -> List[tuple]:
+        """Parse VIDEO_HLS_RENDITIONS ("height:bitrate" entries) into (height, bitrate) tuples."""
+        renditions = []
+        for entry in settings.VIDEO_HLS_RENDITIONS:
+            height, bitrate = entry.split(":")
+            renditions.append((int(height), bitrate))
+        return renditions
+
+    def _write_hls_master(self, hls_dir: str) -> str:
+        """
+        Write the master playlist listing every HLS rendition.
+
+        Args:
+            hls_dir: Directory containing one subdirectory per rendition
+
+        Returns:
+            str: Path to the master playlist
+        """
+        lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+        for i, (height, bitrate) in enumerate(self._hls_renditions()):
+            bandwidth = self._parse_bitrate(bitrate) + 96_000
+            lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},NAME=\"{height}p\"")
+            lines.append(f"{i}/index.m3u8")
+
+        master_path = os.path.join(hls_dir, "master.m3u8")
+        with open(master_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return master_path
+
+    @staticmethod
+    def _parse_bitrate(bitrate: str) -> int:
+        multipliers = {"k": 1_000, "m": 1_000_000}
+        suffix = bitrate[-1].lower()
+        if suffix in multipliers:
+            return int(float(bitrate[:-1]) * multipliers[suffix])
+        return int(bitrate)
+
+    def _write_thumbnail_vtt(self, thumbs_dir: str, duration: float) -> str:
+        """
+        Write a WebVTT track mapping time ranges to tiles of the sprite sheets.
+
+        Args:
+            thumbs_dir: Directory containing the sprite sheets
+            duration: Video duration in seconds
+
+        Returns:
+            str: Path to the WebVTT file
+        """
+        interval = settings.VIDEO_THUMBNAIL_INTERVAL
+        width, height = settings.VIDEO_THUMBNAIL_WIDTH, settings.VIDEO_THUMBNAIL_HEIGHT
+        columns, rows = settings.VIDEO_SPRITE_COLUMNS, settings.VIDEO_SPRITE_ROWS
+
+        def timestamp(seconds: float) -> str:
+            hours, rest = divmod(seconds, 3600)
+            minutes, secs = divmod(rest, 60)
+            return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+        lines = ["WEBVTT", ""]
+        index = 0
+        while index * interval < duration:
+            sheet, tile = divmod(index, columns * rows)
+            row, column = divmod(tile, columns)
+            start = index * interval
+            end = min(start + interval, duration)
+            lines.append(f"{timestamp(start)} --> {timestamp(end)}")
+            lines.append(f"sprite_{sheet + 1:03d}.jpg#xywh={column * width},{row * height},{width},{height}")
+            lines.append("")
+            index += 1
+
+        vtt_path = os.path.join(thumbs_dir, "thumbnails.vtt")
+        with open(vtt_path, "w") as f:
+            f.write("\n".join(lines))
+        return vtt_path
+
+    def _write_keyframe_index(self, video_path: str, index_path: str) -> Dict[str, Any]:
+        """
+        Record the time and byte position of every video keyframe.
+
+        Reads packet flags with ffprobe, which demuxes but does not decode.
+
+        Args:
+            video_path: MP4 to index
+            index_path: Where to write the JSON index
+
+        Returns:
+            dict: The index ("duration" and "keyframes" list of {"time", "pos"})
+        """
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,pos,flags:format=duration",
+            "-of", "json",
+            video_path,
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"FFprobe error: {result.stderr}")
+            raise Exception(f"FFprobe keyframe scan failed: {result.stderr}")
+
+        probe = json.loads(result.stdout)
+        keyframes = [
+            {"time": float(packet["pts_time"]), "pos": int(packet["pos"])}
+            for packet in probe.get("packets", [])
+            if "K" in packet.get("flags", "") and "pts_time" in packet and "pos" in packet
+        ]
+        keyframes.sort(key=lambda k: k["time"])
+        index = {"duration": float(probe.get("format", {}).get("duration", 0.0)), "keyframes": keyframes}
+
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+        return index
+
 
 # Singleton instance
 video_service = VideoService()
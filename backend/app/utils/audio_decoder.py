@@ -0,0 +1,70 @@
+"""Streaming audio decoding utility."""
+import subprocess
+import tempfile
+from typing import Iterator
+
+import numpy as np
+
+
+class StreamingAudioDecoder:
+    """Decodes any ffmpeg-readable file to mono float32 PCM in fixed-size blocks."""
+
+    # Bytes of ffmpeg's log kept for the error message
+    STDERR_TAIL_BYTES = 4096
+
+    def __init__(self, file_path: str, sample_rate: int = 16000, block_seconds: float = 10.0):
+        """
+        Initialize the decoder.
+
+        Args:
+            file_path: Audio or video file to decode
+            sample_rate: Output sample rate in Hz
+            block_seconds: Duration of each yielded block in seconds
+        """
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.block_bytes = int(block_seconds * sample_rate) * 2
+
+    def blocks(self) -> Iterator[np.ndarray]:
+        """
+        Decode the file incrementally.
+
+        Yields:
+            float32 arrays in [-1, 1] of at most block_seconds each
+
+        Raises:
+            Exception: If ffmpeg fails to decode the file
+        """
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel", "error",
+            "-i", self.file_path,
+            "-f", "s16le",
+            "-ac", "1",
+            "-ar", str(self.sample_rate),
+            "pipe:1",
+        ]
+        # stderr goes to a file: a pipe nobody reads while stdout is consumed fills up and stalls ffmpeg
+        stderr_file = tempfile.TemporaryFile()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+        try:
+            while True:
+                data = process.stdout.read(self.block_bytes)
+                if not data:
+                    break
+                # Drop a trailing odd byte rather than failing on a truncated sample
+                data = data[:len(data) - (len(data) % 2)]
+                yield np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+
+            if process.wait() != 0:
+                stderr_file.seek(0, 2)
+                stderr_file.seek(max(0, stderr_file.tell() - self.STDERR_TAIL_BYTES))
+                stderr = stderr_file.read().decode(errors="replace")
+                raise Exception(f"FFmpeg decoding failed: {stderr}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr_file.close()
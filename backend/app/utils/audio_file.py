@@ -38,8 +38,33 @@ class AudioFileHandler:
         
         return self.temp_filename
     
-    def cleanup(self) -> None:
-        """Remove the temporary WAV file if it exists."""
-        if self.temp_filename and os.path.exists(self.temp_filename):
-            os.remove(self.temp_filename)
+    def save_encoded(self, data: bytes, suffix: str = ".wav") -> str:
+        """
+        Save an already encoded audio file (e.g. received over the network).
+
+        Args:
+            data: File contents
+            suffix: File extension, used by decoders to detect the format
+
+        Returns:
+            Path to the created file
+        """
+        self.temp_filename = f"temp_job_{uuid.uuid4()}{suffix}"
+
+        with open(self.temp_filename, "wb") as f:
+            f.write(data)
+
+        return self.temp_filename
+
+    def cleanup(self, file_path: Optional[str] = None) -> None:
+        """
+        Remove a temporary WAV file if it exists.
+
+        Args:
+            file_path: File to remove (defaults to the most recently saved file)
+        """
+        target = file_path or self.temp_filename
+        if target and os.path.exists(target):
+            os.remove(target)
+        if target == self.temp_filename:
             self.temp_filename = None
@@ -0,0 +1,169 @@
+"""Audio front-end utility: downmix, resampling and float conversion of client PCM."""
+import math
+
+import numpy as np
+
+
+class PolyphaseResampler:
+    """
+    Streaming rational-ratio resampler.
+
+    Conceptually the input is upsampled by `up` (zero stuffing), low-pass
+    filtered with a windowed-sinc FIR and decimated by `down`. The polyphase
+    form only evaluates the filter taps that meet non-zero input samples at
+    the kept output positions, so each output sample costs `taps_per_phase`
+    multiply-adds. The last input samples and the output phase are carried
+    between calls, so blocks can be split anywhere without clicks.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, taps_per_phase: int = 24):
+        """
+        Initialize the resampler.
+
+        Args:
+            input_rate: Sample rate of the input in Hz
+            output_rate: Sample rate of the output in Hz
+            taps_per_phase: FIR taps per polyphase branch at equal rates, scaled up by the
+                decimation factor (longer is sharper and slower)
+        """
+        divisor = math.gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        # When decimating, the filter has to span proportionally more input samples
+        taps_per_phase *= max(1, -(-self.down // self.up))
+        self.taps = taps_per_phase
+
+        # Prototype filter at the upsampled rate; cut off a little below the lower Nyquist frequency
+        length = self.up * taps_per_phase
+        cutoff = 0.475 / max(self.up, self.down)
+        n = np.arange(length) - (length - 1) / 2
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+        prototype *= self.up / prototype.sum()
+        # phases[p, k] = prototype[p + k * up]
+        self.phases = prototype.reshape(taps_per_phase, self.up).T.astype(np.float32)
+
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        # Position of the next output sample, in upsampled samples from the start of the next block
+        self._next = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of a stream.
+
+        Args:
+            samples: Mono float32 input block
+
+        Returns:
+            Resampled float32 block (may be empty for very short inputs)
+        """
+        extended = np.concatenate((self._history, samples))
+        available = len(samples) * self.up
+        count = max(0, -(-(available - self._next) // self.down))
+
+        positions = self._next + self.down * np.arange(count)
+        newest = positions // self.up + (self.taps - 1)
+        window = extended[newest[:, None] - np.arange(self.taps)[None, :]]
+        output = np.einsum("nk,nk->n", window, self.phases[positions % self.up])
+
+        self._next += count * self.down - available
+        self._history = extended[len(extended) - (self.taps - 1):].copy()
+        return output.astype(np.float32, copy=False)
+
+    def reset(self) -> None:
+        """Forget the stream history."""
+        self._history[:] = 0.0
+        self._next = 0
+
+
+class AudioFrontend:
+    """
+    Turns client audio in any rate and channel count into mono float32 at the model rate.
+
+    Input is interleaved 16-bit PCM. Each block is converted to float once,
+    downmixed by averaging the channels and resampled if needed; the result
+    is what both VAD and STT consume. Bytes of an incomplete frame at the end
+    of a block are kept for the next one.
+    """
+
+    def __init__(self, input_rate: int, channels: int, output_rate: int, taps_per_phase: int = 24):
+        """
+        Initialize the front-end.
+
+        Args:
+            input_rate: Client sample rate in Hz
+            channels: Client channel count (interleaved)
+            output_rate: Sample rate of the output in Hz
+            taps_per_phase: FIR taps per polyphase branch of the resampler
+        """
+        self.input_rate = input_rate
+        self.channels = channels
+        self.output_rate = output_rate
+        self.frame_bytes = 2 * channels
+        self.resampler = None
+        if input_rate != output_rate:
+            self.resampler = PolyphaseResampler(input_rate, output_rate, taps_per_phase)
+        self._partial = b""
+
+    @property
+    def bytes_per_second(self) -> int:
+        """Client audio bytes per second of sound."""
+        return self.input_rate * self.frame_bytes
+
+    def process(self, data: bytes) -> np.ndarray:
+        """
+        Convert the next block of client audio.
+
+        Args:
+            data: Interleaved 16-bit PCM bytes, in any block size
+
+        Returns:
+            Mono float32 samples in [-1, 1) at output_rate
+        """
+        if self._partial:
+            data = self._partial + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._partial = data[usable:]
+
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2).astype(np.float32)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        samples *= 1.0 / 32768.0
+
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+        return samples
+
+
+class SampleBuffer:
+    """Growable float32 buffer that keeps its storage when cleared."""
+
+    def __init__(self, capacity: int = 16000):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Initial capacity in samples
+        """
+        self._data = np.empty(capacity, dtype=np.float32)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, samples: np.ndarray) -> None:
+        """Append samples, growing the storage geometrically when full."""
+        end = self._length + len(samples)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=np.float32)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+        self._data[self._length:end] = samples
+        self._length = end
+
+    def view(self) -> np.ndarray:
+        """Current contents without copying; only valid until the next append or clear."""
+        return self._data[:self._length]
+
+    def clear(self) -> None:
+        """Drop the contents (the storage is reused)."""
+        self._length = 0
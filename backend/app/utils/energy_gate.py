@@ -0,0 +1,89 @@
+"""Energy-based silence pre-gate utility."""
+from typing import Optional
+
+import numpy as np
+
+
+class EnergyGate:
+    """
+    Cheap classifier for chunks that are clearly silence.
+
+    Tracks an adaptive noise floor from the RMS of chunks below an absolute
+    ceiling. A chunk counts as clear silence only if its RMS is within a margin
+    of that floor and below the ceiling, and it is not a high zero-crossing chunk
+    noticeably above the floor (which may be a fricative at a speech onset).
+    After any chunk that is not clear silence, a hangover of consecutive quiet
+    chunks is required before the gate skips again, so soft onsets and trailing
+    speech still reach the model.
+    """
+
+    def __init__(
+        self,
+        margin_db: float = 6.0,
+        max_dbfs: float = -40.0,
+        hangover_chunks: int = 10,
+        zcr_threshold: float = 0.35,
+        adapt_rate: float = 0.05,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            margin_db: How far above the noise floor a chunk may be and still be silence
+            max_dbfs: Absolute RMS ceiling for silence in dB full scale
+            hangover_chunks: Quiet chunks required after activity before skipping resumes
+            zcr_threshold: Zero-crossing rate above which quiet chunks are not skipped
+            adapt_rate: EMA weight for raising the noise floor (lowering is immediate)
+        """
+        self.margin = 10 ** (margin_db / 20)
+        self.half_margin = 10 ** (margin_db / 40)
+        self.max_rms = 10 ** (max_dbfs / 20)
+        self.hangover_chunks = hangover_chunks
+        self.zcr_threshold = zcr_threshold
+        self.adapt_rate = adapt_rate
+
+        self.noise_floor: Optional[float] = None
+        self.quiet_run = 0
+
+    def is_silence(self, samples: np.ndarray) -> bool:
+        """
+        Check whether a chunk is clearly silence and can skip the VAD model.
+
+        Args:
+            samples: Chunk samples as 16-bit PCM or float32 in [-1, 1]
+
+        Returns:
+            True if the chunk is confidently silence
+        """
+        scale = 32768.0 if samples.dtype == np.int16 else 1.0
+        values = samples.astype(np.float32, copy=False)
+        rms = float(np.sqrt(np.dot(values, values) / max(len(values), 1))) / scale
+        signs = np.signbit(samples)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / max(len(signs) - 1, 1)
+
+        if self.noise_floor is None or rms < self.noise_floor:
+            self.noise_floor = rms
+        elif rms <= self.max_rms:
+            # Follow slow rises of the background level; loud chunks never move the floor
+            self.noise_floor += self.adapt_rate * (rms - self.noise_floor)
+
+        floor = max(self.noise_floor, 1e-5)
+        quiet = (
+            rms <= self.max_rms
+            and rms <= floor * self.margin
+            # Close to the floor the background itself may be noisy; further up, a high
+            # zero-crossing rate hints at a fricative rather than noise
+            and (rms <= floor * self.half_margin or zcr <= self.zcr_threshold)
+        )
+
+        if not quiet:
+            self.quiet_run = 0
+            return False
+
+        self.quiet_run += 1
+        return self.quiet_run > self.hangover_chunks
+
+    def reset(self) -> None:
+        """Forget the noise floor and hangover state."""
+        self.noise_floor = None
+        self.quiet_run = 0
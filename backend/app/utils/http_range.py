@@ -0,0 +1,38 @@
+"""HTTP Range header utility."""
+from typing import Optional, Tuple
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header.
+
+    Args:
+        header: Value of the Range header, if any
+        size: Size of the resource in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole resource
+
+    Raises:
+        ValueError: If the range cannot be satisfied (answer with 416)
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        # Multipart ranges are not supported; serve the whole resource instead
+        return None
+
+    first, _, last = spec.partition("-")
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length <= 0:
+            raise ValueError(f"Unsatisfiable range {header}")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(f"Unsatisfiable range {header}")
+    return start, min(end, size - 1)
@@ -0,0 +1,115 @@
+"""Wire format utility for the job broker and inference workers."""
+import asyncio
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Frame prefix: JSON header length, binary body length
+FRAME_PREFIX = struct.Struct("!II")
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+# Limit for the first frame of a connection, read before the peer is authenticated
+HELLO_MAX_BYTES = 64 * 1024
+
+
+def encode_payload(value: Any) -> Tuple[Any, List[bytes]]:
+    """
+    Split a payload into a JSON-serializable part and binary blobs.
+
+    Bytes and numpy arrays are replaced by references to blobs so audio travels
+    as raw bytes instead of inflated JSON.
+
+    Args:
+        value: Payload made of dicts, lists, JSON scalars, bytes and numpy arrays
+
+    Returns:
+        Tuple of (JSON-serializable payload, list of blobs)
+    """
+    blobs: List[bytes] = []
+
+    def encode(item: Any) -> Any:
+        if isinstance(item, (bytes, bytearray)):
+            blobs.append(bytes(item))
+            return {"__blob__": len(blobs) - 1}
+        if isinstance(item, np.ndarray):
+            blobs.append(np.ascontiguousarray(item).tobytes())
+            return {"__blob__": len(blobs) - 1, "dtype": str(item.dtype), "shape": list(item.shape)}
+        if isinstance(item, dict):
+            return {key: encode(val) for key, val in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [encode(val) for val in item]
+        return item
+
+    return encode(value), blobs
+
+
+def decode_payload(value: Any, blobs: List[bytes]) -> Any:
+    """
+    Rebuild a payload produced by encode_payload.
+
+    Args:
+        value: JSON part of the payload
+        blobs: Binary blobs referenced by the JSON part
+
+    Returns:
+        The original payload
+    """
+    if isinstance(value, dict):
+        if "__blob__" in value:
+            blob = blobs[value["__blob__"]]
+            if "dtype" in value:
+                # Copy into a writable buffer; consumers may modify arrays in place
+                return np.frombuffer(bytearray(blob), dtype=value["dtype"]).reshape(value["shape"])
+            return blob
+        return {key: decode_payload(val, blobs) for key, val in value.items()}
+    if isinstance(value, list):
+        return [decode_payload(val, blobs) for val in value]
+    return value
+
+
+def pack_message(message: Dict[str, Any], payload: Any = None) -> bytes:
+    """
+    Serialize a control message and its payload into one frame.
+
+    Args:
+        message: Control fields (type, job id, kind, ...)
+        payload: Optional payload, see encode_payload
+
+    Returns:
+        Frame bytes ready to write to the socket
+    """
+    encoded, blobs = encode_payload(payload)
+    header = json.dumps({**message, "payload": encoded, "blobs": [len(blob) for blob in blobs]}).encode()
+    body = b"".join(blobs)
+    return FRAME_PREFIX.pack(len(header), len(body)) + header + body
+
+
+async def read_message(reader: asyncio.StreamReader, max_bytes: int = MAX_FRAME_BYTES) -> Tuple[Dict[str, Any], Any]:
+    """
+    Read one frame written by pack_message.
+
+    Args:
+        reader: Stream to read from
+        max_bytes: Largest frame accepted; checked before the frame is read
+
+    Returns:
+        Tuple of (control message, decoded payload)
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection closes mid-frame
+        ValueError: If the frame exceeds max_bytes
+    """
+    header_len, body_len = FRAME_PREFIX.unpack(await reader.readexactly(FRAME_PREFIX.size))
+    if header_len + body_len > max_bytes:
+        raise ValueError(f"Frame of {header_len + body_len} bytes exceeds limit")
+
+    message = json.loads(await reader.readexactly(header_len))
+    body = await reader.readexactly(body_len)
+
+    blobs: List[bytes] = []
+    offset = 0
+    for length in message.pop("blobs"):
+        blobs.append(body[offset:offset + length])
+        offset += length
+    return message, decode_payload(message.pop("payload"), blobs)
@@ -0,0 +1,69 @@
+"""Media file inspection utility."""
+import json
+import subprocess
+import wave
+from typing import Optional, Set
+
+
+def probe_duration(file_path: str) -> Optional[float]:
+    """
+    Get the playing time of an audio or video file without decoding it.
+
+    PCM WAV headers are read directly; anything else is asked to ffprobe,
+    which only reads the container metadata.
+
+    Args:
+        file_path: File to inspect
+
+    Returns:
+        Duration in seconds, or None if it cannot be determined
+    """
+    try:
+        with wave.open(file_path, "rb") as f:
+            return f.getnframes() / f.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "json",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=30)
+        duration = json.loads(result.stdout or b"{}").get("format", {}).get("duration")
+        return float(duration) if duration not in (None, "N/A") else None
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+
+
+def probe_stream_types(file_path: str) -> Optional[Set[str]]:
+    """
+    List the kinds of streams in a media file.
+
+    Args:
+        file_path: File to inspect
+
+    Returns:
+        Stream types such as {"audio", "video"}, or None if ffprobe cannot read the file
+    """
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "stream=codec_type",
+        "-of", "json",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        streams = json.loads(result.stdout).get("streams", [])
+    except ValueError:
+        return None
+    return {stream["codec_type"] for stream in streams if "codec_type" in stream}
@@ -0,0 +1,58 @@
+"""Async stage pipeline utility."""
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+
+class Pipeline:
+    """Runs named async stage workers as tasks and tears them down together."""
+
+    def __init__(self, name: str):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name: Prefix used for the task names of every stage worker
+        """
+        self.name = name
+        self.stages: Dict[str, List[asyncio.Task]] = {}
+
+    @property
+    def tasks(self) -> List[asyncio.Task]:
+        """Worker tasks of every stage."""
+        return [task for tasks in self.stages.values() for task in tasks]
+
+    def add_stage(self, stage: str, worker: Callable[[], Awaitable[None]], concurrency: int = 1) -> None:
+        """
+        Start a stage with the given number of concurrent workers.
+
+        Args:
+            stage: Stage name (used in task names)
+            worker: Coroutine function that loops over the stage's input queue
+            concurrency: Number of workers pulling from the same input queue
+        """
+        tasks = self.stages.setdefault(stage, [])
+        for i in range(max(1, concurrency)):
+            tasks.append(asyncio.create_task(worker(), name=f"{self.name}:{stage}:{i}"))
+
+    async def join(self, stage: str) -> None:
+        """
+        Wait for a stage's workers to return on their own (e.g. after a sentinel).
+
+        Args:
+            stage: Stage name
+        """
+        tasks = self.stages.pop(stage, [])
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stop(self, *stages: str) -> None:
+        """
+        Cancel stage workers and wait for them to finish.
+
+        Args:
+            stages: Stages to stop; every stage if none are given
+        """
+        names = list(stages) if stages else list(self.stages)
+        tasks = [task for name in names for task in self.stages.pop(name, [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
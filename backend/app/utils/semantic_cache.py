@@ -0,0 +1,186 @@
+"""Embedding-similarity response cache utility."""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    scope: str
+    vector: np.ndarray
+    value: Any
+    created: float
+    buckets: List[Tuple[str, int, int]]
+
+
+class SemanticCache:
+    """
+    Cache of responses keyed by embedding similarity, scoped per user.
+
+    Vectors are indexed with random-hyperplane LSH: each of `num_tables`
+    tables hashes a vector to the sign pattern of `num_bits` projections, so
+    vectors with a small angle between them tend to share a bucket. A lookup
+    only compares against the entries in its buckets (exact cosine similarity)
+    and returns the best one above the threshold. Entries expire after `ttl`
+    seconds and the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        ttl: float,
+        max_entries: int,
+        num_tables: int = 8,
+        num_bits: int = 12,
+        seed: int = 0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an entry may be served after it was added
+            max_entries: Entries kept across all scopes before LRU eviction
+            num_tables: Independent LSH tables (more tables, better recall)
+            num_bits: Hyperplanes per table (more bits, smaller buckets)
+            seed: Seed for the random hyperplanes
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self._rng = np.random.default_rng(seed)
+        # Created on the first vector, once the embedding dimension is known
+        self._planes: Optional[np.ndarray] = None
+        self._bit_weights = 1 << np.arange(num_bits)
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, int], Set[int]] = {}
+        self._next_id = 0
+
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(
+        self,
+        scope: str,
+        vector: Sequence[float],
+        threshold: Optional[float] = None,
+        exclude: Collection[Any] = (),
+    ) -> Optional[Any]:
+        """
+        Find a cached response for a similar vector in the same scope.
+
+        Args:
+            scope: Scope to search (e.g. user id)
+            vector: Query embedding
+            threshold: Override of the similarity threshold for this lookup
+            exclude: Values not to return (e.g. responses the caller already used)
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        self.lookups += 1
+        query = self._normalize(vector)
+        if self._planes is None or len(query) != self._planes.shape[1]:
+            return None
+
+        candidates: Set[int] = set()
+        for bucket in self._bucket_keys(scope, query):
+            candidates |= self._buckets.get(bucket, set())
+
+        now = time.monotonic()
+        best_id, best_score = None, threshold if threshold is not None else self.threshold
+        for entry_id in candidates:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if now - entry.created > self.ttl:
+                self._remove(entry_id)
+                self.expirations += 1
+                continue
+            if entry.value in exclude:
+                continue
+            score = float(np.dot(entry.vector, query))
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        return self._entries[best_id].value
+
+    def add(self, scope: str, vector: Sequence[float], value: Any) -> None:
+        """
+        Cache a response.
+
+        Args:
+            scope: Scope the response belongs to
+            vector: Embedding of the request that produced it
+            value: Response to serve for similar requests
+        """
+        vector = self._normalize(vector)
+        if self._planes is None or len(vector) != self._planes.shape[1]:
+            # First vector, or the embedding model changed: start over
+            self.clear()
+            self._planes = self._rng.standard_normal((self.num_tables * self.num_bits, len(vector)))
+
+        buckets = self._bucket_keys(scope, vector)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = _Entry(scope, vector, value, time.monotonic(), buckets)
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _bucket_keys(self, scope: str, vector: np.ndarray) -> List[Tuple[str, int, int]]:
+        bits = (self._planes @ vector > 0).reshape(self.num_tables, self.num_bits)
+        codes = bits @ self._bit_weights
+        return [(scope, table, int(code)) for table, code in enumerate(codes)]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for bucket in entry.buckets:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(entry_id)
+                if not members:
+                    del self._buckets[bucket]
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm > 0 else array
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with entry counts, lookups, hits, hit rate and evictions
+        """
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,13 +1,20 @@
 """Silence detection utility."""
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 
 class SilenceDetector:
     """Tracks silence duration and speaking state."""
     
-    def __init__(self):
-        """Initialize the silence detector."""
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initialize the silence detector.
+
+        Args:
+            clock: Current time in seconds; pass the position in the audio stream
+                so durations do not depend on how fast the audio is processed
+        """
+        self.clock = clock
         self.is_speaking = False
         self.silence_start_time: Optional[float] = None
     
@@ -30,7 +37,7 @@ class SilenceDetector:
         Returns:
             True if silence just started (transition from speech)
         """
-        current_time = time.time()
+        current_time = self.clock()
         silence_just_started = False
         
         if self.silence_start_time is None:
@@ -49,7 +56,7 @@ class SilenceDetector:
         """
         if self.silence_start_time is None:
             return 0.0
-        return time.time() - self.silence_start_time
+        return self.clock() - self.silence_start_time
     
     def is_silence_threshold_met(self, threshold: float) -> bool:
         """
@@ -0,0 +1,119 @@
+"""Speech gating utility for streaming STT."""
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.services.vad_service import VADService
+from app.utils.audio_buffer import AudioBufferManager
+
+
+class SpeechGate:
+    """
+    Forwards only speech, plus padding on both sides, from a PCM stream.
+
+    Silence is withheld entirely; the streaming provider is expected to send
+    keepalives while no audio is flowing. The VAD must not be shared with other
+    streams, since its model state carries over from chunk to chunk.
+    """
+
+    def __init__(
+        self,
+        vad_service: VADService,
+        chunk_size: int,
+        padding_chunks: int,
+        stats: Optional["SpeechGateStats"] = None,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            vad_service: VAD used to classify chunks, owned by this stream
+            chunk_size: Size of VAD chunks in bytes
+            padding_chunks: Chunks forwarded before speech starts and after it ends
+            stats: Aggregate counters updated as audio flows through
+        """
+        self.vad_service = vad_service
+        self.energy_gate = vad_service.create_energy_gate()
+        self.buffer_manager = AudioBufferManager(chunk_size)
+        self.padding_chunks = padding_chunks
+        self.pre_roll: Deque[bytes] = deque(maxlen=padding_chunks or None)
+        self.hangover = 0
+        self.bytes_in = 0
+        self.bytes_forwarded = 0
+        self.stats = stats
+        if stats is not None:
+            stats.streams += 1
+            stats.active += 1
+
+    def process(self, data: bytes) -> List[bytes]:
+        """
+        Feed received audio through the gate.
+
+        Args:
+            data: Raw audio bytes from the client
+
+        Returns:
+            Chunks to forward to the streaming provider (possibly empty)
+        """
+        self.bytes_in += len(data)
+        self.buffer_manager.add_data(data)
+
+        forwarded: List[bytes] = []
+        while self.buffer_manager.has_chunk():
+            chunk = self.buffer_manager.get_chunk()
+            if self.vad_service.is_speech(chunk, self.energy_gate):
+                # Flush the padding that preceded speech onset
+                forwarded.extend(self.pre_roll)
+                self.pre_roll.clear()
+                forwarded.append(chunk)
+                self.hangover = self.padding_chunks
+            elif self.hangover > 0:
+                forwarded.append(chunk)
+                self.hangover -= 1
+            elif self.padding_chunks:
+                self.pre_roll.append(chunk)
+
+        forwarded_bytes = sum(len(chunk) for chunk in forwarded)
+        self.bytes_forwarded += forwarded_bytes
+        if self.stats is not None:
+            self.stats.bytes_in += len(data)
+            self.stats.bytes_forwarded += forwarded_bytes
+        return forwarded
+
+    def close(self) -> None:
+        """Mark the stream as ended in the aggregate counters."""
+        if self.stats is not None:
+            self.stats.active -= 1
+            self.stats = None
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes received but not forwarded (includes any unprocessed partial chunk)."""
+        return self.bytes_in - self.bytes_forwarded
+
+
+class SpeechGateStats:
+    """Aggregates byte counters across gated streams, updated by each gate as it runs."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.streams = 0
+        self.active = 0
+        self.bytes_in = 0
+        self.bytes_forwarded = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the aggregated counters.
+
+        Returns:
+            Dict with stream count, byte counts and the fraction of bytes saved
+        """
+        saved = self.bytes_in - self.bytes_forwarded
+        return {
+            "streams": self.streams,
+            "active": self.active,
+            "bytes_in": self.bytes_in,
+            "bytes_forwarded": self.bytes_forwarded,
+            "bytes_saved": saved,
+            "saved_fraction": saved / self.bytes_in if self.bytes_in else 0.0,
+        }
@@ -0,0 +1,42 @@
+"""Transcript stitching utility."""
+import re
+
+
+class TranscriptStitcher:
+    """Removes words duplicated at the seam between overlapping segments."""
+
+    WORD_RE = re.compile(r"[^\w']+")
+
+    def __init__(self, max_overlap_words: int = 6):
+        """
+        Initialize the stitcher.
+
+        Args:
+            max_overlap_words: Longest duplicated run of words to look for
+        """
+        self.max_overlap_words = max_overlap_words
+
+    @classmethod
+    def _normalize(cls, word: str) -> str:
+        return cls.WORD_RE.sub("", word.lower())
+
+    def stitch(self, previous: str, current: str) -> str:
+        """
+        Drop the leading words of `current` that repeat the tail of `previous`.
+
+        Args:
+            previous: Transcript of the segment before the seam
+            current: Transcript of the segment after the seam
+
+        Returns:
+            `current` without the duplicated words
+        """
+        previous_words = [self._normalize(w) for w in previous.split()]
+        current_raw = current.split()
+        current_words = [self._normalize(w) for w in current_raw]
+
+        longest = min(self.max_overlap_words, len(previous_words), len(current_words))
+        for size in range(longest, 0, -1):
+            if previous_words[-size:] == current_words[:size] and any(previous_words[-size:]):
+                return " ".join(current_raw[size:])
+        return current
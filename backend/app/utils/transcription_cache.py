@@ -0,0 +1,203 @@
+"""Content-addressed transcription cache utility."""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class TranscriptionCache:
+    """
+    LRU cache of transcription results keyed by an audio fingerprint.
+
+    Entries live in memory up to a byte budget (least recently used entries are
+    evicted first) and are optionally mirrored to a directory on disk, which is
+    consulted on a memory miss. Async callers use get_async/put_async, which
+    keep disk reads and writes off the event loop.
+    """
+
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for cached entries in bytes
+            disk_dir: Optional directory for the on-disk tier
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.entries: "OrderedDict[str, tuple[Any, int]]" = OrderedDict()
+        self.memory_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @classmethod
+    def fingerprint_file(cls, file_path: str, namespace: str) -> str:
+        """
+        Hash a file's contents together with a namespace (model and settings).
+
+        Args:
+            file_path: Audio file to fingerprint
+            namespace: String identifying the model and decoding settings
+
+        Returns:
+            Hex digest usable as a cache key
+        """
+        digest = hashlib.blake2b(namespace.encode(), digest_size=20)
+        digest.update(b"\0")
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(cls.HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint_bytes(data: bytes, namespace: str) -> str:
+        """
+        Hash in-memory audio together with a namespace (model and settings).
+
+        Args:
+            data: Audio samples as bytes
+            namespace: String identifying the model and decoding settings
+
+        Returns:
+            Hex digest usable as a cache key
+        """
+        digest = hashlib.blake2b(namespace.encode(), digest_size=20)
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from fingerprint_file
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._get_disk(key)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """Look up a cached result; a memory miss reads the disk tier in a worker thread."""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        if not self.disk_dir:
+            return self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable result.
+
+        Args:
+            key: Cache key from fingerprint_file
+            value: Result to cache
+        """
+        with self._lock:
+            self._store(key, value)
+        self._write_disk(key, value)
+
+    async def put_async(self, key: str, value: Any) -> None:
+        """Store a result; the disk tier is written in a worker thread."""
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, value)
+
+    def _get_memory(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _get_disk(self, key: str) -> Optional[Any]:
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hit/miss counts, hit rate and memory usage
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "memory_bytes": self.memory_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, value: Any) -> None:
+        """Insert into the memory tier and evict down to the byte budget (lock held)."""
+        size = len(key) + len(json.dumps(value))
+        if size > self.max_bytes:
+            return
+
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= previous[1]
+
+        self.entries[key] = (value, size)
+        self.memory_bytes += size
+
+        while self.memory_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.memory_bytes -= evicted_size
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(value, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Failed to write transcription cache entry: {e}")
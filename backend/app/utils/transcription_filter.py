@@ -1,47 +1,215 @@
 """Transcription filtering utility."""
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def compression_ratio(text: str) -> float:
+    """
+    Ratio of the text's UTF-8 size to its zlib-compressed size.
+
+    Repetition loops compress far better than natural speech; Whisper treats
+    ratios above 2.4 as failed decodes.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Compression ratio (0.0 for empty text)
+    """
+    data = text.encode("utf-8")
+    if not data:
+        return 0.0
+    return len(data) / len(zlib.compress(data))
+
+
+def _repeating_unit(words: List[str]) -> Tuple[List[str], int]:
+    """Shortest word sequence the text is made of, and how many times it occurs."""
+    for size in range(1, len(words) // 2 + 1):
+        if len(words) % size == 0 and words == words[:size] * (len(words) // size):
+            return words[:size], len(words) // size
+    return words, 1
+
+
+class FilterStats:
+    """Counts rejected transcripts and the downstream work they would have caused."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.checked = 0
+        self.rejected: Counter = Counter()
+        self.rejected_audio_seconds = 0.0
+        self.llm_requests_saved = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the counters.
+
+        Returns:
+            Dict with checked/rejected counts (per reason), rejected audio and LLM requests avoided
+        """
+        rejected = sum(self.rejected.values())
+        return {
+            "checked": self.checked,
+            "rejected": rejected,
+            "rejected_fraction": rejected / self.checked if self.checked else 0.0,
+            "rejected_by_reason": dict(self.rejected),
+            "rejected_audio_seconds": round(self.rejected_audio_seconds, 1),
+            "llm_requests_saved": self.llm_requests_saved,
+        }
 
 
 class TranscriptionFilter:
-    """Filters out invalid or hallucinated transcriptions."""
-    
+    """
+    Filters out invalid or hallucinated transcriptions.
+
+    Besides the text checks (length, leading dots, known noise phrases,
+    repeated word n-grams, compressibility), segments that come with Whisper
+    decoder scores are rejected the way Whisper itself skips them: a high
+    no-speech probability together with a low average log-probability means
+    the model decoded silence or noise.
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[str] = (),
+        no_speech_threshold: float = 0.6,
+        logprob_threshold: float = -1.0,
+        compression_ratio_threshold: float = 2.4,
+        max_ngram_repeats: int = 3,
+        ngram_size: int = 3,
+        stats: Optional[FilterStats] = None,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            phrases: Texts rejected when they make up a whole segment (matched after normalization)
+            no_speech_threshold: No-speech probability above which a low-confidence segment is rejected
+            logprob_threshold: Average log-probability below which a segment counts as low-confidence
+            compression_ratio_threshold: Compression ratio above which text is a repetition loop
+            max_ngram_repeats: Times any word n-gram may occur before the text is a repetition loop
+            ngram_size: Words per n-gram
+            stats: Counters to update (shared across sessions for metrics); a private one by default
+        """
+        self.phrases = {normalize_text(phrase) for phrase in phrases}
+        self.no_speech_threshold = no_speech_threshold
+        self.logprob_threshold = logprob_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.max_ngram_repeats = max_ngram_repeats
+        self.ngram_size = ngram_size
+        self.stats = stats if stats is not None else FilterStats()
+
     @staticmethod
     def is_valid(text: str, min_length: int = 2) -> bool:
         """
         Check if transcription text is valid.
-        
+
         Args:
             text: Transcription text to validate
             min_length: Minimum text length (after stripping)
-        
+
         Returns:
             True if text is valid, False otherwise
         """
         if not text:
             return False
-        
+
         stripped = text.strip()
-        
+
         # Check minimum length
         if len(stripped) < min_length:
             return False
-        
+
         # Filter hallucinations (repeated dots)
         if stripped.startswith("..."):
             return False
-        
+
         return True
-    
+
     @staticmethod
     def filter_text(text: str) -> str:
         """
         Clean and filter transcription text.
-        
+
         Args:
             text: Raw transcription text
-        
+
         Returns:
             Cleaned text, or empty string if invalid
         """
         if not TranscriptionFilter.is_valid(text):
             return ""
         return text.strip()
+
+    def rejection_reason(self, text: str, segments: Sequence[Dict[str, Any]] = ()) -> Optional[str]:
+        """
+        Find out why a transcript should be dropped.
+
+        Args:
+            text: Transcript of one utterance
+            segments: Whisper segment scores (no_speech_prob, avg_logprob, compression_ratio), if known
+
+        Returns:
+            "invalid", "phrase", "no_speech" or "repetition", or None if the transcript is kept
+        """
+        if not self.is_valid(text):
+            return "invalid"
+
+        if segments and all(
+            segment["no_speech_prob"] > self.no_speech_threshold
+            and segment["avg_logprob"] < self.logprob_threshold
+            for segment in segments
+        ):
+            return "no_speech"
+
+        normalized = normalize_text(text)
+        words = normalized.split()
+        # "Thank you. Thank you." is the phrase twice
+        unit, copies = _repeating_unit(words)
+        if " ".join(unit) in self.phrases:
+            return "phrase"
+        if copies > self.max_ngram_repeats:
+            return "repetition"
+
+        if any(segment["compression_ratio"] > self.compression_ratio_threshold for segment in segments):
+            return "repetition"
+        if len(words) >= self.ngram_size * self.max_ngram_repeats:
+            ngrams = Counter(zip(*(words[i:] for i in range(self.ngram_size))))
+            if ngrams.most_common(1)[0][1] > self.max_ngram_repeats:
+                return "repetition"
+            # Only long texts compress meaningfully
+            if compression_ratio(normalized) > self.compression_ratio_threshold:
+                return "repetition"
+
+        return None
+
+    def check(self, text: str, segments: Sequence[Dict[str, Any]] = (), duration: float = 0.0) -> Optional[str]:
+        """
+        Check a transcript and count the outcome in the filter stats.
+
+        Args:
+            text: Transcript of one utterance
+            segments: Whisper segment scores, if known
+            duration: Length of the utterance's audio in seconds
+
+        Returns:
+            The rejection reason, or None if the transcript should be used
+        """
+        reason = self.rejection_reason(text, segments)
+        self.stats.checked += 1
+        if reason is None:
+            return None
+        self.stats.rejected[reason] += 1
+        self.stats.rejected_audio_seconds += duration
+        if reason != "invalid":
+            print(f"Rejected transcript ({reason}): {text.strip()!r}")
+        return reason
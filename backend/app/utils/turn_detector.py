@@ -0,0 +1,167 @@
+"""End-of-turn detection utility."""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Hand-tuned weights of the completeness score (not fitted to data). Positive
+# weights make a cue count towards a complete thought. Override per deployment
+# with TURN_WEIGHTS.
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "bias": 0.2,
+    "terminal_punct": 2.2,   # ends in . ! ?
+    "trailing_punct": -1.6,  # ends in ... , - ; :
+    "continuation": -2.6,    # last word is a conjunction, preposition, article, ...
+    "filler": -1.2,          # last word is um/uh/...
+    "closing": 1.0,          # ends with "that's it", "anyway", ...
+    "short": -0.6,           # fewer than three words
+}
+
+
+@dataclass
+class TurnDecision:
+    """Silence thresholds to apply until the next transcript arrives."""
+    pause_threshold: float
+    turn_end_threshold: float
+    completeness: float
+
+
+class TurnDetector:
+    """
+    Adapts silence thresholds to what the user said and how fast they speak.
+
+    A logistic score over lexical cues of the transcript tail (sentence-final
+    punctuation, trailing conjunctions, fillers, ...) estimates whether the
+    thought is complete. This is a heuristic: the weights are hand-picked, not
+    trained, and can be tuned without code changes (see DEFAULT_WEIGHTS).
+    Complete thoughts shorten the end-of-turn
+    wait towards `min_silence`; incomplete ones extend it towards `max_silence`.
+    Slow speakers get proportionally longer waits, fast speakers shorter ones.
+    """
+
+    # Words that strongly suggest more is coming
+    CONTINUATION_WORDS = {
+        "and", "but", "or", "so", "because", "cause", "if", "when", "while", "then",
+        "that", "which", "who", "where", "the", "a", "an", "to", "of", "in", "on",
+        "at", "for", "with", "from", "about", "my", "your", "our", "their", "his",
+        "her", "is", "was", "are", "were", "i", "we", "like", "just", "really",
+    }
+    FILLER_WORDS = {"um", "uh", "erm", "hmm", "mm"}
+    CLOSING_PHRASES = ("that's it", "that's all", "anyway", "you know what i mean", "yeah")
+
+    WORD_RE = re.compile(r"[a-z']+")
+
+    def __init__(
+        self,
+        base_pause: float,
+        base_turn_end: float,
+        min_silence: float,
+        max_silence: float,
+        reference_rate: float,
+        rate_smoothing: float = 0.3,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            base_pause: Default silence (s) that closes an utterance for STT
+            base_turn_end: Default silence (s) that ends the turn
+            min_silence: Shortest end-of-turn silence (s) for a complete thought
+            max_silence: Longest end-of-turn silence (s) for an incomplete thought
+            reference_rate: Typical speech rate in words per second
+            rate_smoothing: EMA weight given to each new speech rate sample
+            weights: Overrides of DEFAULT_WEIGHTS
+
+        Raises:
+            ValueError: If weights has a key that is not in DEFAULT_WEIGHTS
+        """
+        unknown = set(weights or {}) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown turn detector weights: {sorted(unknown)}")
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.base_pause = base_pause
+        self.base_turn_end = base_turn_end
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.reference_rate = reference_rate
+        self.rate_smoothing = rate_smoothing
+        self.speech_rate: Optional[float] = None
+
+    def default_decision(self) -> TurnDecision:
+        """
+        Get the thresholds to use before a transcript is available.
+
+        Returns:
+            Decision using the configured base thresholds
+        """
+        return TurnDecision(self.base_pause, self.base_turn_end, 0.5)
+
+    def update(self, text: str, duration: float) -> TurnDecision:
+        """
+        Record a new utterance transcript and compute thresholds.
+
+        Args:
+            text: Transcript of the most recent utterance
+            duration: Length of that utterance's audio in seconds
+
+        Returns:
+            Thresholds to apply to the silence that follows
+        """
+        words = len(text.split())
+        if duration > 0 and words > 0:
+            rate = words / duration
+            if self.speech_rate is None:
+                self.speech_rate = rate
+            else:
+                self.speech_rate += self.rate_smoothing * (rate - self.speech_rate)
+
+        # Slow speakers pause longer mid-thought; fast speakers shorter
+        rate_factor = 1.0
+        if self.speech_rate:
+            rate_factor = min(max(self.reference_rate / self.speech_rate, 0.75), 1.5)
+
+        completeness = self.completeness(text)
+        turn_end = self.max_silence - completeness * (self.max_silence - self.min_silence)
+        turn_end = min(max(turn_end * rate_factor, self.min_silence), self.max_silence)
+
+        return TurnDecision(
+            pause_threshold=self.base_pause * rate_factor,
+            turn_end_threshold=turn_end,
+            completeness=completeness,
+        )
+
+    def completeness(self, text: str) -> float:
+        """
+        Estimate the probability that the text ends a complete thought.
+
+        Args:
+            text: Transcript tail to classify
+
+        Returns:
+            Probability in [0, 1]
+        """
+        stripped = text.strip()
+        if not stripped:
+            return 0.0
+
+        lowered = stripped.lower()
+        words = self.WORD_RE.findall(lowered)
+        last_word = words[-1] if words else ""
+
+        weights = self.weights
+        score = weights["bias"]
+        if lowered.endswith(("...", "…", ",", "-", "—", ";", ":")):
+            score += weights["trailing_punct"]
+        elif lowered.endswith((".", "!", "?")):
+            score += weights["terminal_punct"]
+        if last_word in self.CONTINUATION_WORDS:
+            score += weights["continuation"]
+        if last_word in self.FILLER_WORDS:
+            score += weights["filler"]
+        if lowered.rstrip(".!?").endswith(self.CLOSING_PHRASES):
+            score += weights["closing"]
+        if len(words) < 3:
+            score += weights["short"]
+
+        return 1.0 / (1.0 + math.exp(-score))
@@ -0,0 +1,61 @@
+"""Forced utterance segmentation utility."""
+from typing import Tuple
+
+import numpy as np
+
+
+class UtteranceSplitter:
+    """Cuts over-long speech buffers at the quietest point near a length limit."""
+
+    def __init__(self, max_samples: int, search_samples: int, overlap_samples: int, frame_samples: int):
+        """
+        Initialize the splitter.
+
+        Args:
+            max_samples: Buffer length that forces a cut
+            search_samples: Length of the window before max_samples searched for a quiet frame
+            overlap_samples: Audio before the cut repeated at the start of the next segment
+            frame_samples: Frame size used to measure energy
+        """
+        self.max_samples = max_samples
+        self.search_samples = min(search_samples, max_samples)
+        self.overlap_samples = overlap_samples
+        self.frame_samples = frame_samples
+
+    def should_split(self, buffer: np.ndarray) -> bool:
+        """
+        Check if the buffer has reached the length limit.
+
+        Args:
+            buffer: Speech buffer (float32 samples)
+
+        Returns:
+            True if the buffer must be cut
+        """
+        return len(buffer) >= self.max_samples
+
+    def split(self, buffer: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cut the buffer at the lowest-energy frame in the search window.
+
+        Args:
+            buffer: Speech buffer (float32 samples) of at least max_samples
+
+        Returns:
+            Tuple of (closed segment, remainder starting overlap_samples before the cut),
+            both copies independent of the buffer
+        """
+        window_start = self.max_samples - self.search_samples
+        frames = self.search_samples // self.frame_samples
+        if frames == 0:
+            cut = self.max_samples
+        else:
+            framed = buffer[window_start:window_start + frames * self.frame_samples].reshape(frames, -1)
+            energy = np.einsum("ij,ij->i", framed, framed)
+            quietest = int(np.argmin(energy))
+            # Cut in the middle of the quietest frame
+            cut = window_start + quietest * self.frame_samples + self.frame_samples // 2
+
+        segment = buffer[:cut].copy()
+        remainder = buffer[max(cut - self.overlap_samples, 0):].copy()
+        return segment, remainder
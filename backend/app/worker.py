@@ -0,0 +1,123 @@
+"""
+Inference worker: pulls STT and LLM jobs from job brokers and runs them on local models.
+
+Frontends started with JOB_QUEUE_BACKEND=broker listen for workers on
+JOB_BROKER_PORT. Run one worker per inference node:
+
+    python -m app.worker --broker frontend-1:8765 --broker frontend-2:8765 --concurrency 2
+
+Workers load models according to their own settings (STT_MODEL, WHISPER_MODEL,
+WHISPER_DEGRADED_MODEL, OLLAMA_*), which should match the frontends' so the
+frontends' transcription cache keys stay meaningful.
+"""
+import argparse
+import asyncio
+import socket
+from typing import Dict, List
+
+from app.core.config import settings
+from app.services.job_queue import InProcessJobQueue
+from app.services.llm_service import LLMService
+from app.services.stt_service import STTService
+from app.utils.job_protocol import pack_message, read_message
+
+
+async def serve_broker(address: str, jobs: InProcessJobQueue, concurrency: int) -> None:
+    """
+    Keep a connection to one broker and run the jobs it hands out.
+
+    Args:
+        address: Broker address as host:port
+        jobs: Local queue whose handlers run the jobs
+        concurrency: Jobs accepted from this broker at once
+    """
+    host, port = address.rsplit(":", 1)
+    backoff = 1.0
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, int(port))
+        except OSError as e:
+            print(f"Broker {address} unreachable ({e}); retrying in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+            continue
+
+        backoff = 1.0
+        print(f"Connected to broker {address}")
+        hello = {
+            "type": "hello",
+            "name": socket.gethostname(),
+            "kinds": list(jobs.handlers),
+            "capacity": concurrency,
+            "token": settings.JOB_BROKER_TOKEN or "",
+        }
+        writer.write(pack_message(hello))
+        await writer.drain()
+
+        async def run_job(message, payload) -> None:
+            try:
+                result = await jobs.submit(message["kind"], payload)
+                reply = pack_message({"type": "result", "id": message["id"]}, result)
+            except Exception as e:
+                print(f"{message['kind']} job {message['id']} failed: {e}")
+                reply = pack_message({"type": "error", "id": message["id"], "error": str(e)})
+            writer.write(reply)
+            await writer.drain()
+
+        running: Dict[str, asyncio.Task] = {}
+        try:
+            while True:
+                message, payload = await read_message(reader)
+                if message.get("type") == "job":
+                    task = asyncio.create_task(run_job(message, payload), name=f"worker:{message['kind']}")
+                    running[message["id"]] = task
+                    task.add_done_callback(lambda _, job_id=message["id"]: running.pop(job_id, None))
+                elif message.get("type") == "cancel":
+                    # The broker gave up on the job (timed out); its result would be ignored
+                    task = running.pop(message.get("id"), None)
+                    if task is not None:
+                        task.cancel()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            print(f"Lost connection to broker {address}: {e!r}")
+        finally:
+            # The broker requeues jobs of dropped workers, so results in progress are discarded
+            tasks = list(running.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+        await asyncio.sleep(backoff)
+
+
+async def run_worker(brokers: List[str], concurrency: int) -> None:
+    stt_service = STTService()
+    llm_service = LLMService()
+    # Reuse the services' in-process handlers, so workers run exactly what a single-node setup runs
+    jobs = InProcessJobQueue("worker", {**stt_service.job_queue.handlers, **llm_service.job_queue.handlers})
+    try:
+        await asyncio.gather(*(serve_broker(address, jobs, concurrency) for address in brokers))
+    finally:
+        await stt_service.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run an STT/LLM inference worker")
+    parser.add_argument(
+        "--broker",
+        action="append",
+        help="Broker host:port to pull jobs from (repeatable; defaults to JOB_BROKER_URLS)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.WORKER_CONCURRENCY,
+        help="Jobs accepted from each broker at once",
+    )
+    args = parser.parse_args()
+
+    brokers = args.broker or [url.strip() for url in settings.JOB_BROKER_URLS.split(",") if url.strip()]
+    asyncio.run(run_worker(brokers, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Microbenchmarks for the hot backend components (run with `python -m benchmarks`)."""
@@ -0,0 +1,87 @@
+"""
+Microbenchmark runner.
+
+Run from the backend directory:
+
+    python -m benchmarks run                      # all groups, results/latest.json
+    python -m benchmarks run --group audio --only save_to_wav
+    python -m benchmarks run --save-baseline      # record baselines/baseline.json
+    python -m benchmarks compare                  # run and compare against the baseline
+    python -m benchmarks compare --current results/latest.json --threshold 0.2
+
+Groups whose dependencies (models, ffmpeg) are unavailable are skipped.
+Baselines are machine specific; record them on the machine that compares.
+The committed baselines/baseline.json is a reference run whose "environment"
+names the CPU it was recorded on; compare warns when the CPU differs.
+"""
+import argparse
+import importlib
+import os
+import sys
+import traceback
+
+from benchmarks.harness import Runner, compare_results, load_results, save_results
+
+GROUPS = ["audio", "frontend", "vad", "whisper", "video"]
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "baseline.json")
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+def run_groups(groups, only, quick) -> Runner:
+    runner = Runner(only=only, quick=quick)
+    for group in groups:
+        try:
+            module = importlib.import_module(f"benchmarks.bench_{group}")
+            module.run(runner)
+        except Exception as e:
+            runner.skip(group, f"{type(e).__name__}: {e}")
+            if os.getenv("BENCH_DEBUG"):
+                traceback.print_exc()
+    return runner
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend microbenchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("run", "compare"):
+        command = commands.add_parser(name)
+        command.add_argument("--group", action="append", choices=GROUPS, help="Group to run (repeatable)")
+        command.add_argument("--only", help="Run only cases whose name contains this text")
+        command.add_argument("--quick", action="store_true", help="Fewer repeats (smoke test)")
+        command.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+
+    commands.choices["run"].add_argument("--output", default=DEFAULT_RESULTS, help="Where to write results")
+    commands.choices["run"].add_argument("--save-baseline", action="store_true", help="Also write the baseline")
+    commands.choices["compare"].add_argument("--current", help="Compare this results file instead of running")
+    commands.choices["compare"].add_argument(
+        "--threshold", type=float, default=0.15, help="Allowed slowdown before a case is flagged (0.15 = 15%%)"
+    )
+
+    args = parser.parse_args()
+    groups = args.group or GROUPS
+
+    if args.command == "compare" and args.current:
+        current = load_results(args.current)
+    else:
+        current = run_groups(groups, args.only, args.quick).to_dict()
+
+    if args.command == "run":
+        save_results(current, args.output)
+        print(f"\nResults written to {args.output}")
+        if args.save_baseline:
+            save_results(current, args.baseline)
+            print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with `python -m benchmarks run --save-baseline`")
+        return 2
+    print()
+    return 0 if compare_results(load_results(args.baseline), current, args.threshold) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Audio buffering, WAV writing and transcription filtering."""
+from app.utils.audio_buffer import AudioBufferManager
+from app.utils.audio_file import AudioFileHandler
+from app.utils.transcription_filter import TranscriptionFilter
+
+from benchmarks.harness import Runner, synthetic_pcm
+
+# 512 samples of 16-bit PCM, the VAD chunk size at 16 kHz
+VAD_CHUNK_BYTES = 1024
+
+SAMPLE_TRANSCRIPTS = [
+    "Today was really busy at work, and I didn't get much time to think.",
+    "...",
+    "um",
+    "I went for a walk after dinner and it helped me calm down a lot.",
+    "Thank you. Thank you. Thank you. Thank you.",
+    "",
+    "So I guess what I'm trying to say is that I'm proud of how I handled it.",
+    " you",
+]
+
+
+def run(runner: Runner) -> None:
+    audio = synthetic_pcm(10.0)
+
+    # Typical client message sizes: 10 ms, 32 ms and 128 ms of audio
+    for frame_bytes in (320, 1024, 4096):
+        frames = [audio[i:i + frame_bytes] for i in range(0, len(audio), frame_bytes)]
+
+        def add_get() -> None:
+            manager = AudioBufferManager(VAD_CHUNK_BYTES)
+            for frame in frames:
+                manager.add_data(frame)
+                while manager.has_chunk():
+                    manager.get_chunk()
+
+        runner.measure(f"audio_buffer.add_get[10s,frame={frame_bytes}]", add_get)
+
+    handler = AudioFileHandler(16000)
+    for seconds in (1.0, 5.0, 15.0):
+        pcm = synthetic_pcm(seconds)
+
+        def save() -> None:
+            handler.cleanup(handler.save_to_wav(pcm))
+
+        runner.measure(f"audio_file.save_to_wav[{seconds:g}s]", save, number=5)
+
+    transcription_filter = TranscriptionFilter()
+    runner.measure(
+        f"transcription_filter.is_valid[{len(SAMPLE_TRANSCRIPTS)} texts]",
+        lambda: [transcription_filter.is_valid(text) for text in SAMPLE_TRANSCRIPTS],
+        number=1000,
+    )
+
+    # Full check as run on every live segment: phrase list, repetition and compression checks
+    hallucination_filter = TranscriptionFilter(phrases=["thank you", "thanks for watching", "you"])
+    runner.measure(
+        f"transcription_filter.rejection_reason[{len(SAMPLE_TRANSCRIPTS)} texts]",
+        lambda: [hallucination_filter.rejection_reason(text) for text in SAMPLE_TRANSCRIPTS],
+        number=1000,
+    )
@@ -0,0 +1,24 @@
+"""Audio front-end: int16 to float conversion, downmix and streaming resampling."""
+import numpy as np
+
+from app.utils.audio_frontend import AudioFrontend
+
+from benchmarks.harness import Runner, synthetic_pcm
+
+# Browsers typically deliver 10-20 ms per message
+MESSAGE_SECONDS = 0.02
+
+
+def run(runner: Runner) -> None:
+    for rate, channels in ((16000, 1), (44100, 1), (48000, 2)):
+        mono = np.frombuffer(synthetic_pcm(10.0, sample_rate=rate), dtype=np.int16)
+        audio = np.repeat(mono, channels).tobytes()
+        message_bytes = int(MESSAGE_SECONDS * rate) * 2 * channels
+        messages = [audio[i:i + message_bytes] for i in range(0, len(audio), message_bytes)]
+
+        def process() -> None:
+            frontend = AudioFrontend(rate, channels, 16000)
+            for message in messages:
+                frontend.process(message)
+
+        runner.measure(f"audio_frontend.process[10s,{rate}Hz,{channels}ch]", process)
@@ -0,0 +1,58 @@
+"""Silero VAD per chunk, batched and offline."""
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.services.vad_service import VADService
+
+from benchmarks.harness import Runner, synthetic_pcm
+
+
+def run(runner: Runner) -> None:
+    vad = VADService()
+    chunk = vad.chunk_size
+
+    for kind in ("speech", "silence"):
+        audio = synthetic_pcm(10.0, kind)
+        chunks = [audio[i:i + chunk] for i in range(0, len(audio) - chunk + 1, chunk)]
+
+        result = runner.measure(
+            f"vad.is_speech[10s {kind}]",
+            lambda: [vad.is_speech(c) for c in chunks],
+            setup=vad.reset,
+        )
+        if result:
+            result.extra["per_chunk_s"] = result.median / len(chunks)
+
+        # With the energy pre-gate, clear silence should skip the model
+        state = {}
+
+        def reset_gated() -> None:
+            vad.reset()
+            state["gate"] = vad.create_energy_gate()
+
+        result = runner.measure(
+            f"vad.is_speech[10s {kind},energy_gate]",
+            lambda: [vad.is_speech(c, state["gate"]) for c in chunks],
+            setup=reset_gated,
+        )
+        if result:
+            result.extra["per_chunk_s"] = result.median / len(chunks)
+
+    # Many chunks through the model in one call
+    audio = np.frombuffer(synthetic_pcm(10.0), dtype=np.int16).astype(np.float32) / 32768.0
+    samples = chunk // 2
+    for batch_size in (8, 32):
+        batch = torch.from_numpy(audio[:batch_size * samples].reshape(batch_size, samples).copy())
+        result = runner.measure(
+            f"vad.model[batch={batch_size}]",
+            lambda: vad.model(batch, settings.SAMPLE_RATE),
+            setup=vad.model.reset_states,
+            number=10,
+        )
+        if result:
+            result.extra["per_chunk_s"] = result.median / batch_size
+
+    # Offline scan used by long-form transcription
+    long_audio = np.frombuffer(synthetic_pcm(30.0), dtype=np.int16).astype(np.float32) / 32768.0
+    runner.measure("vad.speech_timestamps[30s]", lambda: vad.speech_timestamps(long_audio), repeat=5)
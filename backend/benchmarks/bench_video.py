@@ -0,0 +1,59 @@
+"""Video conversion on generated reference clips."""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from app.services.video_service import VideoService
+
+from benchmarks.harness import Runner
+
+
+def make_reference_clip(path: str, seconds: int, size: str) -> None:
+    """Encode a WebM test pattern with a tone, like a browser MediaRecorder upload."""
+    command = [
+        "ffmpeg",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate=30",
+        "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000",
+        "-t", str(seconds),
+        "-c:v", "libvpx", "-deadline", "realtime", "-cpu-used", "8", "-b:v", "2M",
+        "-c:a", "libopus",
+        "-loglevel", "error",
+        "-y", path,
+    ]
+    subprocess.run(command, check=True)
+
+
+def run(runner: Runner) -> None:
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found")
+
+    service = VideoService()
+    work_dir = tempfile.mkdtemp(prefix="bench_video_")
+    try:
+        for seconds, size in ((10, "1280x720"), (30, "1280x720")):
+            name = f"{seconds}s_{size}"
+            mp4_case = f"video.convert_to_mp4[{name}]"
+            all_case = f"video.convert_all[{name},hls+thumbnails]"
+            if not (runner.wants(mp4_case) or runner.wants(all_case)):
+                continue
+            clip = os.path.join(work_dir, f"clip_{name}.webm")
+            make_reference_clip(clip, seconds, size)
+            output = os.path.join(work_dir, f"out_{name}.mp4")
+
+            runner.measure(
+                mp4_case,
+                lambda: service._convert_to_mp4(clip, output),
+                repeat=3,
+                warmup=0,
+            )
+            runner.measure(
+                all_case,
+                lambda: service._convert_to_mp4(
+                    clip, output, os.path.join(work_dir, "hls"), os.path.join(work_dir, "thumbs")
+                ),
+                repeat=3,
+                warmup=0,
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
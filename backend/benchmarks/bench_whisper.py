@@ -0,0 +1,35 @@
+"""Whisper real-time factor by segment length."""
+import numpy as np
+
+from app.core.config import settings
+from app.services.providers import WhisperBatchProvider
+
+from benchmarks.harness import Runner, synthetic_pcm
+
+
+def run(runner: Runner) -> None:
+    provider = WhisperBatchProvider()
+
+    def waveform(seconds: float) -> np.ndarray:
+        return np.frombuffer(synthetic_pcm(seconds), dtype=np.int16).astype(np.float32) / 32768.0
+
+    # Live-session segments are short; long-form chunks approach the 30 s window
+    for seconds in (2.0, 5.0, 15.0, 28.0):
+        audio = waveform(seconds)
+        result = runner.measure(
+            f"whisper.transcribe[{seconds:g}s]",
+            lambda: provider.transcribe_batch([audio]),
+            repeat=3,
+        )
+        if result:
+            result.extra["rtf"] = result.median / seconds
+
+    batch_size = settings.LONG_FORM_BATCH_SIZE
+    chunks = [waveform(10.0)] * batch_size
+    result = runner.measure(
+        f"whisper.transcribe_batch[{batch_size}x10s]",
+        lambda: provider.transcribe_batch(chunks),
+        repeat=3,
+    )
+    if result:
+        result.extra["rtf"] = result.median / (10.0 * batch_size)
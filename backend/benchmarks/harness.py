@@ -0,0 +1,229 @@
+"""Timing, result and baseline utilities for the microbenchmarks."""
+import array
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one benchmark case; all times are seconds per call."""
+    name: str
+    median: float
+    mean: float
+    p95: float
+    min: float
+    repeat: int
+    number: int
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class Runner:
+    """Runs benchmark cases and collects their results."""
+
+    def __init__(self, only: Optional[str] = None, quick: bool = False):
+        """
+        Initialize the runner.
+
+        Args:
+            only: Run only cases whose name contains this substring
+            quick: Fewer repeats, for smoke-testing the suite
+        """
+        self.only = only
+        self.quick = quick
+        self.results: List[BenchmarkResult] = []
+        self.skipped: Dict[str, str] = {}
+
+    def wants(self, name: str) -> bool:
+        return self.only is None or self.only in name
+
+    def measure(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        number: int = 1,
+        repeat: int = 7,
+        warmup: int = 1,
+        setup: Optional[Callable[[], Any]] = None,
+    ) -> Optional[BenchmarkResult]:
+        """
+        Time a case and record the result.
+
+        Args:
+            name: Case name, e.g. "audio_buffer.add_get[frame=1024]"
+            func: Code under test
+            number: Calls per timed repeat (for very fast code)
+            repeat: Timed repeats
+            warmup: Untimed repeats before measuring (model warm-up, caches)
+            setup: Called untimed before every repeat, e.g. to reset state
+
+        Returns:
+            The result, or None if the case is filtered out
+        """
+        if not self.wants(name):
+            return None
+        if self.quick:
+            repeat, warmup = min(repeat, 2), min(warmup, 1)
+
+        for _ in range(warmup):
+            if setup:
+                setup()
+            func()
+
+        samples = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+
+        samples.sort()
+        result = BenchmarkResult(
+            name=name,
+            median=statistics.median(samples),
+            mean=statistics.fmean(samples),
+            p95=samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+            min=samples[0],
+            repeat=repeat,
+            number=number,
+        )
+        self.results.append(result)
+        print(f"{name:<55} median {format_seconds(result.median):>10}  p95 {format_seconds(result.p95):>10}")
+        return result
+
+    def skip(self, group: str, reason: str) -> None:
+        """Record that a group of cases could not run here."""
+        self.skipped[group] = reason
+        print(f"{group:<55} skipped: {reason}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "cpu": cpu_model(),
+                "cpus": os.cpu_count(),
+            },
+            "results": {result.name: asdict(result) for result in self.results},
+            "skipped": self.skipped,
+        }
+
+
+def cpu_model() -> str:
+    """CPU model name, for telling apart results recorded on different machines."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def save_results(data: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> bool:
+    """
+    Print a comparison of two result files.
+
+    Args:
+        baseline: Results recorded earlier
+        current: Results of the run under review
+        threshold: Allowed slowdown as a fraction (0.15 = 15% slower)
+
+    Returns:
+        True if no case regressed beyond the threshold
+    """
+    base_results = baseline["results"]
+    new_results = current["results"]
+    regressions = []
+
+    base_env, new_env = baseline.get("environment", {}), current.get("environment", {})
+    if any(base_env.get(key) != new_env.get(key) for key in ("cpu", "cpus", "machine")):
+        print(
+            f"Warning: baseline was recorded on {base_env.get('cpu', 'unknown')} x{base_env.get('cpus')}, "
+            f"this run is on {new_env.get('cpu', 'unknown')} x{new_env.get('cpus')}; "
+            "re-record it with `make bench-baseline` before trusting regressions\n"
+        )
+
+    print(f"{'benchmark':<55} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(base_results) | set(new_results)):
+        if name not in new_results:
+            print(f"{name:<55} {'':>10} {'missing':>10}")
+            continue
+        if name not in base_results:
+            print(f"{name:<55} {'new':>10} {format_seconds(new_results[name]['median']):>10}")
+            continue
+
+        before = base_results[name]["median"]
+        after = new_results[name]["median"]
+        change = after / before - 1.0 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<55} {format_seconds(before):>10} {format_seconds(after):>10} {change:>+7.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}: {', '.join(regressions)}")
+        return False
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return True
+
+
+@lru_cache(maxsize=None)
+def synthetic_pcm(seconds: float, kind: str = "speech", sample_rate: int = 16000) -> bytes:
+    """
+    Deterministic 16-bit mono PCM for benchmarks.
+
+    Args:
+        seconds: Length of the audio
+        kind: "speech" (syllable-rate modulated harmonics plus noise) or "silence" (low noise)
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        Raw PCM bytes
+    """
+    rng = random.Random(1234)
+    samples = array.array("h")
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        noise = rng.gauss(0.0, 30.0)
+        if kind == "silence":
+            samples.append(int(noise))
+            continue
+        envelope = 0.5 * (1.0 + math.sin(2 * math.pi * 4.0 * t))
+        pitch = 140.0 + 20.0 * math.sin(2 * math.pi * 0.5 * t)
+        voiced = sum(math.sin(2 * math.pi * pitch * k * t) / k for k in range(1, 5))
+        samples.append(max(-32768, min(32767, int(6000.0 * envelope * voiced + noise))))
+    return samples.tobytes()
@@ -0,0 +1,106 @@
+"""Local stand-in for the Deepgram live endpoint, with scripted drops and delays."""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+
+
+@dataclass
+class FakeConnection:
+    """What the fake saw on one websocket connection."""
+    authorization: Optional[str]
+    chunks: List[bytes] = field(default_factory=list)
+    keepalives: int = 0
+    close_stream: bool = False
+
+
+class FakeDeepgram:
+    """
+    Minimal Deepgram live server.
+
+    Every binary message is one "word": its transcript is "w<first byte>".
+    A word is finalized once `finalize_lag` newer words have arrived (or on
+    CloseStream), and final results carry start/duration relative to the
+    connection's audio, as Deepgram's do. An interim result is sent for every
+    new word.
+
+    Args:
+        bytes_per_second: PCM byte rate used for result timestamps
+        drop_after: Per connection, number of words after which the
+            connection is aborted without a close frame (None: never)
+        finalize_lag: Words kept unfinalized behind the newest one
+        result_delay: Seconds to wait before sending each result
+    """
+
+    def __init__(
+        self,
+        bytes_per_second: int,
+        drop_after: Optional[List[Optional[int]]] = None,
+        finalize_lag: int = 2,
+        result_delay: float = 0.0,
+    ):
+        self.bytes_per_second = bytes_per_second
+        self.drop_after = drop_after or []
+        self.finalize_lag = finalize_lag
+        self.result_delay = result_delay
+        self.connections: List[FakeConnection] = []
+        self._server = None
+
+    async def __aenter__(self) -> "FakeDeepgram":
+        self._server = await serve(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        return f"ws://127.0.0.1:{port}/v1/listen"
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        number = len(self.connections)
+        connection = FakeConnection(ws.request.headers.get("Authorization"))
+        self.connections.append(connection)
+        drop_after = self.drop_after[number] if number < len(self.drop_after) else None
+        finalized = 0
+
+        async for message in ws:
+            if isinstance(message, str):
+                control = json.loads(message)
+                if control["type"] == "KeepAlive":
+                    connection.keepalives += 1
+                elif control["type"] == "CloseStream":
+                    connection.close_stream = True
+                    while finalized < len(connection.chunks):
+                        await self._send_result(ws, connection, finalized, is_final=True)
+                        finalized += 1
+                    await ws.close()
+                    return
+                continue
+
+            connection.chunks.append(message)
+            if drop_after is not None and len(connection.chunks) >= drop_after:
+                # Abrupt network failure: no close frame, unfinalized words are lost
+                ws.transport.abort()
+                return
+
+            await self._send_result(ws, connection, len(connection.chunks) - 1, is_final=False)
+            while finalized < len(connection.chunks) - self.finalize_lag:
+                await self._send_result(ws, connection, finalized, is_final=True)
+                finalized += 1
+
+    async def _send_result(self, ws: ServerConnection, connection: FakeConnection, word: int, is_final: bool) -> None:
+        if self.result_delay:
+            await asyncio.sleep(self.result_delay)
+        start = sum(len(chunk) for chunk in connection.chunks[:word]) / self.bytes_per_second
+        await ws.send(json.dumps({
+            "type": "Results",
+            "is_final": is_final,
+            "start": start,
+            "duration": len(connection.chunks[word]) / self.bytes_per_second,
+            "channel": {"alternatives": [{"transcript": f"w{connection.chunks[word][0]}"}]},
+        }))
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import routes
+from app.core.config import settings
+from app.services.admission import AdmissionController, AdmissionRejected, LoadLevel
+
+
+def test_fail_fast_rejection_when_slots_are_taken(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_UPLOADS", 1)
+
+    async def scenario():
+        admission = AdmissionController()
+        await admission.acquire("upload")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("upload", wait=False)
+        admission.release("upload")
+        await admission.acquire("upload", wait=False)
+        return admission, rejected.value
+
+    admission, rejection = asyncio.run(scenario())
+    assert rejection.kind == "upload"
+    assert rejection.retry_after == settings.ADMISSION_RETRY_AFTER
+    assert admission.stats()["rejected"]["upload"] == 1
+    assert admission.stats()["active"]["upload"] == 1
+
+
+def test_queued_request_times_out(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_TRANSCODES", 1)
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_TIMEOUT", 0.05)
+
+    async def scenario():
+        admission = AdmissionController()
+        async with admission.admit("transcode"):
+            with pytest.raises(AdmissionRejected, match="timed out"):
+                await admission.acquire("transcode")
+        # The slot came back when the block ended
+        await admission.acquire("transcode")
+
+    asyncio.run(scenario())
+
+
+def test_queue_depth_sets_the_load_level(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_DEGRADE_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(settings, "ADMISSION_SHED_QUEUE_DEPTH", 3)
+    admission = AdmissionController()
+
+    with admission.track("stt"):
+        assert admission.level() is LoadLevel.NORMAL
+        with admission.track("llm"):
+            assert admission.level() is LoadLevel.DEGRADED
+            with admission.track("stt"):
+                assert admission.level() is LoadLevel.SHEDDING
+    assert admission.queue_depth() == 0
+
+
+def test_loop_lag_moves_to_shedding_and_rejects_new_work(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_LAG_PROBE_INTERVAL", 0.01)
+    monkeypatch.setattr(settings, "ADMISSION_SHED_LOOP_LAG", 0.1)
+
+    async def scenario():
+        admission = AdmissionController()
+        await admission.start()
+        await asyncio.sleep(0.05)
+        assert admission.level() is LoadLevel.NORMAL
+
+        # Block the event loop, as a slow synchronous callback would
+        time.sleep(0.5)
+        # The next probe sees the lag; later probes smooth it away again
+        for _ in range(100):
+            if admission.level() is LoadLevel.SHEDDING:
+                break
+            await asyncio.sleep(0.001)
+        level = admission.level()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("session")
+        await admission.stop()
+        return level, rejected.value
+
+    level, rejection = asyncio.run(scenario())
+    assert level is LoadLevel.SHEDDING
+    assert rejection.reason == "server overloaded"
+    # Clients are told to back off longer while shedding
+    assert rejection.retry_after == 2 * settings.ADMISSION_RETRY_AFTER
+
+
+def _app(admission, **state):
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    app.state.admission = admission
+    for name, value in state.items():
+        setattr(app.state, name, value)
+    return app
+
+
+def test_session_websocket_is_closed_with_try_again_later(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_SESSIONS", 0)
+    app = _app(
+        AdmissionController(), stt_service=None, vad_service=None, llm_service=None, session_store=None
+    )
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/ws/audio") as websocket:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+
+    assert closed.value.code == 1013
+    assert "retry after" in closed.value.reason
+
+
+class FakeTranscriber:
+    async def transcribe(self, path, user_id=None):
+        assert os.path.exists(path)
+        yield {"type": "segment", "text": "hello"}
+        yield {"type": "done"}
+
+
+def test_long_upload_releases_its_slot_after_streaming(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    admission = AdmissionController()
+    client = TestClient(_app(admission, long_form_transcriber=FakeTranscriber()))
+
+    response = client.post("/api/transcribe/long", files={"file": ("a.wav", b"RIFF")})
+
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1] == '{"type": "done"}'
+    assert admission.active["upload"] == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_long_upload_releases_its_slot_if_saving_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def disk_full(source, target):
+        target.write(b"partial")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(routes.shutil, "copyfileobj", disk_full)
+    admission = AdmissionController()
+    client = TestClient(_app(admission, long_form_transcriber=FakeTranscriber()), raise_server_exceptions=False)
+
+    response = client.post("/api/transcribe/long", files={"file": ("a.wav", b"RIFF")})
+
+    assert response.status_code == 500
+    assert admission.active["upload"] == 0
+    assert os.listdir(tmp_path) == []
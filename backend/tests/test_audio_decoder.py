@@ -0,0 +1,67 @@
+import os
+import stat
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from app.utils.audio_decoder import StreamingAudioDecoder
+
+FAKE_FFMPEG = """#!{python}
+import sys
+# Far more log output than a pipe buffer holds, before and after the audio
+sys.stderr.write("warning: noisy input\\n" * 20000)
+sys.stderr.flush()
+sys.stdout.buffer.write(b"\\x00\\x40" * {samples})
+sys.stdout.flush()
+sys.stderr.write("error: last words\\n" * 20000)
+sys.exit({code})
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    def install(samples, code=0):
+        path = tmp_path / "ffmpeg"
+        path.write_text(FAKE_FFMPEG.format(python=sys.executable, samples=samples, code=code))
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    return install
+
+
+def _decode(decoder):
+    # A stalled ffmpeg would hang the test; run it with a deadline instead
+    result = {}
+
+    def run():
+        try:
+            result["blocks"] = list(decoder.blocks())
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=20)
+    assert not thread.is_alive(), "decoder stalled"
+    return result
+
+
+def test_noisy_decode_does_not_stall(fake_ffmpeg):
+    fake_ffmpeg(samples=25000)
+    result = _decode(StreamingAudioDecoder("in.webm", sample_rate=1000, block_seconds=10.0))
+
+    blocks = result["blocks"]
+    assert [len(block) for block in blocks] == [10000, 10000, 5000]
+    assert np.all(np.concatenate(blocks) == 0.5)
+
+
+def test_failure_reports_the_end_of_the_log(fake_ffmpeg):
+    fake_ffmpeg(samples=10, code=1)
+    result = _decode(StreamingAudioDecoder("in.webm", sample_rate=1000))
+
+    message = str(result["error"])
+    assert message.startswith("FFmpeg decoding failed:")
+    assert "error: last words" in message
+    assert len(message) < StreamingAudioDecoder.STDERR_TAIL_BYTES + 100
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from app.utils.audio_frontend import AudioFrontend, PolyphaseResampler, SampleBuffer
+
+
+def _tone(frequency, rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _rms(samples):
+    # Skip the filter's warm-up at the start
+    steady = samples[len(samples) // 4:]
+    return float(np.sqrt(np.mean(steady.astype(np.float64) ** 2)))
+
+
+@pytest.mark.parametrize("input_rate,output_rate", [(48000, 16000), (44100, 16000), (8000, 16000)])
+def test_output_length_follows_the_ratio(input_rate, output_rate):
+    resampler = PolyphaseResampler(input_rate, output_rate)
+    output = resampler.process(np.zeros(input_rate, dtype=np.float32))
+    assert abs(len(output) - output_rate) <= 1
+
+
+@pytest.mark.parametrize("input_rate,output_rate", [(48000, 16000), (44100, 16000), (8000, 16000)])
+def test_block_boundaries_do_not_change_the_output(input_rate, output_rate):
+    signal = np.random.default_rng(0).uniform(-0.5, 0.5, input_rate // 2).astype(np.float32)
+    whole = PolyphaseResampler(input_rate, output_rate).process(signal)
+
+    streaming = PolyphaseResampler(input_rate, output_rate)
+    rng = np.random.default_rng(1)
+    pieces, start = [], 0
+    while start < len(signal):
+        size = int(rng.integers(1, 700))
+        pieces.append(streaming.process(signal[start:start + size]))
+        start += size
+    chunked = np.concatenate(pieces)
+
+    assert len(chunked) == len(whole)
+    np.testing.assert_allclose(chunked, whole, atol=1e-5)
+
+
+@pytest.mark.parametrize("input_rate", [48000, 44100, 8000])
+def test_passband_tone_keeps_its_level(input_rate):
+    tone = _tone(1000, input_rate)
+    output = PolyphaseResampler(input_rate, 16000).process(tone)
+    assert _rms(output) == pytest.approx(_rms(tone), rel=0.02)
+
+
+@pytest.mark.parametrize("input_rate,frequency", [(48000, 12000), (44100, 10000)])
+def test_tones_above_the_output_nyquist_are_removed(input_rate, frequency):
+    tone = _tone(frequency, input_rate)
+    output = PolyphaseResampler(input_rate, 16000).process(tone)
+    attenuation_db = 20 * np.log10(_rms(output) / _rms(tone))
+    assert attenuation_db < -60
+
+
+def test_reset_forgets_history():
+    resampler = PolyphaseResampler(48000, 16000)
+    signal = _tone(440, 48000, seconds=0.1)
+    first = resampler.process(signal)
+    resampler.process(np.ones(1234, dtype=np.float32))
+    resampler.reset()
+    np.testing.assert_array_equal(resampler.process(signal), first)
+
+
+def test_frontend_downmixes_and_scales_stereo():
+    left = np.full(160, 16384, dtype=np.int16)
+    right = np.full(160, -8192, dtype=np.int16)
+    data = np.stack([left, right], axis=1).tobytes()
+
+    output = AudioFrontend(16000, 2, 16000).process(data)
+
+    assert output.dtype == np.float32
+    assert len(output) == 160
+    np.testing.assert_allclose(output, 0.125)
+
+
+def test_frontend_keeps_partial_frames_for_the_next_block():
+    samples = np.arange(-50, 50, dtype=np.int16) * 300
+    data = np.stack([samples, samples], axis=1).tobytes()
+    frontend = AudioFrontend(16000, 2, 16000)
+
+    # Split in the middle of a frame and of a sample
+    output = np.concatenate([frontend.process(data[:101]), frontend.process(data[101:])])
+
+    np.testing.assert_allclose(output, samples / 32768.0)
+
+
+def test_frontend_resamples_to_the_output_rate():
+    frontend = AudioFrontend(48000, 1, 16000)
+    assert frontend.bytes_per_second == 96000
+    output = frontend.process(np.zeros(48000, dtype=np.int16).tobytes())
+    assert abs(len(output) - 16000) <= 1
+
+
+def test_sample_buffer_grows_and_reuses_storage():
+    buffer = SampleBuffer(capacity=4)
+    buffer.append(np.arange(3, dtype=np.float32))
+    buffer.append(np.arange(3, 10, dtype=np.float32))
+    assert len(buffer) == 10
+    np.testing.assert_array_equal(buffer.view(), np.arange(10))
+
+    storage = buffer._data
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.append(np.ones(5, dtype=np.float32))
+    assert buffer._data is storage
+    np.testing.assert_array_equal(buffer.view(), np.ones(5))
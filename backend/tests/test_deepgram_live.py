@@ -0,0 +1,75 @@
+import asyncio
+
+from app.services.providers.deepgram_live import DeepgramLiveStream
+from tests.fake_deepgram import FakeDeepgram
+
+BYTES_PER_SECOND = 32000
+CHUNK_BYTES = 3200  # 0.1 s of 16 kHz 16-bit mono
+
+
+def _stream(url: str, keepalive_interval: float = 5.0) -> DeepgramLiveStream:
+    return DeepgramLiveStream(
+        url=url,
+        api_key="test-key",
+        options={"encoding": "linear16", "sample_rate": "16000"},
+        bytes_per_second=BYTES_PER_SECOND,
+        keepalive_interval=keepalive_interval,
+        max_reconnects=3,
+        replay_seconds=10.0,
+    )
+
+
+async def _words(count: int, gap: float = 0.005, pause_after: int = -1, pause: float = 0.0):
+    for i in range(count):
+        yield bytes([i]) * CHUNK_BYTES
+        await asyncio.sleep(pause if i == pause_after else gap)
+
+
+async def _finals(stream: DeepgramLiveStream, audio) -> list:
+    return [event["text"] async for event in stream.run(audio) if event["final"]]
+
+
+def test_drop_mid_stream_replays_unfinalized_audio_once():
+    async def scenario():
+        async with FakeDeepgram(BYTES_PER_SECOND, drop_after=[8], result_delay=0.001) as server:
+            stream = _stream(server.url)
+            finals = await asyncio.wait_for(_finals(stream, _words(20)), timeout=10)
+            return server, stream, finals
+
+    server, stream, finals = asyncio.run(scenario())
+
+    # Every word finalized exactly once, in order
+    assert finals == [f"w{i}" for i in range(20)]
+    assert stream.reconnects == 1
+    first, second = server.connections
+    # The drop hit on word 7, when words 0-4 were final; 5-7 are replayed, nothing earlier
+    assert [chunk[0] for chunk in second.chunks] == list(range(5, 20))
+    assert second.close_stream
+    assert first.authorization == second.authorization == "Token test-key"
+
+
+def test_drops_on_consecutive_connections():
+    async def scenario():
+        async with FakeDeepgram(BYTES_PER_SECOND, drop_after=[5, 4]) as server:
+            finals = await asyncio.wait_for(_finals(_stream(server.url), _words(15)), timeout=10)
+            return server, finals
+
+    server, finals = asyncio.run(scenario())
+
+    assert finals == [f"w{i}" for i in range(15)]
+    assert len(server.connections) == 3
+
+
+def test_keepalive_during_silence_and_close_stream_at_end():
+    async def scenario():
+        async with FakeDeepgram(BYTES_PER_SECOND) as server:
+            stream = _stream(server.url, keepalive_interval=0.05)
+            finals = await asyncio.wait_for(_finals(stream, _words(4, pause_after=1, pause=0.3)), timeout=10)
+            return server, finals
+
+    server, finals = asyncio.run(scenario())
+
+    assert finals == ["w0", "w1", "w2", "w3"]
+    (connection,) = server.connections
+    assert connection.keepalives >= 2
+    assert connection.close_stream
@@ -0,0 +1,64 @@
+import asyncio
+
+from app.services import diagnostics
+from app.utils.pipeline import Pipeline
+from tests.test_journaling_session import _session
+
+
+def test_pipeline_stages_are_classified_idle_or_blocked():
+    async def scenario():
+        inbox: asyncio.Queue = asyncio.Queue()
+        stt_done = asyncio.Event()
+
+        async def _vad_stage():
+            while True:
+                await inbox.get()
+
+        async def _stt_stage():
+            # Stands in for a stage waiting on inference
+            await stt_done.wait()
+
+        pipeline = Pipeline("journaling:s1")
+        pipeline.add_stage("vad", _vad_stage)
+        pipeline.add_stage("stt", _stt_stage, concurrency=2)
+        await asyncio.sleep(0)
+        report = diagnostics.dump_tasks()
+        await pipeline.stop()
+        return report
+
+    report = asyncio.run(scenario())
+
+    stages = report["sessions"]["s1"]
+    assert [worker["state"] for worker in stages["vad"]] == ["idle"]
+    assert sorted(worker["worker"] for worker in stages["stt"]) == [0, 1]
+    assert all(worker["state"] == "blocked" for worker in stages["stt"])
+    assert "._vad_stage (test_diagnostics.py:" in stages["vad"][0]["at"]
+    assert "wait" in stages["stt"][0]["awaiting"]
+    names = {task["name"] for task in report["tasks"]}
+    assert {"journaling:s1:vad:0", "journaling:s1:stt:0", "journaling:s1:stt:1"} <= names
+
+
+def test_a_fresh_journaling_session_is_idle_in_every_stage():
+    async def scenario():
+        session = _session()
+        session.start()
+        await asyncio.sleep(0)
+        report = diagnostics.dump_tasks()
+        await session.close()
+        return session.session_id, report
+
+    session_id, report = asyncio.run(scenario())
+
+    stages = report["sessions"][session_id]
+    assert {"vad", "segmenter", "stt"} <= set(stages)
+    states = {stage: [worker["state"] for worker in workers] for stage, workers in stages.items()}
+    assert all(state == "idle" for workers in states.values() for state in workers), states
+
+
+def test_profile_cpu_reports_samples_and_elapsed_time(capsys):
+    profiler = asyncio.run(diagnostics.profile_cpu(0.1, 0.005))
+
+    assert profiler.samples > 0
+    assert 0.1 <= profiler.elapsed < 1.0
+    assert profiler.collapsed().strip()
+    assert capsys.readouterr().out == ""
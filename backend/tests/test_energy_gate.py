@@ -0,0 +1,90 @@
+import numpy as np
+
+from app.utils.energy_gate import EnergyGate
+
+CHUNK = 512
+
+
+def noise(dbfs, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = rng.standard_normal(CHUNK).astype(np.float32)
+    return samples * (10 ** (dbfs / 20) / np.sqrt(np.mean(samples ** 2)))
+
+
+def tone(dbfs, frequency=200.0, rate=16000):
+    t = np.arange(CHUNK) / rate
+    return (np.sqrt(2) * 10 ** (dbfs / 20) * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def skipped(gate, chunks):
+    return [gate.is_silence(chunk) for chunk in chunks]
+
+
+def test_silence_is_skipped_after_the_hangover():
+    gate = EnergyGate(hangover_chunks=3)
+    decisions = skipped(gate, [noise(-60, seed=i) for i in range(10)])
+    assert decisions == [False] * 3 + [True] * 7
+
+
+def test_speech_onset_is_never_skipped():
+    gate = EnergyGate(hangover_chunks=3)
+    skipped(gate, [noise(-60, seed=i) for i in range(10)])
+
+    assert not gate.is_silence(tone(-20))
+    # Quiet but well above the floor, e.g. a soft first syllable
+    assert not gate.is_silence(tone(-45))
+
+
+def test_fricative_onset_near_the_floor_is_not_skipped():
+    gate = EnergyGate(margin_db=6.0, hangover_chunks=0)
+    skipped(gate, [noise(-60, seed=i) for i in range(5)])
+
+    # 4.5 dB above the floor: within the margin, but alternating signs like a fricative
+    fricative = np.resize(np.array([1.0, -1.0], dtype=np.float32), CHUNK) * 10 ** (-55.5 / 20)
+    assert not gate.is_silence(fricative)
+    # The same level with a low zero-crossing rate counts as background
+    assert gate.is_silence(tone(-55.5))
+
+
+def test_hangover_keeps_trailing_speech():
+    gate = EnergyGate(hangover_chunks=4)
+    skipped(gate, [noise(-60, seed=i) for i in range(10)])
+
+    assert not gate.is_silence(tone(-20))
+    # The tail after speech reaches the model for the whole hangover
+    assert skipped(gate, [noise(-60, seed=i) for i in range(20, 26)]) == [False] * 4 + [True] * 2
+
+
+def test_loud_chunks_do_not_raise_the_floor():
+    gate = EnergyGate()
+    skipped(gate, [noise(-60, seed=i) for i in range(5)])
+    floor = gate.noise_floor
+
+    for _ in range(50):
+        gate.is_silence(tone(-20))
+    assert gate.noise_floor == floor
+
+
+def test_floor_follows_a_rising_background():
+    gate = EnergyGate(hangover_chunks=0)
+    skipped(gate, [noise(-60, seed=i) for i in range(5)])
+
+    # An air conditioner switching on: 10 dB more background, still below the ceiling
+    decisions = skipped(gate, [noise(-50, seed=i) for i in range(200)])
+    assert not decisions[0]
+    assert all(decisions[-50:])
+
+
+def test_int16_and_float_input_agree():
+    chunks = [noise(-60, seed=i) for i in range(8)] + [tone(-20)]
+    float_gate, int_gate = EnergyGate(hangover_chunks=2), EnergyGate(hangover_chunks=2)
+    as_int16 = [(chunk * 32768).astype(np.int16) for chunk in chunks]
+    assert skipped(float_gate, chunks) == skipped(int_gate, as_int16)
+
+
+def test_reset_forgets_the_floor_and_hangover():
+    gate = EnergyGate(hangover_chunks=2)
+    skipped(gate, [noise(-60, seed=i) for i in range(5)])
+    gate.reset()
+    assert gate.noise_floor is None
+    assert skipped(gate, [noise(-60, seed=i) for i in range(3)]) == [False, False, True]
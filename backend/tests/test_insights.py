@@ -0,0 +1,161 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.services import insights
+from app.services.admission import LoadLevel
+from app.services.insights import InsightRunner
+from app.services.session_archive import SessionArchiveService
+
+
+class FakeLLM:
+    """Answers entry prompts in the requested JSON shape; can drop or refuse entries."""
+
+    def __init__(self, skip_texts=(), fail_texts=()):
+        self.prompts = []
+        self.skip_texts = set(skip_texts)
+        self.fail_texts = set(fail_texts)
+        self.on_request = None
+
+    async def generate_async(self, prompt, json_format=False, priority=None, user_id=None):
+        self.prompts.append(prompt)
+        if self.on_request is not None:
+            self.on_request()
+        entries = re.findall(r"Entry (\d+):\n(.*)", prompt)
+        if any(text in self.fail_texts for _, text in entries):
+            raise RuntimeError("model unavailable")
+        items = [
+            {"id": int(i), "summary": f"You said {text}.", "mood": "Calm", "topics": ["Day"]}
+            for i, text in entries
+            if text not in self.skip_texts
+        ]
+        return {"response": json.dumps({"entries": items}), "eval_count": 10, "eval_duration": 1}
+
+
+def _session_id(i):
+    return f"{i:032x}"
+
+
+def _archive(tmp_path, texts, close=True):
+    service = SessionArchiveService(str(tmp_path / "sessions"))
+    for i, text in enumerate(texts):
+        archive = service.open(_session_id(i), "alice")
+        archive.add_text(0, text)
+        if close:
+            archive.close()
+    return service
+
+
+def _read_entries(runner):
+    with open(runner.entries_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_entries_are_batched(tmp_path):
+    texts = [f"day {i}" for i in range(5)]
+    llm = FakeLLM()
+    runner = InsightRunner(llm, _archive(tmp_path, texts), str(tmp_path / "out"), batch_size=2)
+
+    report = asyncio.run(runner.run(weekly=False))
+
+    assert len(llm.prompts) == 3
+    assert report["entries"] == 5
+    assert report["tokens"] == 30
+    records = _read_entries(runner)
+    assert sorted(record["summary"] for record in records) == sorted(f"You said {text}." for text in texts)
+    assert all(record["mood"] == "calm" and record["topics"] == ["day"] for record in records)
+
+
+def test_entries_the_model_skipped_are_retried_alone(tmp_path):
+    llm = FakeLLM(skip_texts={"day 1"})
+    runner = InsightRunner(llm, _archive(tmp_path, ["day 0", "day 1"]), str(tmp_path / "out"), batch_size=2)
+
+    report = asyncio.run(runner.run(weekly=False))
+
+    # One batch request, then "day 1" on its own (still skipped, so it fails)
+    assert len(llm.prompts) == 2
+    assert report["entries"] == 1
+    assert report["failed"] == 1
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(tmp_path):
+    service = _archive(tmp_path, ["day 0", "day 1", "day 2"])
+    output = str(tmp_path / "out")
+
+    first = asyncio.run(InsightRunner(FakeLLM(fail_texts={"day 1"}), service, output, batch_size=1).run(weekly=False))
+    assert (first["entries"], first["failed"]) == (2, 1)
+
+    llm = FakeLLM()
+    runner = InsightRunner(llm, service, output, batch_size=1)
+    second = asyncio.run(runner.run(weekly=False))
+
+    assert second["already_done"] == 2
+    assert second["entries"] == 1
+    assert len(llm.prompts) == 1 and "day 1" in llm.prompts[0]
+    assert len(_read_entries(runner)) == 3
+
+
+def test_unfinished_sessions_are_left_for_a_later_run(tmp_path):
+    service = _archive(tmp_path, ["still talking"], close=False)
+    output = str(tmp_path / "out")
+
+    report = asyncio.run(InsightRunner(FakeLLM(), service, output).run(weekly=False))
+    assert report["unfinished"] == 1
+    assert report["entries"] == 0
+
+    # Once the session ends it is picked up
+    archive = service.open(_session_id(0), "alice")
+    archive.close()
+    report = asyncio.run(InsightRunner(FakeLLM(), service, output).run(weekly=False))
+    assert report["entries"] == 1
+
+
+def test_sessions_held_by_the_server_are_skipped(tmp_path, monkeypatch):
+    service = _archive(tmp_path, ["resumable"])
+    # A crash leaves sessions unmarked; old enough ones count as finished unless the store holds them
+    monkeypatch.setattr(settings, "INSIGHTS_UNFINISHED_AFTER", 0.0)
+
+    held = {_session_id(0)}
+    report = asyncio.run(InsightRunner(FakeLLM(), service, str(tmp_path / "a"), session_store=held).run(weekly=False))
+    assert report["unfinished"] == 1
+
+    report = asyncio.run(InsightRunner(FakeLLM(), service, str(tmp_path / "b"), session_store=set()).run(weekly=False))
+    assert report["entries"] == 1
+
+
+class FakeAdmission:
+    def __init__(self, busy_checks):
+        self.busy_checks = busy_checks
+        self.checks = 0
+
+    def level(self):
+        self.checks += 1
+        return LoadLevel.DEGRADED if self.checks <= self.busy_checks else LoadLevel.NORMAL
+
+
+def test_batches_wait_until_the_server_is_quiet(tmp_path, monkeypatch):
+    monkeypatch.setattr(insights, "BUSY_POLL_INTERVAL", 0.001)
+    admission = FakeAdmission(busy_checks=3)
+    llm = FakeLLM()
+    levels = []
+    llm.on_request = lambda: levels.append(admission.checks)
+    runner = InsightRunner(llm, _archive(tmp_path, ["day 0"]), str(tmp_path / "out"), admission=admission)
+
+    report = asyncio.run(runner.run(weekly=False))
+
+    assert report["entries"] == 1
+    # The request went out only after the level had returned to NORMAL
+    assert levels == [4]
+
+
+@pytest.mark.parametrize("response,expected", [
+    ('{"entries": [{"id": "2", "summary": " Hi ", "mood": "HAPPY", "topics": ["A", 1]}]}',
+     {2: {"summary": "Hi", "mood": "happy", "topics": ["a", "1"]}}),
+    ('[{"id": 1, "summary": "list form"}]', {1: {"summary": "list form", "mood": "", "topics": []}}),
+    ('{"entries": [{"id": "x", "summary": "bad id"}, {"id": 3}]}', {}),
+])
+def test_parse_entries(response, expected):
+    assert insights._parse_entries(response) == expected
@@ -0,0 +1,148 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.job_queue import BrokerJobQueue, JobError
+from app.utils.job_protocol import HELLO_MAX_BYTES, FRAME_PREFIX, pack_message, read_message
+
+
+def _read(frame: bytes, **kwargs):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame)
+        reader.feed_eof()
+        return await read_message(reader, **kwargs)
+
+    return asyncio.run(read())
+
+
+def test_frame_round_trip_keeps_blobs_and_arrays():
+    audio = np.arange(6, dtype=np.float32).reshape(2, 3)
+    payload = {"audio": audio, "raw": b"\x00\x01", "items": [1, {"text": "hi"}]}
+
+    message, decoded = _read(pack_message({"type": "job", "id": "a"}, payload))
+
+    assert message == {"type": "job", "id": "a"}
+    assert decoded["raw"] == b"\x00\x01"
+    assert decoded["items"] == [1, {"text": "hi"}]
+    assert decoded["audio"].dtype == np.float32
+    np.testing.assert_array_equal(decoded["audio"], audio)
+    decoded["audio"][0, 0] = 5.0  # writable
+
+
+def test_frame_larger_than_limit_is_rejected_before_reading_it():
+    frame = FRAME_PREFIX.pack(16, HELLO_MAX_BYTES)  # body never sent
+
+    with pytest.raises(ValueError):
+        _read(frame, max_bytes=HELLO_MAX_BYTES)
+
+
+def test_truncated_frame_raises_incomplete_read():
+    frame = pack_message({"type": "hello"})
+
+    with pytest.raises(asyncio.IncompleteReadError):
+        _read(frame[:-1])
+
+
+async def _connect(broker: BrokerJobQueue, token: str, capacity: int = 1):
+    port = broker._server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    hello = {"type": "hello", "name": "test", "kinds": ["echo"], "capacity": capacity, "token": token}
+    writer.write(pack_message(hello))
+    await writer.drain()
+    return reader, writer
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_broker_requires_token_off_localhost():
+    broker = BrokerJobQueue("0.0.0.0", 0)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(broker.start())
+
+
+def test_broker_rejects_worker_with_wrong_token():
+    async def scenario():
+        broker = BrokerJobQueue("127.0.0.1", 0, token="secret")
+        await broker.start()
+        try:
+            reader, writer = await _connect(broker, "wrong")
+            assert await reader.read() == b""  # connection closed
+            writer.close()
+            assert broker.stats()["workers"] == {}
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_broker_runs_job_on_authenticated_worker():
+    async def scenario():
+        broker = BrokerJobQueue("127.0.0.1", 0, token="secret")
+        await broker.start()
+        try:
+            reader, writer = await _connect(broker, "secret")
+            submitted = asyncio.create_task(broker.submit("echo", {"value": 3}))
+            message, payload = await read_message(reader)
+            assert message["kind"] == "echo"
+            writer.write(pack_message({"type": "result", "id": message["id"]}, payload["value"] * 2))
+            assert await submitted == 6
+            writer.close()
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_job_frees_worker_slot(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_TIMEOUT", 0.1)
+
+    async def scenario():
+        broker = BrokerJobQueue("127.0.0.1", 0, token="secret")
+        await broker.start()
+        try:
+            reader, writer = await _connect(broker, "secret")
+            await _until(lambda: broker.stats()["workers"])
+
+            with pytest.raises(JobError):
+                await broker.submit("echo", {"value": 1})
+            job, _ = await read_message(reader)
+            cancel, _ = await read_message(reader)
+            assert cancel == {"type": "cancel", "id": job["id"]}
+            assert [w["inflight"] for w in broker.stats()["workers"].values()] == [0]
+
+            # The freed slot takes the next job; the late result of the first is ignored
+            submitted = asyncio.create_task(broker.submit("echo", {"value": 2}))
+            second, _ = await read_message(reader)
+            writer.write(pack_message({"type": "result", "id": job["id"]}, "late"))
+            writer.write(pack_message({"type": "result", "id": second["id"]}, "ok"))
+            assert await submitted == "ok"
+            writer.close()
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_pending_job_leaves_queue(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_TIMEOUT", 0.05)
+
+    async def scenario():
+        broker = BrokerJobQueue("127.0.0.1", 0)
+        await broker.start()
+        try:
+            with pytest.raises(JobError):
+                await broker.submit("echo", {})
+            assert broker.stats()["pending"] == 0
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
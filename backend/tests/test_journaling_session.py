@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.journaling_session import JournalingSession, SpeechSegment
+from app.services.session_archive import SessionArchive, SessionArchiveService
+
+
+class FakeVAD:
+    """Speech wherever the chunk is loud."""
+
+    def create_energy_gate(self):
+        return None
+
+    def is_speech(self, chunk, energy_gate=None):
+        return float(np.abs(chunk).max()) > 0.1
+
+    def reset(self):
+        pass
+
+
+class FakeSTT:
+    def __init__(self):
+        self.calls = 0
+
+    async def transcribe_audio_detailed_async(self, audio, **kwargs):
+        self.calls += 1
+        return {"text": f"utterance {self.calls}.", "segments": []}
+
+
+class FakeLLM:
+    async def generate_question_async(self, context, **kwargs):
+        return f"Why {context}?"
+
+
+def _session(**kwargs) -> JournalingSession:
+    return JournalingSession(FakeSTT(), FakeVAD(), FakeLLM(), **kwargs)
+
+
+def test_close_archives_queued_and_buffered_speech(tmp_path, monkeypatch):
+    def slow_encode(self, audio):
+        time.sleep(0.05)
+        return bytes(len(audio))
+
+    monkeypatch.setattr(SessionArchive, "_encode", slow_encode)
+    service = SessionArchiveService(str(tmp_path))
+
+    async def scenario():
+        session = _session(archive_service=service)
+        session.start()
+        second = settings.SAMPLE_RATE
+        for seq in range(3):
+            await session.archive_queue.put(SpeechSegment(seq, np.zeros(second, dtype=np.float32), start=seq * 2.0))
+        session._next_segment_seq = 3
+        session.speech_buffer.append(np.ones(second, dtype=np.float32))
+        session._speech_start_samples = 6 * second
+
+        await session.close()
+        return session.session_id
+
+    session_id = asyncio.run(scenario())
+
+    entries = service.index(session_id)
+    assert [entry["seq"] for entry in entries] == [0, 1, 2, 3]
+    assert all(entry["bytes"] == settings.SAMPLE_RATE for entry in entries)
+    assert entries[3]["start"] == 6.0
+
+
+def _pcm(speech: bool, seconds: float) -> bytes:
+    samples = int(seconds * settings.SAMPLE_RATE)
+    level = 8000 if speech else 0
+    return np.full(samples, level, dtype=np.int16).tobytes()
+
+
+async def _collect(session: JournalingSession, types, count: int, timeout: float = 5.0):
+    events = []
+
+    async def collect():
+        async for event in session.events():
+            if event["type"] in types:
+                events.append(event)
+                if len(events) == count:
+                    return
+
+    await asyncio.wait_for(collect(), timeout)
+    return events
+
+
+def test_pauses_in_a_burst_of_audio_are_measured_in_audio_time(monkeypatch):
+    monkeypatch.setattr(settings, "TURN_DETECTION_ENABLED", False)
+
+    async def scenario():
+        session = _session()
+        session.start()
+        # Arrives in one go, as after a reconnect: wall-clock pauses would all be ~0 s
+        audio = (
+            _pcm(True, 1.0) + _pcm(False, 1.0)     # pause > VAD_PAUSE_THRESHOLD: segment 0
+            + _pcm(True, 1.0) + _pcm(False, 3.0)   # pause > POST_SPEAKING_SILENCE_THRESHOLD: turn end
+        )
+        await session.feed(audio)
+        try:
+            return await _collect(session, {"transcription", "question"}, 3)
+        finally:
+            await session.close()
+
+    events = asyncio.run(scenario())
+
+    assert [(e["type"], e["text"]) for e in events] == [
+        ("transcription", "utterance 1."),
+        ("transcription", "utterance 2."),
+        ("question", "Why utterance 1. utterance 2.?"),
+    ]
+
+
+def test_redelivered_event_goes_before_queued_events():
+    async def scenario():
+        session = _session()
+        for n in range(3):
+            await session.event_queue.put({"type": "transcription", "n": n})
+
+        dropped = session.events()
+        event = await dropped.__anext__()
+        session.redeliver(event)  # send failed
+
+        resumed = session.events()
+        return [(await resumed.__anext__())["n"] for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+
+
+def test_redelivery_wakes_a_waiting_connection_first():
+    async def scenario():
+        session = _session()
+        await session.event_queue.put({"n": 0})
+        old = session.events()
+        event = await old.__anext__()
+
+        # The new connection is already waiting when the old one fails to send
+        new = session.events()
+        waiting = asyncio.ensure_future(new.__anext__())
+        await asyncio.sleep(0)
+        session.redeliver(event)
+        await session.event_queue.put({"n": 1})
+
+        return [(await waiting)["n"], (await new.__anext__())["n"]]
+
+    assert asyncio.run(scenario()) == [0, 1]
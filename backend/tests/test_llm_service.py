@@ -0,0 +1,112 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.llm_service import LLMService
+
+
+class RecordingJobQueue:
+    """Answers jobs like a worker would and records their kinds."""
+
+    name = "test"
+    local = True
+
+    def __init__(self):
+        self.kinds = []
+        self.questions = iter(["First?", "Second?", "Third?"])
+
+    async def submit(self, kind, payload, priority=None):
+        self.kinds.append(kind)
+        if kind == "llm_embed":
+            return [1.0, 0.0, 0.0]
+        return next(self.questions)
+
+    def stats(self):
+        return {}
+
+
+def test_embeddings_go_through_the_job_queue(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    jobs = RecordingJobQueue()
+    service = LLMService(jobs)
+
+    question = asyncio.run(service.generate_question_async("I went hiking", user_id="alice"))
+
+    assert question == "First?"
+    assert jobs.kinds == ["llm_embed", "llm"]
+    assert "llm_embed" in LLMService().job_queue.handlers
+
+
+def test_cached_question_is_not_repeated_to_the_same_session(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    jobs = RecordingJobQueue()
+    service = LLMService(jobs)
+
+    async def scenario():
+        asked = set()
+        questions = []
+        for _ in range(3):
+            question = await service.generate_question_async("I went hiking", user_id="alice", exclude=asked)
+            asked.add(question)
+            questions.append(question)
+        # Another session of the same user may reuse the cached question
+        questions.append(await service.generate_question_async("I went hiking", user_id="alice"))
+        return questions
+
+    questions = asyncio.run(scenario())
+    assert questions[:3] == ["First?", "Second?", "Third?"]
+    assert questions[3] in questions[:3]
+    assert jobs.kinds.count("llm") == 3
+
+
+class BlockingJobQueue(RecordingJobQueue):
+    """Embeds by lookup table; holds a chosen context's generation until released."""
+
+    def __init__(self, embeddings, blocked_context):
+        super().__init__()
+        self.embeddings = embeddings
+        self.blocked_context = blocked_context
+        self.generating = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def submit(self, kind, payload, priority=None):
+        self.kinds.append(kind)
+        if kind == "llm_embed":
+            return self.embeddings[payload["text"]]
+        if payload["context"] == self.blocked_context:
+            self.generating.set()
+            await self.release.wait()
+        return next(self.questions)
+
+
+def test_cache_hit_while_a_generation_holds_the_slot(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_CONCURRENCY", 1)
+    embeddings = {
+        "I went hiking": [1.0, 0.0, 0.0],
+        "Work was busy": [0.0, 1.0, 0.0],
+        # Cosine 0.88 to "I went hiking": only a hit under the saturated threshold
+        "I walked up a hill": [0.88, 0.475, 0.0],
+    }
+
+    async def scenario():
+        jobs = BlockingJobQueue(embeddings, blocked_context="Work was busy")
+        service = LLMService(jobs)
+        assert await service.generate_question_async("I went hiking", user_id="alice") == "First?"
+        # Outside saturation the looser match is not good enough
+        hill = embeddings["I walked up a hill"]
+        assert service.question_cache.lookup("alice", hill, settings.LLM_CACHE_THRESHOLD) is None
+
+        generation = asyncio.create_task(service.generate_question_async("Work was busy", user_id="bob"))
+        await jobs.generating.wait()
+        assert service.scheduler.saturated()
+
+        cached = await asyncio.wait_for(
+            service.generate_question_async("I walked up a hill", user_id="alice"), timeout=1.0
+        )
+        assert not generation.done()
+        jobs.release.set()
+        return cached, await generation
+
+    cached, generated = asyncio.run(scenario())
+    assert cached == "First?"
+    assert generated == "Second?"
@@ -0,0 +1,133 @@
+import asyncio
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import long_form
+from app.services.long_form import LongFormTranscriber
+
+RATE = settings.SAMPLE_RATE
+SPEECH_SECONDS = 3.0
+PAUSE_SECONDS = 0.6
+
+
+def _recording(seconds: float) -> np.ndarray:
+    """Alternating speech and pauses."""
+    period = SPEECH_SECONDS + PAUSE_SECONDS
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.where(t % period < SPEECH_SECONDS, 0.5, 0.0).astype(np.float32)
+
+
+class EnergyVAD:
+    """Speech wherever 10 ms frames are loud; counts the samples it analyzes."""
+
+    def __init__(self):
+        self.analyzed = 0
+
+    def speech_timestamps(self, audio):
+        self.analyzed += len(audio)
+        frame = RATE // 100
+        loud = np.abs(audio[:len(audio) // frame * frame]).reshape(-1, frame).max(axis=1) > 0.1
+        regions, start = [], None
+        for i, is_loud in enumerate(loud):
+            if is_loud and start is None:
+                start = i * frame
+            elif not is_loud and start is not None:
+                regions.append({"start": start, "end": i * frame})
+                start = None
+        if start is not None:
+            regions.append({"start": start, "end": len(loud) * frame})
+        return regions
+
+
+class FakeDecoder:
+    audio = None
+
+    def __init__(self, file_path, sample_rate, block_seconds):
+        self.block = int(block_seconds * sample_rate)
+
+    def blocks(self):
+        for start in range(0, len(self.audio), self.block):
+            yield self.audio[start:start + self.block]
+
+
+class FakeSTT:
+    def __init__(self, log, delay=0.0):
+        self.log = log
+        self.delay = delay
+        self.batches = 0
+
+    async def transcribe_batch_async(self, chunks, priority=None, user_id=None):
+        batch = self.batches
+        self.batches += 1
+        self.log.append(("start", batch))
+        await asyncio.sleep(self.delay)
+        return [{"text": f"b{batch}", "words": []} for _ in chunks]
+
+
+def _run(monkeypatch, audio, stt, consume_delay=0.0):
+    FakeDecoder.audio = audio
+    monkeypatch.setattr(long_form, "StreamingAudioDecoder", FakeDecoder)
+    vad = EnergyVAD()
+    transcriber = LongFormTranscriber(stt, vad)
+
+    async def collect():
+        events = []
+        async for event in transcriber.transcribe("recording.m4a"):
+            if event["type"] == "segment":
+                stt.log.append(("yield", int(event["text"][1:])))
+                await asyncio.sleep(consume_delay)
+            events.append(event)
+        return events
+
+    return asyncio.run(collect()), vad
+
+
+def test_chunks_end_in_pauses_and_vad_runs_about_once_per_sample(monkeypatch):
+    audio = _recording(300.0)
+    events, vad = _run(monkeypatch, audio, FakeSTT([]))
+
+    segments = [e for e in events if e["type"] == "segment"]
+    assert events[-1]["type"] == "done"
+    # Chunks tile the recording
+    assert segments[0]["start"] == 0.0
+    for previous, current in zip(segments, segments[1:]):
+        assert current["start"] == previous["end"]
+    assert events[-1]["duration"] == round(len(audio) / RATE, 3)
+    # Every cut but the last lies in a pause and respects the length limits
+    period = SPEECH_SECONDS + PAUSE_SECONDS
+    for segment in segments[:-1]:
+        assert segment["end"] % period >= SPEECH_SECONDS
+        length = segment["end"] - segment["start"]
+        assert settings.LONG_FORM_MIN_CHUNK_SECONDS <= length <= settings.LONG_FORM_MAX_CHUNK_SECONDS
+    # Only new audio plus the overlap goes through VAD
+    blocks = len(audio) / (settings.LONG_FORM_DECODE_BLOCK_SECONDS * RATE)
+    assert vad.analyzed <= len(audio) + blocks * settings.LONG_FORM_VAD_OVERLAP_SECONDS * RATE
+
+
+def test_next_batch_is_transcribed_while_results_are_consumed(monkeypatch):
+    monkeypatch.setattr(settings, "LONG_FORM_BATCH_SIZE", 2)
+    log = []
+    _run(monkeypatch, _recording(200.0), FakeSTT(log, delay=0.02), consume_delay=0.02)
+
+    assert log.index(("start", 1)) < log.index(("yield", 0))
+    # Never more than LONG_FORM_PIPELINE_DEPTH batches ahead of the consumer
+    for batch in range(2, max(b for kind, b in log if kind == "start") + 1):
+        assert log.index(("yield", batch - settings.LONG_FORM_PIPELINE_DEPTH)) < log.index(("start", batch))
+
+
+def test_stopping_early_cancels_the_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "LONG_FORM_BATCH_SIZE", 1)
+    FakeDecoder.audio = _recording(300.0)
+    monkeypatch.setattr(long_form, "StreamingAudioDecoder", FakeDecoder)
+    stt = FakeSTT([], delay=0.01)
+    transcriber = LongFormTranscriber(stt, EnergyVAD())
+
+    async def first_segment():
+        stream = transcriber.transcribe("recording.m4a")
+        event = await stream.__anext__()
+        await stream.aclose()
+        return event
+
+    assert asyncio.run(first_segment())["index"] == 0
+    assert stt.batches <= 1 + settings.LONG_FORM_PIPELINE_DEPTH
@@ -0,0 +1,21 @@
+import wave
+
+from app.utils.media_probe import probe_duration
+
+
+def test_wav_duration_is_read_from_the_header(tmp_path):
+    path = tmp_path / "clip.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(b"\x00\x00" * 12000)
+
+    assert probe_duration(str(path)) == 1.5
+
+
+def test_unreadable_file_has_no_duration(tmp_path):
+    path = tmp_path / "junk.webm"
+    path.write_bytes(b"not media")
+
+    assert probe_duration(str(path)) is None
@@ -0,0 +1,88 @@
+import asyncio
+
+from app.services.scheduler import InferenceScheduler, Priority
+
+
+async def _run_order(scheduler: InferenceScheduler, requests):
+    """Queue requests behind a held slot, release it and record the order they run in."""
+    order = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot(Priority.INTERACTIVE, "blocker"):
+            await gate.wait()
+
+    async def request(name, priority, user_id, cost):
+        async with scheduler.slot(priority, user_id, cost):
+            order.append(name)
+
+    held = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = []
+    for args in requests:
+        tasks.append(asyncio.create_task(request(*args)))
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(held, *tasks)
+    return order
+
+
+def test_interactive_overtakes_bulk():
+    scheduler = InferenceScheduler("test", 1)
+    order = asyncio.run(_run_order(scheduler, [
+        ("bulk", Priority.BULK, "batch", 1.0),
+        ("live", Priority.INTERACTIVE, "alice", 1.0),
+    ]))
+
+    assert order == ["live", "bulk"]
+
+
+def test_heavy_user_does_not_starve_light_user():
+    scheduler = InferenceScheduler("test", 1)
+    heavy = [(f"heavy{i}", Priority.INTERACTIVE, "heavy", 10.0) for i in range(4)]
+    order = asyncio.run(_run_order(scheduler, heavy + [("light", Priority.INTERACTIVE, "light", 1.0)]))
+
+    # The light request arrived last but its finish tag is ahead of all but the first heavy one
+    assert order.index("light") <= 1
+
+
+def test_finish_tags_of_idle_users_are_pruned():
+    scheduler = InferenceScheduler("test", 1)
+
+    async def scenario():
+        for i in range(5000):
+            async with scheduler.slot(Priority.INTERACTIVE, f"user{i}"):
+                pass
+
+    asyncio.run(scenario())
+
+    assert len(scheduler._last_finish) < 2048
+    assert scheduler.stats()["running"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    scheduler = InferenceScheduler("test", 1)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await gate.wait()
+
+        async def wait():
+            async with scheduler.slot():
+                pass
+
+        held = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        gate.set()
+        await asyncio.gather(held, waiter, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert scheduler.running == 0
+    assert scheduler.queue_depth() == 0
@@ -0,0 +1,95 @@
+import types
+
+import numpy as np
+import pytest
+
+from app.utils import semantic_cache
+from app.utils.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(semantic_cache, "time", types.SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def _vector(seed: int, dim: int = 64) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim)
+
+
+def _near(vector: np.ndarray, scale: float = 0.01) -> np.ndarray:
+    return vector + scale * np.random.default_rng(99).standard_normal(len(vector))
+
+
+def _cache(**kwargs) -> SemanticCache:
+    options = {"threshold": 0.9, "ttl": 60.0, "max_entries": 100}
+    options.update(kwargs)
+    return SemanticCache(**options)
+
+
+def test_similar_vector_hits_and_dissimilar_misses(clock):
+    cache = _cache()
+    base = _vector(1)
+    cache.add("alice", base, "q1")
+
+    assert cache.lookup("alice", _near(base)) == "q1"
+    assert cache.lookup("alice", _vector(2)) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_entries_are_scoped(clock):
+    cache = _cache()
+    base = _vector(1)
+    cache.add("alice", base, "q1")
+
+    assert cache.lookup("bob", base) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = _cache(ttl=10.0)
+    base = _vector(1)
+    cache.add("alice", base, "q1")
+
+    clock.now += 9.0
+    assert cache.lookup("alice", base) == "q1"
+    clock.now += 2.0
+    assert cache.lookup("alice", base) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = _cache(max_entries=2)
+    first, second, third = _vector(1), _vector(2), _vector(3)
+    cache.add("alice", first, "q1")
+    cache.add("alice", second, "q2")
+    assert cache.lookup("alice", first) == "q1"  # second is now least recent
+
+    cache.add("alice", third, "q3")
+
+    assert cache.lookup("alice", second) is None
+    assert cache.lookup("alice", first) == "q1"
+    assert cache.lookup("alice", third) == "q3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_excluded_values_are_skipped(clock):
+    cache = _cache()
+    base = _vector(1)
+    cache.add("alice", base, "q1")
+    cache.add("alice", _near(base, 0.05), "q2")
+
+    assert cache.lookup("alice", base) == "q1"
+    assert cache.lookup("alice", base, exclude={"q1"}) == "q2"
+    assert cache.lookup("alice", base, exclude={"q1", "q2"}) is None
+
+
+def test_threshold_override_loosens_matching(clock):
+    cache = _cache(threshold=0.99)
+    base = _vector(1)
+    cache.add("alice", base, "q1")
+    query = _near(base, 0.3)
+
+    assert cache.lookup("alice", query) is None
+    assert cache.lookup("alice", query, threshold=0.8) == "q1"
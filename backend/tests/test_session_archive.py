@@ -0,0 +1,135 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.session_archive import SessionArchive, SessionArchiveService
+
+SESSION_ID = "0123456789abcdef0123456789abcdef"
+
+
+def _fake_encode(self, audio):
+    # One byte per sample keeps offsets easy to check without ffmpeg
+    return bytes(len(audio))
+
+
+def test_clips_are_indexed_by_seq(tmp_path, monkeypatch):
+    monkeypatch.setattr(SessionArchive, "_encode", _fake_encode)
+    service = SessionArchiveService(str(tmp_path))
+    archive = service.open(SESSION_ID, "alice")
+    archive.append(0, 0.0, np.zeros(100, dtype=np.float32))
+    archive.append(1, 2.5, np.zeros(300, dtype=np.float32))
+    archive.add_text(1, "second")
+    archive.close()
+
+    path, offset, length, media_type = service.clip(SESSION_ID, 1)
+    assert (offset, length, media_type) == (100, 300, "audio/ogg")
+    assert service.clip(SESSION_ID, 2) is None
+    assert service.index(SESSION_ID)[1] == {
+        "seq": 1,
+        "start": 2.5,
+        "duration": round(300 / settings.SAMPLE_RATE, 3),
+        "bytes": 300,
+        "text": "second",
+    }
+
+
+def test_failed_encode_keeps_index_dense(tmp_path, monkeypatch):
+    def failing_encode(self, audio):
+        raise RuntimeError("ffmpeg missing")
+
+    monkeypatch.setattr(SessionArchive, "_encode", failing_encode)
+    service = SessionArchiveService(str(tmp_path))
+    archive = service.open(SESSION_ID, "alice")
+    archive.append(0, 0.0, np.zeros(10, dtype=np.float32))
+    archive.close()
+
+    assert service.clip(SESSION_ID, 0) is None
+    assert [entry["bytes"] for entry in service.index(SESSION_ID)] == [0]
+
+
+def test_owner_comes_from_session_metadata(tmp_path, monkeypatch):
+    monkeypatch.setattr(SessionArchive, "_encode", _fake_encode)
+    service = SessionArchiveService(str(tmp_path))
+    service.open(SESSION_ID, "alice").close()
+
+    assert service.owner(SESSION_ID) == "alice"
+    assert service.owner("f" * 32) is None
+    assert service.owner("../etc") is None
+
+
+def test_audio_routes_only_serve_the_owner(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import routes
+
+    monkeypatch.setattr(SessionArchive, "_encode", _fake_encode)
+    service = SessionArchiveService(str(tmp_path))
+    archive = service.open(SESSION_ID, "alice")
+    archive.append(0, 0.0, np.zeros(100, dtype=np.float32))
+    archive.close()
+    monkeypatch.setattr(routes, "session_archive_service", service)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    client = TestClient(app)
+
+    for path in ("audio", "audio/index", "audio/clips/0"):
+        url = f"/api/sessions/{SESSION_ID}/{path}"
+        assert client.get(url, headers={"X-User-Id": "alice"}).status_code == 200
+        assert client.get(url, headers={"X-User-Id": "mallory"}).status_code == 404
+        assert client.get(url).status_code == 404
+
+
+class _DiskFullAfter:
+    """File wrapper whose next write stores half the data, then fails like a full disk."""
+
+    def __init__(self, f):
+        self._f = f
+        self.fail = False
+
+    def write(self, data):
+        if self.fail:
+            self._f.write(data[:len(data) // 2])
+            raise OSError(28, "No space left on device")
+        return self._f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+def test_failed_write_rolls_back_and_stops_the_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(SessionArchive, "_encode", _fake_encode)
+    service = SessionArchiveService(str(tmp_path))
+    archive = service.open(SESSION_ID, "alice")
+    archive.audio_file = _DiskFullAfter(archive.audio_file)
+
+    archive.append(0, 0.0, np.zeros(100, dtype=np.float32))
+    archive.audio_file.fail = True
+    archive.append(1, 1.0, np.zeros(300, dtype=np.float32))
+    archive.audio_file.fail = False
+    archive.append(2, 2.0, np.zeros(50, dtype=np.float32))
+    archive.close()
+
+    assert archive.broken
+    assert [entry["seq"] for entry in service.index(SESSION_ID)] == [0]
+    path, offset, length, _ = service.clip(SESSION_ID, 0)
+    assert (offset, length) == (0, 100)
+    # The half-written clip is gone from the audio file too
+    with open(path, "rb") as f:
+        assert len(f.read()) == 100
+
+
+def test_out_of_step_seq_stops_the_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(SessionArchive, "_encode", _fake_encode)
+    service = SessionArchiveService(str(tmp_path))
+    archive = service.open(SESSION_ID, "alice")
+    archive.append(0, 0.0, np.zeros(100, dtype=np.float32))
+    archive.append(2, 2.0, np.zeros(100, dtype=np.float32))
+    archive.close()
+
+    assert archive.broken
+    assert [entry["seq"] for entry in service.index(SESSION_ID)] == [0]
+
+
+def test_archiving_is_off_by_default():
+    assert settings.model_fields["SESSION_ARCHIVE_ENABLED"].default is False
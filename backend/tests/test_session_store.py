@@ -0,0 +1,120 @@
+import asyncio
+
+from app.services.admission import AdmissionController
+from app.services.session_store import SessionStore
+
+
+class FakeSession:
+    def __init__(self, session_id: str, user_id: str = "alice"):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+async def _store_with_session(ttl: float):
+    admission = AdmissionController()
+    await admission.acquire("session")
+    store = SessionStore(admission, ttl)
+    session = FakeSession("s1")
+    store.add(session, "conn-1")
+    return admission, store, session
+
+
+def test_detached_session_resumes_on_new_connection():
+    async def scenario():
+        admission, store, session = await _store_with_session(ttl=0.05)
+        store.detach("s1", "conn-1")
+        assert store.connection("s1") is None
+
+        assert store.resume("s1", "conn-2") is session
+        await asyncio.sleep(0.1)  # past the TTL: the resumed session must not expire
+        assert not session.closed
+        assert store.is_attached("s1", "conn-2")
+        # The old connection no longer owns the session
+        store.detach("s1", "conn-1")
+        assert store.is_attached("s1", "conn-2")
+        assert store.stats()["resumed"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_detached_session_expires_and_frees_its_slot():
+    async def scenario():
+        admission, store, session = await _store_with_session(ttl=0.05)
+        store.detach("s1", "conn-1")
+        await asyncio.sleep(0.15)
+
+        assert session.closed
+        assert store.resume("s1", "conn-2") is None
+        assert admission.active["session"] == 0
+        assert store.stats()["expired"] == 1
+
+    asyncio.run(scenario())
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self, reason=None):
+        self.closed = True
+
+
+def test_resume_is_refused_to_other_users():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.api import routes
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    admission = AdmissionController()
+    store = SessionStore(admission, ttl=60)
+    session = FakeSession("s1", user_id="alice")
+    previous = FakeConnection()
+    store.add(session, previous)
+    app.state.admission = admission
+    app.state.session_store = store
+    app.state.stt_service = app.state.vad_service = app.state.llm_service = None
+
+    assert store.owner("s1") == "alice"
+    assert store.owner("unknown") is None
+
+    client = TestClient(app)
+    with client.websocket_connect("/api/ws/audio?session_id=s1", headers={"X-User-Id": "mallory"}) as websocket:
+        try:
+            websocket.receive_json()
+        except WebSocketDisconnect as e:
+            closed = e
+
+    assert closed.code == 1008
+    assert not previous.closed
+    assert store.is_attached("s1", previous)
+    assert store.stats()["resumed"] == 0
+
+
+def test_expiry_task_is_kept_until_done_and_failures_are_reported(capsys):
+    class FailingSession(FakeSession):
+        async def close(self):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("archive flush failed")
+
+    async def scenario():
+        admission = AdmissionController()
+        await admission.acquire("session")
+        store = SessionStore(admission, ttl=0.01)
+        store.add(FailingSession("s1"), "conn-1")
+        store.detach("s1", "conn-1")
+        await asyncio.sleep(0.015)
+        # The store holds the running expiry task, so it cannot be garbage-collected mid-close
+        assert len(store._expiring) == 1
+        await store.close_all()
+        assert not store._expiring
+        assert admission.active["session"] == 0
+
+    asyncio.run(scenario())
+    assert "Session expiry failed: RuntimeError('archive flush failed')" in capsys.readouterr().out
@@ -0,0 +1,95 @@
+from app.services.vad_service import VADPool
+from app.utils.speech_gate import SpeechGate, SpeechGateStats
+
+CHUNK = 4
+SPEECH = b"S" * CHUNK
+
+
+def silence(i):
+    # Distinct silent chunks so the test can tell which ones were forwarded
+    return bytes([i]) * CHUNK
+
+
+class FakeVAD:
+    """Calls a chunk speech if it is made of b"S"."""
+
+    def __init__(self):
+        self.resets = 0
+        self.calls = 0
+
+    def create_energy_gate(self):
+        return None
+
+    def is_speech(self, chunk, energy_gate=None):
+        self.calls += 1
+        return chunk == SPEECH
+
+    def reset(self):
+        self.resets += 1
+
+
+def test_silence_is_withheld():
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=2)
+    assert gate.process(b"".join(silence(i) for i in range(10))) == []
+    assert gate.bytes_forwarded == 0
+    assert gate.bytes_saved == 10 * CHUNK
+
+
+def test_only_speech_is_forwarded_without_padding():
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=0)
+    audio = [silence(1), SPEECH, silence(2), SPEECH, silence(3)]
+    assert gate.process(b"".join(audio)) == [SPEECH, SPEECH]
+
+
+def test_padding_before_onset_and_hangover_after_speech():
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=2)
+    audio = [silence(i) for i in range(1, 5)] + [SPEECH, SPEECH] + [silence(i) for i in range(5, 9)]
+
+    forwarded = gate.process(b"".join(audio))
+
+    # Two chunks of pre-roll, the speech, two chunks of hangover
+    assert forwarded == [silence(3), silence(4), SPEECH, SPEECH, silence(5), silence(6)]
+
+
+def test_speech_during_hangover_restarts_it():
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=2)
+    audio = [SPEECH, silence(1), SPEECH, silence(2), silence(3), silence(4)]
+    assert gate.process(b"".join(audio)) == [SPEECH, silence(1), SPEECH, silence(2), silence(3)]
+
+
+def test_chunks_split_across_blocks():
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=0)
+    assert gate.process(SPEECH[:3]) == []
+    assert gate.process(SPEECH[3:] + SPEECH[:1]) == [SPEECH]
+    assert gate.process(SPEECH[1:]) == [SPEECH]
+
+
+def test_stats_are_updated_while_the_stream_runs():
+    stats = SpeechGateStats()
+    gate = SpeechGate(FakeVAD(), CHUNK, padding_chunks=0, stats=stats)
+    assert stats.to_dict()["active"] == 1
+
+    gate.process(silence(1) + SPEECH)
+    summary = stats.to_dict()
+    assert summary["bytes_in"] == 2 * CHUNK
+    assert summary["bytes_forwarded"] == CHUNK
+    assert summary["saved_fraction"] == 0.5
+
+    gate.close()
+    gate.close()
+    summary = stats.to_dict()
+    assert summary["streams"] == 1
+    assert summary["active"] == 0
+
+
+def test_vad_pool_gives_each_stream_its_own_reset_instance():
+    pool = VADPool(factory=FakeVAD)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    assert pool.created == 2
+
+    pool.release(first)
+    reused = pool.acquire()
+    assert reused is first
+    assert reused.resets == 2
+    assert pool.created == 2
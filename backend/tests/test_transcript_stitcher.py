@@ -0,0 +1,44 @@
+import pytest
+
+from app.utils.transcript_stitcher import TranscriptStitcher
+
+
+@pytest.fixture
+def stitcher():
+    return TranscriptStitcher(max_overlap_words=6)
+
+
+def test_duplicated_seam_words_are_dropped(stitcher):
+    assert stitcher.stitch("I went to the", "to the store today") == "store today"
+
+
+def test_matching_ignores_case_and_punctuation(stitcher):
+    assert stitcher.stitch("and then, Finally.", "finally we left") == "we left"
+    assert stitcher.stitch("it's late", "It's late, so I slept") == "so I slept"
+
+
+def test_longest_overlap_wins(stitcher):
+    # "the" alone also matches, but the whole repeated phrase must go
+    assert stitcher.stitch("the end of the", "end of the day") == "day"
+
+
+def test_no_overlap_keeps_current(stitcher):
+    assert stitcher.stitch("I went home", "Then I slept") == "Then I slept"
+
+
+def test_overlap_longer_than_the_limit_is_not_removed():
+    stitcher = TranscriptStitcher(max_overlap_words=2)
+    assert stitcher.stitch("one two three", "one two three four") == "one two three four"
+
+
+def test_punctuation_only_tokens_do_not_count_as_overlap(stitcher):
+    assert stitcher.stitch("well -", "- okay") == "- okay"
+
+
+def test_fully_repeated_segment_becomes_empty(stitcher):
+    assert stitcher.stitch("so yeah", "so yeah") == ""
+
+
+def test_empty_inputs(stitcher):
+    assert stitcher.stitch("", "hello there") == "hello there"
+    assert stitcher.stitch("hello there", "") == ""
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.stt_service import STTService
+from app.utils.transcription_cache import TranscriptionCache
+
+
+def _size(key, value):
+    return len(key) + len(json.dumps(value))
+
+
+def test_hit_and_miss():
+    cache = TranscriptionCache(max_bytes=1024)
+    assert cache.get("a") is None
+    cache.put("a", {"text": "hello", "segments": []})
+    assert cache.get("a") == {"text": "hello", "segments": []}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_eviction_is_least_recently_used_within_the_byte_budget():
+    value = {"text": "x" * 20}
+    cache = TranscriptionCache(max_bytes=3 * _size("a", value))
+    for key in "abc":
+        cache.put(key, value)
+    # Touch "a" so "b" is now the least recently used
+    cache.get("a")
+    cache.put("d", value)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) == value for key in "acd")
+    assert cache.memory_bytes == 3 * _size("a", value)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_larger_than_the_budget_are_not_kept():
+    cache = TranscriptionCache(max_bytes=16)
+    cache.put("a", {"text": "far too long to fit"})
+    assert cache.get("a") is None
+    assert cache.memory_bytes == 0
+
+
+def test_disk_tier_serves_evicted_entries(tmp_path):
+    value = {"text": "x" * 20}
+    cache = TranscriptionCache(max_bytes=_size("a", value), disk_dir=str(tmp_path))
+    cache.put("aa", value)
+    cache.put("bb", value)
+
+    assert cache.get("aa") == value
+    assert cache.stats()["disk_hits"] == 1
+    # A new instance over the same directory starts warm
+    assert TranscriptionCache(max_bytes=1024, disk_dir=str(tmp_path)).get("bb") == value
+
+
+def test_async_access_uses_the_disk_tier(tmp_path):
+    async def scenario():
+        cache = TranscriptionCache(max_bytes=1024, disk_dir=str(tmp_path))
+        await cache.put_async("cc", {"text": "hi"})
+        cold = TranscriptionCache(max_bytes=1024, disk_dir=str(tmp_path))
+        return await cold.get_async("cc"), await cold.get_async("cc"), await cold.get_async("dd"), cold.stats()
+
+    first, second, missing, stats = asyncio.run(scenario())
+    assert first == second == {"text": "hi"}
+    assert missing is None
+    assert (stats["disk_hits"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_fingerprints_are_namespaced(tmp_path):
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"RIFF" + bytes(100))
+    assert TranscriptionCache.fingerprint_file(str(path), "m1") == TranscriptionCache.fingerprint_bytes(
+        path.read_bytes(), "m1"
+    )
+    assert TranscriptionCache.fingerprint_bytes(b"audio", "m1") != TranscriptionCache.fingerprint_bytes(b"audio", "m2")
+
+
+class RemoteJobQueue:
+    """Stands in for the broker so no model is loaded; counts transcriptions."""
+
+    name = "test"
+    local = False
+
+    def __init__(self):
+        self.jobs = 0
+
+    async def submit(self, kind, payload, priority=None):
+        self.jobs += 1
+        return {"text": f"transcript {self.jobs}", "segments": []}
+
+    def stats(self):
+        return {}
+
+
+def test_stt_cache_is_namespaced_by_model(monkeypatch):
+    monkeypatch.setattr(settings, "STT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "STT_CACHE_DIR", None)
+    monkeypatch.setattr(settings, "WHISPER_DEGRADED_MODEL", "tiny.en")
+    jobs = RemoteJobQueue()
+    service = STTService(jobs)
+    audio = np.zeros(1600, dtype=np.float32)
+
+    async def scenario():
+        full = await service.transcribe_audio_detailed_async(audio)
+        again = await service.transcribe_audio_detailed_async(audio)
+        degraded = await service.transcribe_audio_detailed_async(audio, degraded=True)
+        return full, again, degraded
+
+    full, again, degraded = asyncio.run(scenario())
+    assert again == full
+    # The degraded model has its own namespace, so its result is not served for the full model
+    assert degraded != full
+    assert jobs.jobs == 2
@@ -0,0 +1,95 @@
+import pytest
+
+from app.utils.transcription_filter import FilterStats, TranscriptionFilter, compression_ratio, normalize_text
+
+
+def _segment(no_speech_prob=0.1, avg_logprob=-0.3, compression_ratio=1.2):
+    return {"no_speech_prob": no_speech_prob, "avg_logprob": avg_logprob, "compression_ratio": compression_ratio}
+
+
+@pytest.fixture
+def transcript_filter():
+    return TranscriptionFilter(phrases=["Thank you.", "Thanks for watching!"])
+
+
+def test_normalize_text():
+    assert normalize_text("  Thanks for WATCHING!!  ") == "thanks for watching"
+    assert normalize_text("It's... fine") == "it's fine"
+
+
+def test_compression_ratio():
+    assert compression_ratio("") == 0.0
+    assert compression_ratio("la " * 100) > compression_ratio("I walked to the park and met an old friend.")
+
+
+@pytest.mark.parametrize("text", ["", " ", "a", "...and then"])
+def test_invalid_text(transcript_filter, text):
+    assert transcript_filter.rejection_reason(text) == "invalid"
+
+
+@pytest.mark.parametrize("text", ["Thank you.", "thank you", "Thanks for watching!", "Thank you. Thank you."])
+def test_known_phrases(transcript_filter, text):
+    assert transcript_filter.rejection_reason(text) == "phrase"
+
+
+def test_phrase_inside_longer_text_is_kept(transcript_filter):
+    assert transcript_filter.rejection_reason("Thank you for listening to me today.") is None
+
+
+def test_no_speech_needs_every_segment_to_be_silent(transcript_filter):
+    silent = _segment(no_speech_prob=0.9, avg_logprob=-1.5)
+    assert transcript_filter.rejection_reason("Some words here", [silent, silent]) == "no_speech"
+    assert transcript_filter.rejection_reason("Some words here", [silent, _segment()]) is None
+    # A confident decode is kept even when no-speech probability is high
+    confident = _segment(no_speech_prob=0.9, avg_logprob=-0.2)
+    assert transcript_filter.rejection_reason("Some words here", [confident]) is None
+
+
+def test_repeated_unit(transcript_filter):
+    assert transcript_filter.rejection_reason("I know. I know. I know. I know.") == "repetition"
+    assert transcript_filter.rejection_reason("I know. I know.") is None
+
+
+def test_repeated_ngram(transcript_filter):
+    text = "and then we went and then we went and then we went and then we went home"
+    assert transcript_filter.rejection_reason(text) == "repetition"
+
+
+def test_compressible_text():
+    # Every trigram occurs 15 times, under the limit, but the text still compresses like a loop
+    transcript_filter = TranscriptionFilter(max_ngram_repeats=20)
+    text = " ".join(["one two three four five six seven eight nine ten"] * 15) + " done"
+    assert transcript_filter.rejection_reason(text) == "repetition"
+
+
+def test_segment_compression_ratio(transcript_filter):
+    segments = [_segment(), _segment(compression_ratio=3.1)]
+    assert transcript_filter.rejection_reason("This looks fine on its own", segments) == "repetition"
+
+
+def test_natural_speech_is_kept(transcript_filter):
+    text = "Today I finally finished the garden fence and my back hurts, but it looks great."
+    assert transcript_filter.rejection_reason(text, [_segment()]) is None
+
+
+def test_check_counts_outcomes():
+    stats = FilterStats()
+    transcript_filter = TranscriptionFilter(phrases=["Thank you."], stats=stats)
+
+    assert transcript_filter.check("Thank you.", duration=1.5) == "phrase"
+    assert transcript_filter.check("", duration=0.5) == "invalid"
+    assert transcript_filter.check("I had a good day.", duration=2.0) is None
+
+    summary = stats.to_dict()
+    assert summary["checked"] == 3
+    assert summary["rejected"] == 2
+    assert summary["rejected_fraction"] == pytest.approx(2 / 3)
+    assert summary["rejected_by_reason"] == {"phrase": 1, "invalid": 1}
+    assert summary["rejected_audio_seconds"] == 2.0
+
+
+def test_filters_without_shared_stats_count_separately():
+    first, second = TranscriptionFilter(), TranscriptionFilter()
+    first.check("hello there")
+    assert first.stats.checked == 1
+    assert second.stats.checked == 0
@@ -0,0 +1,54 @@
+import pytest
+
+from app.utils.turn_detector import DEFAULT_WEIGHTS, TurnDetector
+
+
+def _detector(**kwargs) -> TurnDetector:
+    return TurnDetector(
+        base_pause=0.5,
+        base_turn_end=2.0,
+        min_silence=0.6,
+        max_silence=2.5,
+        reference_rate=2.5,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("complete, incomplete", [
+    ("I went for a long walk today.", "I went for a long walk and"),
+    ("That was the best part of my week!", "That was the best part of, um"),
+    ("Anyway, that's it.", "And then I told her that..."),
+])
+def test_complete_thoughts_score_higher(complete, incomplete):
+    detector = _detector()
+    assert detector.completeness(complete) > 0.5 > detector.completeness(incomplete)
+
+
+def test_complete_thought_ends_turn_sooner():
+    detector = _detector()
+    complete = detector.update("I finally finished the project today.", 2.4)
+    incomplete = _detector().update("I finally finished the project because", 2.4)
+
+    assert complete.turn_end_threshold < incomplete.turn_end_threshold
+    assert 0.6 <= complete.turn_end_threshold <= incomplete.turn_end_threshold <= 2.5
+
+
+def test_slow_speaker_gets_longer_pauses():
+    fast = _detector().update("one two three four five six", 1.5)  # 4 words/s
+    slow = _detector().update("one two three four five six", 6.0)  # 1 word/s
+
+    assert slow.pause_threshold > 0.5 > fast.pause_threshold
+
+
+def test_weights_are_configurable():
+    text = "I went for a walk and"
+    default = _detector().completeness(text)
+    ignoring_conjunctions = _detector(weights={"continuation": 0.0}).completeness(text)
+
+    assert ignoring_conjunctions > default
+    assert _detector(weights={}).weights == DEFAULT_WEIGHTS
+
+
+def test_unknown_weight_is_rejected():
+    with pytest.raises(ValueError):
+        _detector(weights={"terminal_punctuation": 1.0})
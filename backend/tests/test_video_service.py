@@ -0,0 +1,56 @@
+import io
+import json
+import subprocess
+
+import pytest
+
+from app.services import video_service as video_module
+from app.services.video_service import VideoService
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    """Record ffmpeg/ffprobe commands instead of running them."""
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        stdout = ""
+        if command[0] == "ffprobe":
+            stdout = json.dumps({"packets": [], "format": {"duration": "12.0"}})
+        return subprocess.CompletedProcess(command, 0, stdout=stdout, stderr="")
+
+    monkeypatch.setattr(video_module.subprocess, "run", fake_run)
+    return calls
+
+
+def _convert(tmp_path, monkeypatch, streams):
+    monkeypatch.setattr(video_module, "probe_stream_types", lambda path: streams)
+    monkeypatch.chdir(tmp_path)
+    return VideoService(str(tmp_path / "videos")).save_and_convert_video(io.BytesIO(b"webm"), "entry")
+
+
+def test_audio_only_upload_skips_video_outputs(tmp_path, monkeypatch, ffmpeg_calls):
+    outputs = _convert(tmp_path, monkeypatch, {"audio"})
+
+    ffmpeg = ffmpeg_calls[0]
+    assert ffmpeg[0] == "ffmpeg"
+    assert "-filter_complex" not in ffmpeg
+    assert ["-map", "0:a"] == ffmpeg[ffmpeg.index("-map"):ffmpeg.index("-map") + 2]
+    assert outputs["hls"] is None
+    assert outputs["thumbnails"] is None
+    assert outputs["path"].endswith("entry.mp4")
+
+
+def test_video_upload_uses_the_single_pass_graph(tmp_path, monkeypatch, ffmpeg_calls):
+    _convert(tmp_path, monkeypatch, {"audio", "video"})
+
+    ffmpeg = ffmpeg_calls[0]
+    graph = ffmpeg[ffmpeg.index("-filter_complex") + 1]
+    assert graph.startswith("[0:v]")
+
+
+def test_unknown_streams_fall_back_to_video(tmp_path, monkeypatch, ffmpeg_calls):
+    _convert(tmp_path, monkeypatch, None)
+
+    assert "-filter_complex" in ffmpeg_calls[0]